@@ -4,3 +4,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'career_navigator.settings')
 
 application = get_asgi_application()
+
+from navigator.services.warmup import warm_up_on_start  # noqa: E402  (needs the app registry)
+
+warm_up_on_start()
@@ -0,0 +1,112 @@
+import ast
+import json
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from navigator.services.llm_json import extract_json
+
+WEEK = {"focus": "SQL joins", "tasks": ["Practice joins", "Window functions"], "project": "Sales dashboard", "checkpoint": "Quiz"}
+PLAN = json.dumps({f"week_{i}": WEEK for i in range(1, 5)}, indent=2)
+SKILLS = json.dumps({"technical": ["Python", "SQL"], "tools": ["Excel", "Tableau"], "soft": ["Communication"]})
+
+# Shapes of malformed responses seen from Gemini and Groq.
+CORPUS = {
+    "clean": SKILLS,
+    "fenced": f"```json\n{PLAN}\n```",
+    "prose_around": f"Sure! Here is your plan:\n{PLAN}\nLet me know if you need changes.",
+    "trailing_commas": PLAN.replace('"]', '",]').replace('"\n  }', '",\n  }'),
+    "smart_quotes": SKILLS.replace('"', "“", 1).replace('"', "”", 1),
+    "python_literal": str({"technical": ["Python"], "tools": [], "soft": ["Teamwork"], "remote": True, "notes": None}),
+    "bracket_in_prose": f"Note [1]: see below.\n```json\n{SKILLS}\n```",
+    "reference_before_plan": f"Note [1]: plan {PLAN}",
+    "reference_before_skills": f"Skills (see [2]) {SKILLS}",
+    "truncated": PLAN[: len(PLAN) * 2 // 3],
+    "long_fenced": "```json\n" + json.dumps({f"week_{i}": WEEK for i in range(1, 400)}, indent=2) + ",\n```",
+}
+
+
+def legacy_parse_llm_json(response_text):
+    """
+    The previous regex cascade, kept here as the benchmark baseline.
+    """
+
+    cleaned = (response_text or "").strip()
+    if cleaned.startswith("```"):
+        cleaned = re.sub(r"^```[a-zA-Z0-9_-]*\n", "", cleaned)
+        cleaned = re.sub(r"\n```$", "", cleaned)
+    cleaned = cleaned.strip()
+
+    candidates = [cleaned]
+    fenced_blocks = re.findall(r"```(?:json)?\s*([\s\S]*?)\s*```", response_text or "", flags=re.IGNORECASE)
+    candidates.extend(block.strip() for block in fenced_blocks if block and block.strip())
+
+    json_objects = re.findall(r"\{[\s\S]*\}", cleaned)
+    candidates.extend(obj.strip() for obj in json_objects if obj and obj.strip())
+
+    if cleaned.startswith("[") and cleaned.endswith("]"):
+        candidates.append(cleaned)
+
+    for candidate in candidates:
+        if not candidate:
+            continue
+
+        normalized = candidate.strip()
+        normalized = normalized.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+        normalized = re.sub(r",\s*([}\]])", r"\1", normalized)
+
+        try:
+            return json.loads(normalized)
+        except json.JSONDecodeError:
+            pass
+
+        try:
+            parsed = ast.literal_eval(normalized)
+            if isinstance(parsed, (dict, list)):
+                return parsed
+        except (SyntaxError, ValueError):
+            pass
+
+    raise ValueError("Invalid JSON from LLM")
+
+
+class Command(BaseCommand):
+    help = "Compare the LLM JSON extractor with the previous regex cascade on malformed responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", default=None, help="JSON Lines file of raw LLM responses (one JSON string per line).")
+        parser.add_argument("--repeat", type=int, default=200, help="Parses per sample and parser.")
+
+    def _load_corpus(self, path):
+        with open(path, encoding="utf-8") as handle:
+            return {f"line_{number}": json.loads(line) for number, line in enumerate(handle, start=1) if line.strip()}
+
+    def _measure(self, parser, text, repeat):
+        try:
+            parser(text)
+            outcome = "ok"
+        except ValueError as exc:
+            outcome = str(exc)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            try:
+                parser(text)
+            except ValueError:
+                pass
+        return outcome, (time.perf_counter() - started) / repeat * 1e6
+
+    def handle(self, *args, **options):
+        corpus = self._load_corpus(options["corpus"]) if options["corpus"] else CORPUS
+        repeat = max(1, options["repeat"])
+        totals = {"legacy": 0.0, "extractor": 0.0}
+
+        self.stdout.write(f"{'sample':<18} {'chars':>7} {'legacy us':>10} {'new us':>10}  result (legacy / new)")
+        for name, text in corpus.items():
+            legacy, legacy_us = self._measure(legacy_parse_llm_json, text, repeat)
+            new, new_us = self._measure(extract_json, text, repeat)
+            totals["legacy"] += legacy_us
+            totals["extractor"] += new_us
+            self.stdout.write(f"{name:<18} {len(text):>7} {legacy_us:>10.1f} {new_us:>10.1f}  {legacy} / {new}")
+
+        self.stdout.write(f"{'total':<18} {'':>7} {totals['legacy']:>10.1f} {totals['extractor']:>10.1f}")
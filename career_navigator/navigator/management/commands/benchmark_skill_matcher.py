@@ -0,0 +1,82 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from navigator.services.skill_matcher import KEYWORD_SKILLS, SkillMatcher
+
+SYLLABLES = ["da", "ta", "py", "ko", "lin", "rex", "sql", "net", "flo", "gra", "ph", "qu", "ery", "vue", "ops", "ml"]
+FILLER = (
+    "Built and maintained internal dashboards, worked with stakeholders to define metrics, "
+    "mentored two interns and shipped features on a weekly release cadence. "
+)
+
+
+def legacy_find(vocabulary, text):
+    """
+    The previous per-keyword search, kept here as the benchmark baseline.
+    """
+
+    text = text.lower()
+    found = {category: set() for category in vocabulary}
+    for category, candidates in vocabulary.items():
+        for candidate in candidates:
+            pattern = rf"\b{re.escape(candidate)}\b"
+            if re.search(pattern, text):
+                found[category].add(candidate.title())
+    return found
+
+
+def synthetic_vocabulary(size, rng):
+    vocabulary = {category: list(keywords) for category, keywords in KEYWORD_SKILLS.items()}
+    categories = list(vocabulary)
+    seen = {keyword for keywords in vocabulary.values() for keyword in keywords}
+    while len(seen) < size:
+        words = ["".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(rng.choice([1, 1, 2, 3]))]
+        keyword = " ".join(words)
+        if keyword not in seen:
+            seen.add(keyword)
+            vocabulary[rng.choice(categories)].append(keyword)
+    return vocabulary
+
+
+def synthetic_text(vocabulary, length, rng):
+    keywords = [keyword for keywords in vocabulary.values() for keyword in keywords]
+    parts, size = [], 0
+    while size < length:
+        part = FILLER if rng.random() < 0.7 else f"Used {rng.choice(keywords).title()} in production. "
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+
+class Command(BaseCommand):
+    help = "Compare the compiled skill matcher with the previous per-keyword search as the vocabulary grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="38,500,2000,5000", help="Comma-separated vocabulary sizes.")
+        parser.add_argument("--chars", type=int, default=8000, help="Length of the synthetic resume text.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per size and matcher.")
+
+    def _time(self, func, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        return result, (time.perf_counter() - started) / repeat * 1e3
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        repeat = max(1, options["repeat"])
+
+        self.stdout.write(f"{'keywords':>8} {'build ms':>9} {'legacy ms':>10} {'matcher ms':>11}  same result")
+        for size in (int(value) for value in options["sizes"].split(",")):
+            vocabulary = synthetic_vocabulary(size, rng)
+            text = synthetic_text(vocabulary, options["chars"], rng)
+
+            matcher, build_ms = self._time(lambda: SkillMatcher(vocabulary), 1)
+            legacy, legacy_ms = self._time(lambda: legacy_find(vocabulary, text), repeat)
+            found, matcher_ms = self._time(lambda: matcher.find(text), repeat)
+            self.stdout.write(
+                f"{len(matcher):>8} {build_ms:>9.1f} {legacy_ms:>10.2f} {matcher_ms:>11.2f}  {legacy == found}"
+            )
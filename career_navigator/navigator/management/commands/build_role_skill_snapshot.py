@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from navigator.services.dataset_loader import load_job_dataset, get_dataset_fingerprint
+from navigator.services.role_data import ROLE_SKILL_FALLBACK
+from navigator.services.role_skill_extractor import (
+    SNAPSHOT_VERSION,
+    extract_skills_from_postings,
+    get_role_postings,
+    get_snapshot_path,
+    postings_hash,
+    read_snapshot,
+    role_key,
+)
+
+
+class Command(BaseCommand):
+    help = "Batch-extract role skills into a versioned snapshot that workers load at startup."
+
+    def add_arguments(self, parser):
+        parser.add_argument("roles", nargs="*", help="Roles to extract (default: the fallback role catalogue).")
+        parser.add_argument("--from-dataset", action="store_true", help="Extract every dataset title with enough postings.")
+        parser.add_argument("--min-postings", type=int, default=20, help="Minimum postings per title with --from-dataset.")
+        parser.add_argument("--max-roles", type=int, default=None, help="Cap the number of dataset titles.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Parallel LLM extractions.")
+        parser.add_argument("--output", default=None, help="Snapshot path (default: ROLE_SKILL_SNAPSHOT_PATH).")
+        parser.add_argument("--full", action="store_true", help="Re-extract every role, even if its postings are unchanged.")
+
+    def _dataset_roles(self, min_postings, max_roles):
+        titles = load_job_dataset().title_series().dropna().astype(str).map(role_key)
+        counts = titles[titles != ""].value_counts()
+        counts = counts[counts >= min_postings]
+        if max_roles:
+            counts = counts.head(max_roles)
+        return list(counts.index)
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        if options["roles"]:
+            roles = options["roles"]
+        elif options["from_dataset"]:
+            roles = self._dataset_roles(options["min_postings"], options["max_roles"])
+        else:
+            roles = [role for role in ROLE_SKILL_FALLBACK if role != "default"]
+
+        roles = list({role_key(role): role for role in roles if role_key(role)}.items())
+        path = Path(options["output"] or get_snapshot_path())
+        previous = {} if options["full"] else (read_snapshot(path) or {}).get("roles", {})
+        entries = dict(previous)
+
+        self.stdout.write(f"Extracting skills for {len(roles)} roles with concurrency {options['concurrency']}")
+        started = time.monotonic()
+
+        def build(key, role):
+            descriptions = get_role_postings(role)
+            digest = postings_hash(descriptions)
+            cached = previous.get(key)
+            if cached and cached.get("postings_hash") == digest:
+                return key, cached, "unchanged"
+            skills = extract_skills_from_postings(descriptions)
+            if isinstance(skills, dict) and skills.get("error"):
+                return key, None, skills["error"]
+            return key, {"role": role, "postings_hash": digest, "skills": skills, "built_at": time.time()}, "extracted"
+
+        counts = {"extracted": 0, "unchanged": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            futures = [executor.submit(build, key, role) for key, role in roles]
+            for future in as_completed(futures):
+                try:
+                    key, entry, status = future.result()
+                except Exception as exc:
+                    counts["failed"] += 1
+                    self.stderr.write(f"  failed: {exc}")
+                    continue
+                if entry is None:
+                    counts["failed"] += 1
+                    self.stderr.write(f"  {key}: {status}")
+                    continue
+                entries[key] = entry
+                counts[status] += 1
+
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "built_at": time.time(),
+            "dataset_fingerprint": get_dataset_fingerprint(),
+            "roles": entries,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(entries)} roles to {path} in {time.monotonic() - started:.1f}s "
+            f"(extracted={counts['extracted']}, unchanged={counts['unchanged']}, failed={counts['failed']})"
+        ))
@@ -0,0 +1,52 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from navigator.services.dataset_loader import load_job_dataset
+from navigator.services.local_planner import build_skill_graph, get_graph_path
+
+
+class Command(BaseCommand):
+    help = "Mine the skill prerequisite graph the local planner schedules roadmaps with."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-support", type=int, default=20, help="Postings that must name both skills.")
+        parser.add_argument("--min-confidence", type=float, default=0.5, help="Share of the later skill's postings that also name the prerequisite.")
+        parser.add_argument("--max-prerequisites", type=int, default=3, help="Prerequisites kept per skill.")
+        parser.add_argument("--limit", type=int, default=None, help="Only mine the first N postings.")
+        parser.add_argument("--output", default=None, help="Graph path (default: SKILL_GRAPH_PATH).")
+
+    def handle(self, *args, **options):
+        if not 0 < options["min_confidence"] <= 1:
+            raise CommandError("--min-confidence must be in (0, 1]")
+
+        store = load_job_dataset()
+        if not len(store):
+            raise CommandError("The job dataset is empty or could not be loaded.")
+
+        column = store.table.column("description")
+        if options["limit"]:
+            column = column.slice(0, options["limit"])
+
+        def descriptions():
+            for chunk in column.chunks:
+                yield from chunk.to_pylist()
+
+        self.stdout.write(f"Mining {len(column)} postings")
+        started = time.monotonic()
+        graph = build_skill_graph(
+            descriptions(),
+            fingerprint=store.fingerprint,
+            min_support=options["min_support"],
+            min_confidence=options["min_confidence"],
+            max_prerequisites=options["max_prerequisites"],
+        )
+        path = Path(options["output"] or get_graph_path())
+        graph.save(path)
+
+        stats = graph.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {stats['edges']} prerequisite edges over {stats['skills']} skills to {path} "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
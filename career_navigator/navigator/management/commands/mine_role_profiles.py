@@ -0,0 +1,81 @@
+import os
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from navigator.services.dataset_loader import load_job_dataset
+from navigator.services.role_profiles import (
+    CATEGORIES,
+    get_profiles_path,
+    mine_role_profiles,
+    profile_agreement,
+    role_skill_lists,
+    role_vocabulary,
+    write_role_profiles,
+)
+from navigator.services.role_skill_extractor import ROLE_SKILL_SNAPSHOT, load_role_skill_snapshot
+
+
+class Command(BaseCommand):
+    help = "Mine ranked per-role skill profiles from the job postings without the LLM."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-postings", type=int, default=20, help="Minimum postings per role title.")
+        parser.add_argument("--min-share", type=float, default=0.05, help="Minimum share of a role's postings naming a skill.")
+        parser.add_argument("--workers", type=int, default=None, help="Matching processes (default: all cores).")
+        parser.add_argument("--limit", type=int, default=None, help="Only mine the first N postings.")
+        parser.add_argument("--output", default=None, help="Profiles path (default: ROLE_PROFILES_PATH).")
+        parser.add_argument("--compare", action="store_true", help="Report how much of the LLM snapshot the profiles confirm.")
+
+    def _compare(self, profiles):
+        load_role_skill_snapshot()
+        totals = {category: [] for category in CATEGORIES}
+        for key, skills in ROLE_SKILL_SNAPSHOT.items():
+            if key not in profiles or not isinstance(skills, dict) or skills.get("error"):
+                continue
+            for category, share in profile_agreement(skills, profiles[key]["skills"]).items():
+                if share is not None:
+                    totals[category].append(share)
+
+        compared = max((len(shares) for shares in totals.values()), default=0)
+        self.stdout.write(f"Compared {compared} snapshot roles with their mined profiles:")
+        for category, shares in totals.items():
+            mean = sum(shares) / len(shares) if shares else 0.0
+            self.stdout.write(f"  {category}: {mean:.1%} of LLM-listed skills confirmed")
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        store = load_job_dataset()
+        if not len(store):
+            raise CommandError("The job dataset is empty or could not be loaded.")
+
+        table = store.table
+        if options["limit"]:
+            table = table.slice(0, options["limit"])
+        titles = table.column("title").to_pylist()
+        descriptions = table.column("description").to_pylist()
+
+        workers = options["workers"] or os.cpu_count() or 1
+        self.stdout.write(f"Mining {len(descriptions)} postings with {workers} workers")
+        started = time.monotonic()
+        role_lists = role_skill_lists()
+        profiles = mine_role_profiles(
+            titles,
+            descriptions,
+            role_vocabulary(role_lists),
+            role_lists=role_lists,
+            min_postings=options["min_postings"],
+            min_share=options["min_share"],
+            workers=workers,
+        )
+        path = Path(options["output"] or get_profiles_path())
+        write_role_profiles(profiles, path, fingerprint=store.fingerprint, postings=len(descriptions))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(profiles)} role profiles to {path} in {time.monotonic() - started:.1f}s"
+        ))
+        if options["compare"]:
+            self._compare(profiles)
@@ -0,0 +1,41 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from navigator.services.jobs import JobRunner, SQLiteJobStore, build_job_store, job_lease
+from navigator.views import run_analysis_job
+
+
+class Command(BaseCommand):
+    help = "Run queued analysis jobs from the shared SQLite job queue (JOB_QUEUE_BACKEND=sqlite)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4, help="Jobs run at the same time.")
+        parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between checks of an empty queue.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        store = build_job_store()
+        if not isinstance(store, SQLiteJobStore):
+            raise CommandError("Set JOB_QUEUE_BACKEND=sqlite; the memory queue is only visible to its own process.")
+
+        runner = JobRunner(store, run_analysis_job, max_workers=1, lease=job_lease())
+        self.stdout.write(f"Running analysis jobs from {store.path} with concurrency {options['concurrency']}")
+        with ThreadPoolExecutor(max_workers=options["concurrency"], thread_name_prefix="analysis-worker") as executor:
+            running = set()
+            while True:
+                running = {future for future in running if not future.done()}
+                # Jobs whose worker died go back in the queue and are claimed below like new ones.
+                store.requeue_stale(runner.lease)
+                job_id = store.claim_next() if len(running) < options["concurrency"] else None
+                if job_id:
+                    running.add(executor.submit(runner.run, job_id))
+                    self.stdout.write(f"Started job {job_id}")
+                    continue
+                if options["once"] and not running:
+                    return
+                time.sleep(options["poll_interval"])
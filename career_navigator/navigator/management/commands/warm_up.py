@@ -0,0 +1,34 @@
+import importlib
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from navigator.services.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Preload the job dataset, title index, role snapshot and client pools, and report how long each took."
+
+    def _import_time(self, module):
+        if module in sys.modules:
+            return None
+        started = time.perf_counter()
+        importlib.import_module(module)
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        import_seconds = self._import_time("navigator.views")
+        if import_seconds is None:
+            self.stdout.write("import navigator.views: already imported")
+        else:
+            self.stdout.write(f"import navigator.views: {import_seconds * 1000:.0f} ms")
+
+        total = 0.0
+        for step, result in warm_up().items():
+            if isinstance(result, str):
+                self.stdout.write(self.style.WARNING(f"{step}: {result}"))
+                continue
+            total += result
+            self.stdout.write(f"{step}: {result * 1000:.0f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Warm-up finished in {total * 1000:.0f} ms"))
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Analysis',
+            fields=[
+                ('id', models.CharField(editable=False, max_length=32, primary_key=True, serialize=False)),
+                ('input_hash', models.CharField(max_length=64)),
+                ('dream_role', models.CharField(max_length=200)),
+                ('experience_level', models.CharField(max_length=50)),
+                ('hours_per_day', models.PositiveSmallIntegerField(default=2)),
+                ('github_username', models.CharField(blank=True, default='', max_length=100)),
+                ('alignment_score', models.FloatField()),
+                ('missing_skills', models.JSONField(default=dict)),
+                ('completed_skills', models.JSONField(default=list)),
+                ('response', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['input_hash', '-created_at'], name='analysis_input_recent')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoleSkillSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role_key', models.CharField(max_length=200)),
+                ('technical', models.JSONField(default=list)),
+                ('tools', models.JSONField(default=list)),
+                ('soft', models.JSONField(default=list)),
+                ('analysis', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='role_skill_set', to='navigator.analysis')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSkillSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('technical', models.JSONField(default=list)),
+                ('tools', models.JSONField(default=list)),
+                ('soft', models.JSONField(default=list)),
+                ('experience_level', models.CharField(default='Intermediate', max_length=50)),
+                ('analysis', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='user_skill_set', to='navigator.analysis')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoadmapWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('week', models.CharField(max_length=20)),
+                ('focus', models.TextField(blank=True, null=True)),
+                ('tasks', models.JSONField(default=list)),
+                ('project', models.TextField(blank=True, null=True)),
+                ('checkpoint', models.TextField(blank=True, null=True)),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roadmap_weeks', to='navigator.analysis')),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('analysis', 'position'), name='roadmap_week_unique_position')],
+            },
+        ),
+    ]
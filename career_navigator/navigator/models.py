@@ -0,0 +1,68 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Analysis(models.Model):
+    """
+    One analysis run, looked up by the hash of its normalized inputs so an
+    unchanged resubmission can be answered from `response`.
+    """
+
+    id = models.CharField(primary_key=True, max_length=32, editable=False)
+    input_hash = models.CharField(max_length=64)
+    dream_role = models.CharField(max_length=200)
+    experience_level = models.CharField(max_length=50)
+    hours_per_day = models.PositiveSmallIntegerField(default=2)
+    github_username = models.CharField(max_length=100, blank=True, default="")
+    alignment_score = models.FloatField()
+    missing_skills = models.JSONField(default=dict)
+    completed_skills = models.JSONField(default=list)
+    response = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["input_hash", "-created_at"], name="analysis_input_recent"),
+        ]
+
+
+class UserSkillSet(models.Model):
+    analysis = models.OneToOneField(Analysis, on_delete=models.CASCADE, related_name="user_skill_set")
+    technical = models.JSONField(default=list)
+    tools = models.JSONField(default=list)
+    soft = models.JSONField(default=list)
+    experience_level = models.CharField(max_length=50, default="Intermediate")
+
+
+class RoleSkillSet(models.Model):
+    analysis = models.OneToOneField(Analysis, on_delete=models.CASCADE, related_name="role_skill_set")
+    role_key = models.CharField(max_length=200)
+    technical = models.JSONField(default=list)
+    tools = models.JSONField(default=list)
+    soft = models.JSONField(default=list)
+
+
+class RoadmapWeek(models.Model):
+    analysis = models.ForeignKey(Analysis, on_delete=models.CASCADE, related_name="roadmap_weeks")
+    position = models.PositiveSmallIntegerField()
+    week = models.CharField(max_length=20)
+    focus = models.TextField(blank=True, null=True)
+    tasks = models.JSONField(default=list)
+    project = models.TextField(blank=True, null=True)
+    checkpoint = models.TextField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["analysis", "position"], name="roadmap_week_unique_position"),
+        ]
+
+    def as_item(self):
+        return {
+            "week": self.week,
+            "focus": self.focus,
+            "tasks": self.tasks,
+            "project": self.project,
+            "checkpoint": self.checkpoint,
+        }
@@ -0,0 +1,403 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .role_skill_extractor import role_key
+
+# -----------------------------
+# Persisted Analyses
+# -----------------------------
+
+CATEGORIES = ("technical", "tools", "soft")
+
+
+def analysis_input_hash(params):
+    """
+    sha256 of the normalized pipeline inputs: an unchanged resubmission hashes the same.
+    """
+
+    upload = params.get("resume_upload")
+    resume = params.get("resume_sha256") or (upload.sha256 if upload is not None else None)
+    if resume is None:
+        resume = hashlib.sha256(re.sub(r"\s+", " ", params.get("resume_text") or "").strip().encode()).hexdigest()
+    normalized = {
+        "resume": resume,
+        "github_username": (params.get("github_username") or "").strip().lower(),
+        "dream_role": role_key(params.get("dream_role")),
+        "experience_level": str(params.get("experience_level") or "").strip().lower(),
+        "hours_per_day": params.get("hours_per_day"),
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+def new_analysis_id():
+    return uuid.uuid4().hex
+
+
+def _reuse_max_age():
+    return int(os.getenv("ANALYSIS_REUSE_MAX_AGE", "86400"))
+
+
+def _record_rows(entry):
+    from ..models import Analysis, RoleSkillSet, UserSkillSet
+
+    record = entry["record"]
+    analysis = Analysis(
+        id=entry["id"],
+        input_hash=entry["input_hash"],
+        dream_role=record["dream_role"],
+        experience_level=record["experience_level"],
+        hours_per_day=record["hours_per_day"],
+        github_username=entry["github_username"],
+        alignment_score=record["alignment_score"],
+        missing_skills=record["missing_skills"],
+        completed_skills=record["completed_skills"],
+        response=entry["response"],
+        created_at=entry["created_at"],
+        updated_at=entry["created_at"],
+    )
+    user_skills = record["user_skills"]
+    role_skills = record["role_skills"]
+    return (
+        analysis,
+        UserSkillSet(
+            analysis_id=entry["id"],
+            experience_level=user_skills.get("experience_level") or "Intermediate",
+            **{category: user_skills.get(category) or [] for category in CATEGORIES},
+        ),
+        RoleSkillSet(
+            analysis_id=entry["id"],
+            role_key=role_key(record["dream_role"]),
+            **{category: role_skills.get(category) or [] for category in CATEGORIES},
+        ),
+        _week_rows(entry["id"], record["roadmap"]),
+    )
+
+
+def _week_rows(analysis_id, roadmap):
+    from ..models import RoadmapWeek
+
+    return [
+        RoadmapWeek(
+            analysis_id=analysis_id,
+            position=position,
+            week=item.get("week") or f"Week {position + 1}",
+            focus=item.get("focus"),
+            tasks=item.get("tasks") or [],
+            project=item.get("project"),
+            checkpoint=item.get("checkpoint"),
+        )
+        for position, item in enumerate(roadmap)
+    ]
+
+
+def write_analyses(entries, batch_size=500):
+    """
+    Insert a batch of analyses with one bulk insert per table.
+    """
+
+    from ..models import Analysis, RoadmapWeek, RoleSkillSet, UserSkillSet
+
+    rows = [_record_rows(entry) for entry in entries]
+    with transaction.atomic():
+        Analysis.objects.bulk_create([row[0] for row in rows], batch_size=batch_size)
+        UserSkillSet.objects.bulk_create([row[1] for row in rows], batch_size=batch_size)
+        RoleSkillSet.objects.bulk_create([row[2] for row in rows], batch_size=batch_size)
+        RoadmapWeek.objects.bulk_create([week for row in rows for week in row[3]], batch_size=batch_size)
+
+
+class AnalysisWriter:
+    """
+    Group commit: concurrent requests queue their analyses and a background
+    thread writes them in batches, one transaction per batch. Each request
+    waits until its own batch is written, so an analysis id is only handed out
+    once every worker process can read it.
+    """
+
+    def __init__(self, batch_size=100, interval=0.05):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.failed = 0
+        self._pending = OrderedDict()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def add(self, entry):
+        """
+        Queue an analysis and block until it is written; raises if it could not be stored.
+        """
+
+        entry = {**entry, "written": threading.Event(), "stored": False}
+        with self._cond:
+            self._pending[entry["id"]] = entry
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="analysis-writer", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+        if not entry["written"].wait(self.interval * 4 + 1):
+            # The writer thread is stuck or gone; write the batch from this request instead.
+            self.flush()
+            entry["written"].wait()
+        if not entry["stored"]:
+            raise RuntimeError(f"Analysis {entry['id']} could not be stored")
+
+    def get(self, analysis_id):
+        with self._cond:
+            return self._pending.get(analysis_id)
+
+    def find(self, input_hash, since):
+        with self._cond:
+            for entry in reversed(self._pending.values()):
+                if entry["input_hash"] == input_hash and entry["created_at"] >= since:
+                    return entry
+        return None
+
+    def _write(self, entries):
+        """
+        Write `entries`; returns the ids that could not be stored.
+        """
+
+        try:
+            write_analyses(entries)
+            return set()
+        except (IntegrityError, DataError):
+            # One bad row fails the whole batch; retry row by row so only that row is lost.
+            if len(entries) == 1:
+                self.failed += 1
+                return {entries[0]["id"]}
+            failed = set()
+            for entry in entries:
+                failed |= self._write([entry])
+            return failed
+        except Exception:
+            self.failed += len(entries)
+            return {entry["id"] for entry in entries}
+
+    def flush(self):
+        with self._flush_lock:
+            with self._cond:
+                entries = list(self._pending.values())
+            if not entries:
+                return 0
+            failed = self._write(entries)
+            with self._cond:
+                for entry in entries:
+                    if self._pending.get(entry["id"]) is entry:
+                        del self._pending[entry["id"]]
+            for entry in entries:
+                entry["stored"] = entry["id"] not in failed
+                entry["written"].set()
+            return len(entries)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pending) >= self.batch_size, timeout=self.interval)
+            close_old_connections()
+            self.flush()
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return {"pending": pending, "failed": self.failed}
+
+
+_writer = None
+_lock = threading.Lock()
+
+
+def write_behind_enabled():
+    return os.getenv("ANALYSIS_WRITE_BEHIND", "on").lower() not in ("0", "off", "false", "no")
+
+
+def get_analysis_writer():
+    global _writer
+
+    if _writer is None:
+        with _lock:
+            if _writer is None:
+                _writer = AnalysisWriter(
+                    batch_size=int(os.getenv("ANALYSIS_WRITE_BATCH", "100")),
+                    interval=float(os.getenv("ANALYSIS_WRITE_INTERVAL", "0.05")),
+                )
+                atexit.register(_writer.flush)
+    return _writer
+
+
+def save_analysis(analysis_id, params, record, response):
+    """
+    Persist an analysis, batched with concurrent ones unless ANALYSIS_WRITE_BEHIND=off.
+    Returns once the analysis is written.
+    """
+
+    entry = {
+        "id": analysis_id,
+        "input_hash": analysis_input_hash(params),
+        "github_username": (params.get("github_username") or "").strip(),
+        "record": record,
+        "response": response,
+        "created_at": timezone.now(),
+    }
+    if write_behind_enabled():
+        get_analysis_writer().add(entry)
+    else:
+        write_analyses([entry])
+    return analysis_id
+
+
+def _recent_source(input_hash, since):
+    """
+    `(record, response)` of the newest analysis with these inputs that nobody has re-planned, or None.
+    """
+
+    from ..models import Analysis
+
+    pending = get_analysis_writer().find(input_hash, since) if _writer is not None else None
+    if pending is not None and not pending["record"]["completed_skills"]:
+        return json.loads(json.dumps(pending["record"])), json.loads(json.dumps(pending["response"]))
+
+    rows = (
+        Analysis.objects.filter(input_hash=input_hash, created_at__gte=since)
+        .order_by("-created_at")
+        .values_list("id", "completed_skills")[:20]
+    )
+    for analysis_id, completed_skills in rows:
+        if completed_skills:
+            continue
+        record = get_analysis(analysis_id)
+        if record is not None:
+            response = Analysis.objects.filter(id=analysis_id).values_list("response", flat=True).first()
+            return record, response or {}
+    return None
+
+
+def find_recent_analysis(params):
+    """
+    A copy of the stored response for the same normalized inputs within
+    ANALYSIS_REUSE_MAX_AGE seconds (0 disables reuse), or None.
+
+    The copy is saved as a new analysis with its own id, so every submission
+    re-plans its own record; analyses that were already re-planned are never reused.
+    """
+
+    max_age = _reuse_max_age()
+    if max_age <= 0:
+        return None
+    source = _recent_source(analysis_input_hash(params), timezone.now() - timedelta(seconds=max_age))
+    if source is None:
+        return None
+
+    record, response = source
+    record.pop("roadmap_source", None)
+    analysis_id = new_analysis_id()
+    response["analysis_id"] = analysis_id
+    save_analysis(analysis_id, params, record, response)
+    return response
+
+
+def get_analysis(analysis_id):
+    """
+    The re-planning record for an analysis, or None.
+    """
+
+    from ..models import Analysis
+
+    if _writer is not None:
+        pending = _writer.get(analysis_id)
+        if pending is not None:
+            record = json.loads(json.dumps(pending["record"]))
+            record["roadmap_source"] = pending["response"].get("roadmap_source", "llm")
+            return record
+
+    analysis = (
+        Analysis.objects.select_related("user_skill_set", "role_skill_set")
+        .prefetch_related("roadmap_weeks")
+        .filter(id=analysis_id)
+        .first()
+    )
+    if analysis is None:
+        return None
+
+    user, role = analysis.user_skill_set, analysis.role_skill_set
+    return {
+        "dream_role": analysis.dream_role,
+        "experience_level": analysis.experience_level,
+        "hours_per_day": analysis.hours_per_day,
+        "user_skills": {
+            **{category: getattr(user, category) for category in CATEGORIES},
+            "experience_level": user.experience_level,
+        },
+        "role_skills": {category: getattr(role, category) for category in CATEGORIES},
+        "alignment_score": analysis.alignment_score,
+        "missing_skills": analysis.missing_skills,
+        "roadmap": [week.as_item() for week in analysis.roadmap_weeks.all()],
+        "completed_skills": analysis.completed_skills,
+        "roadmap_source": (analysis.response or {}).get("roadmap_source", "llm"),
+    }
+
+
+def put_analysis(analysis_id, record, response_updates=None):
+    """
+    Store a re-planned record over an existing analysis; `response_updates`
+    are merged into its stored response so the two never disagree.
+    """
+
+    from ..models import Analysis, RoadmapWeek, UserSkillSet
+
+    if _writer is not None and _writer.get(analysis_id) is not None:
+        _writer.flush()
+
+    user_skills = record["user_skills"]
+    with transaction.atomic():
+        analysis = Analysis.objects.select_for_update().filter(id=analysis_id).first()
+        if analysis is None:
+            return
+        analysis.alignment_score = record["alignment_score"]
+        analysis.missing_skills = record["missing_skills"]
+        analysis.completed_skills = record["completed_skills"]
+        analysis.response = {**(analysis.response or {}), **(response_updates or {})}
+        analysis.updated_at = timezone.now()
+        analysis.save(update_fields=[
+            "alignment_score", "missing_skills", "completed_skills", "response", "updated_at",
+        ])
+        UserSkillSet.objects.filter(analysis_id=analysis_id).update(
+            **{category: user_skills.get(category) or [] for category in CATEGORIES}
+        )
+        RoadmapWeek.objects.filter(analysis_id=analysis_id).delete()
+        RoadmapWeek.objects.bulk_create(_week_rows(analysis_id, record["roadmap"]))
+
+
+def put_roadmap(analysis_id, updates):
+    """
+    Swap a new roadmap into an analysis nobody has re-planned yet. `updates`
+    holds `roadmap` and the other response fields that change with it.
+    Returns False when the analysis is gone or has progress recorded.
+    """
+
+    from ..models import Analysis, RoadmapWeek
+
+    if _writer is not None and _writer.get(analysis_id) is not None:
+        _writer.flush()
+
+    with transaction.atomic():
+        analysis = Analysis.objects.select_for_update().filter(id=analysis_id).first()
+        if analysis is None or analysis.completed_skills:
+            return False
+        analysis.response = {**(analysis.response or {}), **updates}
+        analysis.updated_at = timezone.now()
+        analysis.save(update_fields=["response", "updated_at"])
+        RoadmapWeek.objects.filter(analysis_id=analysis_id).delete()
+        RoadmapWeek.objects.bulk_create(_week_rows(analysis_id, updates["roadmap"]))
+    return True
@@ -0,0 +1,207 @@
+import asyncio
+import os
+import threading
+import weakref
+from pathlib import Path
+
+import httpx
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+# -----------------------------
+# Process-wide Config and Client Registry
+# -----------------------------
+
+ENV_PATHS = [
+    Path(__file__).resolve().parents[2] / ".env",
+    Path(__file__).resolve().parents[3] / ".env",
+]
+
+_lock = threading.RLock()
+_config_loaded = False
+_owner_pid = None
+_sessions = {}
+_groq_clients = {}
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> ({name: client}, closer)
+
+
+def load_config(reload=False):
+    """
+    Read .env files into the environment once per process (or again on demand).
+    """
+
+    global _config_loaded
+
+    if _config_loaded and not reload:
+        return
+    with _lock:
+        if _config_loaded and not reload:
+            return
+        for env_path in ENV_PATHS:
+            if env_path.exists():
+                load_dotenv(dotenv_path=env_path, override=reload)
+        load_dotenv(override=reload)
+        _config_loaded = True
+
+
+def reload_config():
+    load_config(reload=True)
+
+
+def get_setting(name, default=None):
+    load_config()
+    return os.getenv(name, default)
+
+
+def get_timeout(name, default):
+    return float(get_setting(f"{name.upper()}_TIMEOUT", default))
+
+
+def _pool_size():
+    return int(get_setting("HTTP_POOL_SIZE", "20"))
+
+
+def _check_fork():
+    # Connection pools must not be shared with a forked child (e.g. gunicorn --preload).
+    global _owner_pid
+
+    pid = os.getpid()
+    if _owner_pid != pid:
+        _sessions.clear()
+        _groq_clients.clear()
+        _async_clients.clear()
+        _owner_pid = pid
+
+
+def get_http_session(name):
+    """
+    Keep-alive `requests` session shared by every request to one upstream.
+    """
+
+    with _lock:
+        _check_fork()
+        session = _sessions.get(name)
+        if session is None:
+            pool_size = _pool_size()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[name] = session
+        return session
+
+
+def get_groq_client():
+    api_key = get_setting("GROQ_API_KEY")
+    if not api_key:
+        return None
+
+    with _lock:
+        _check_fork()
+        client = _groq_clients.get(api_key)
+        if client is None:
+            from groq import Groq
+
+            pool_size = _pool_size()
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                timeout=get_timeout("groq", "45"),
+            )
+            client = Groq(api_key=api_key, http_client=http_client)
+            _groq_clients[api_key] = client
+        return client
+
+
+async def _aclose_all(clients):
+    # Newest first: an SDK client closes the httpx client it was built on.
+    while clients:
+        _, client = clients.popitem()
+        try:
+            await (getattr(client, "aclose", None) or client.close)()
+        except Exception:
+            pass
+
+
+async def _close_with_loop(clients):
+    try:
+        yield
+    finally:
+        await _aclose_all(clients)
+
+
+def _loop_clients(loop):
+    entry = _async_clients.get(loop)
+    if entry is None:
+        clients = {}
+        # asyncio.run() (and so every WSGI request Django runs on a fresh loop)
+        # finalizes live async generators before closing the loop, so starting
+        # this one here closes the loop's clients while their sockets can still
+        # be closed on it.
+        closer = _close_with_loop(clients)
+        try:
+            closer.__anext__().send(None)
+        except StopIteration:
+            pass
+        entry = _async_clients[loop] = (clients, closer)
+    return entry[0]
+
+
+def _loop_bound(name, factory):
+    # httpx.AsyncClient is bound to the event loop it was first used on, so each
+    # loop gets its own clients; under ASGI there is one loop per process.
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _check_fork()
+        clients = _loop_clients(loop)
+        client = clients.get(name)
+        if client is None:
+            client = clients[name] = factory()
+        return client
+
+
+def get_async_http_client(name, default_timeout="45"):
+    """
+    Keep-alive `httpx.AsyncClient` shared by every coroutine on the running loop.
+    """
+
+    def factory():
+        pool_size = _pool_size()
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=get_timeout(name, default_timeout),
+        )
+
+    return _loop_bound(name, factory)
+
+
+def get_async_groq_client():
+    api_key = get_setting("GROQ_API_KEY")
+    if not api_key:
+        return None
+
+    def factory():
+        from groq import AsyncGroq
+
+        return AsyncGroq(api_key=api_key, http_client=get_async_http_client("groq"))
+
+    return _loop_bound(f"groq-sdk:{api_key}", factory)
+
+
+def close_clients():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        for client in _groq_clients.values():
+            client.close()
+        _sessions.clear()
+        _groq_clients.clear()
+        loops = list(_async_clients.items())
+        _async_clients.clear()
+    for loop, (clients, _closer) in loops:
+        if loop.is_closed():
+            continue
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(_aclose_all(clients), loop)
+        else:
+            loop.run_until_complete(_aclose_all(clients))
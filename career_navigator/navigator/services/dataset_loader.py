@@ -1,30 +1,149 @@
 import os
-from datasets import load_dataset
-import pandas as pd
+import threading
+from pathlib import Path
 
-_dataset = None
-_dataframe = None
+import pyarrow as pa
 
-def load_job_dataset():
-    global _dataset, _dataframe
+from .llm_cache import DEFAULT_CACHE_DIR
+from .title_index import TitleIndex
+
+STORE_COLUMNS = ["title", "description"]
+
+_store = None
+_title_index = None
+_lock = threading.Lock()
+
+
+class JobPostingStore:
+    """
+    Title and description columns of the job dataset, memory-mapped from an
+    uncompressed Arrow IPC file. Worker processes on one host share its pages
+    through the OS page cache; `take` copies only the rows asked for.
+    """
+
+    def __init__(self, table, fingerprint=None, path=None):
+        self.table = table
+        self.fingerprint = fingerprint
+        self.path = path
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @classmethod
+    def open(cls, path, dataset_id):
+        """
+        Map a converted store, or return None if it is missing or from another dataset.
+        """
 
-    if _dataframe is None:
-        dataset_id = os.getenv("JOB_DATASET_ID", "xanderios/job-postings")
         try:
-            _dataset = load_dataset(dataset_id)
-            _dataframe = _dataset["train"].to_pandas()
-        except Exception:
-            _dataframe = pd.DataFrame(columns=["title", "description"])
+            table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        except (OSError, pa.ArrowInvalid):
+            return None
 
-    return _dataframe
+        metadata = table.schema.metadata or {}
+        if metadata.get(b"dataset_id", b"").decode() != dataset_id:
+            return None
+        fingerprint = metadata.get(b"fingerprint", b"").decode() or None
+        return cls(table, fingerprint=fingerprint, path=Path(path))
 
+    @classmethod
+    def empty(cls):
+        return cls(pa.table({column: pa.array([], type=pa.string()) for column in STORE_COLUMNS}))
 
-def get_role_descriptions(role_name, limit=50):
-    df = load_job_dataset()
+    def title_series(self):
+        return self.table.column("title").to_pandas()
+
+    def take(self, rows):
+        """
+        `(titles, descriptions)` lists for the given row ids, in that order.
+        """
+
+        subset = self.table.take(pa.array(rows, type=pa.int64()))
+        return subset.column("title").to_pylist(), subset.column("description").to_pylist()
+
+
+def _store_path():
+    return Path(os.getenv("JOB_STORE_PATH") or DEFAULT_CACHE_DIR / "job_postings.arrow")
+
+
+def _convert_dataset(dataset_id, path):
+    """
+    Download the dataset once and write its title/description columns to `path`.
+    """
+
+    from datasets import load_dataset
+
+    split = load_dataset(dataset_id)["train"]
+    table = split.data.table.select(STORE_COLUMNS)
+    table = table.replace_schema_metadata({
+        "dataset_id": dataset_id,
+        "fingerprint": getattr(split, "_fingerprint", None) or "",
+    })
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=65536)
+    os.replace(tmp_path, path)
 
-    filtered = df[df["title"].str.contains(role_name, case=False, na=False)]
-    filtered = filtered.head(limit)
 
-    descriptions = " ".join(filtered["description"].dropna().tolist())
+def _index_path(store):
+    if os.getenv("TITLE_INDEX_PERSIST", "1") == "0" or not store.fingerprint or store.path is None:
+        return None
+    return store.path.parent / f"title_index-{store.fingerprint}.pkl"
+
+
+def _build_title_index(store):
+    path = _index_path(store)
+
+    if path is not None:
+        index = TitleIndex.load(path, store.fingerprint)
+        if index is not None:
+            return index
+
+    index = TitleIndex.build(store.table.column("title").to_pylist(), fingerprint=store.fingerprint)
+    if path is not None:
+        try:
+            index.save(path)
+        except OSError:
+            pass
+    return index
+
+
+def load_job_dataset():
+    global _store, _title_index
+
+    if _store is None:
+        with _lock:
+            if _store is None:
+                dataset_id = os.getenv("JOB_DATASET_ID", "xanderios/job-postings")
+                path = _store_path()
+                try:
+                    store = JobPostingStore.open(path, dataset_id)
+                    if store is None:
+                        _convert_dataset(dataset_id, path)
+                        store = JobPostingStore.open(path, dataset_id)
+                    _title_index = _build_title_index(store)
+                except Exception:
+                    store = JobPostingStore.empty()
+                    _title_index = TitleIndex.build([])
+                _store = store
+
+    return _store
+
+
+def get_title_index():
+    load_job_dataset()
+    return _title_index
+
+
+def get_dataset_fingerprint():
+    return load_job_dataset().fingerprint
+
+
+def get_role_descriptions(role_name, limit=50):
+    rows = get_title_index().lookup(role_name)[:limit]
+    _, descriptions = load_job_dataset().take(rows)
 
-    return descriptions
+    return " ".join(description for description in descriptions if description is not None)
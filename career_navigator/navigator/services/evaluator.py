@@ -1,3 +1,6 @@
+import json
+import re
+
 from .gap_analyzer import calculate_alignment, identify_missing_skills
 from .skill_mapper import normalize_skills
 from .planner import generate_30_day_plan
@@ -76,3 +79,105 @@ def adaptive_replan(
         "updated_roadmap": new_plan
     }
 
+
+# -----------------------------
+# Incremental Re-planning
+# -----------------------------
+
+CATEGORIES = ("technical", "tools", "soft")
+
+
+def apply_completed_skills(completed_skills, current_user_skills, role_skills):
+    """
+    Add completed skills to the user's profile.
+    Role skills are matched case-insensitively into their own category; anything
+    else is recorded as technical, as `evaluate_progress` does.
+    """
+
+    completed = {}
+    for skill in completed_skills:
+        skill = str(skill).strip()
+        if skill:
+            completed.setdefault(skill.lower(), skill)
+
+    updated_user = {category: list(current_user_skills.get(category) or []) for category in CATEGORIES}
+    newly_completed = {category: [] for category in CATEGORIES}
+    matched = set()
+
+    for category in CATEGORIES:
+        held = {skill.lower() for skill in updated_user[category]}
+        for skill in role_skills.get(category) or []:
+            key = skill.lower()
+            if key in completed:
+                matched.add(key)
+                if key not in held:
+                    held.add(key)
+                    updated_user[category].append(skill)
+                    newly_completed[category].append(skill)
+
+    held = {skill.lower() for skill in updated_user["technical"]}
+    for key, skill in completed.items():
+        if key not in matched and key not in held:
+            updated_user["technical"].append(skill)
+
+    return updated_user, newly_completed
+
+
+def _mention_pattern(skills):
+    """
+    Regex for any of `skills` as a whole word, so "Git" does not match "GitHub" or "R" every "r".
+    A trailing "+" or "#" continues the word, so "C" does not match "C++" or "C#".
+    """
+
+    names = sorted({str(skill).strip() for skill in skills if str(skill).strip()}, key=len, reverse=True)
+    if not names:
+        return None
+    return re.compile(r"(?<!\w)(?:" + "|".join(re.escape(name) for name in names) + r")(?![\w+#])", re.IGNORECASE)
+
+
+def affected_weeks(plan, skills):
+    """
+    Weeks of `plan` whose content mentions any of `skills`.
+    """
+
+    pattern = _mention_pattern(skills)
+    if pattern is None:
+        return []
+    return [
+        week_key for week_key, content in plan.items()
+        if pattern.search(json.dumps(content, ensure_ascii=False))
+    ]
+
+
+def evaluate_completed_skills(completed_skills, current_user_skills, role_skills, plan):
+    """
+    The cheap half of a re-plan: new alignment and missing skills, plus the
+    roadmap weeks that mention a newly completed skill (the only ones that need rewriting).
+    """
+
+    updated_user, newly_completed = apply_completed_skills(completed_skills, current_user_skills, role_skills)
+    newly = [skill for category in CATEGORIES for skill in newly_completed[category]]
+
+    return {
+        "updated_user_skills": updated_user,
+        "newly_completed": newly_completed,
+        "new_alignment": calculate_alignment(updated_user, role_skills),
+        "remaining_missing": identify_missing_skills(updated_user, role_skills),
+        "affected_weeks": affected_weeks(plan, newly) if newly else [],
+    }
+
+
+def prune_completed_tasks(plan, weeks, skills):
+    """
+    Local patch for `weeks` when the planner is unavailable: tasks about completed skills are dropped.
+    """
+
+    pattern = _mention_pattern(skills)
+    patch = {}
+    for week_key in weeks:
+        content = dict(plan[week_key])
+        tasks = [task for task in content.get("tasks") or [] if pattern is None or not pattern.search(str(task))]
+        content["tasks"] = tasks or ["Apply your newly completed skills in the week's project"]
+        patch[week_key] = content
+    return patch
+
@@ -0,0 +1,369 @@
+import asyncio
+import json
+import sqlite3
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import urllib3
+from requests.exceptions import SSLError
+
+from .clients import get_async_http_client, get_http_session, get_setting, get_timeout
+from .llm_cache import DEFAULT_CACHE_DIR, reset_connections_on_fork
+from .single_flight import AsyncSingleFlight, SingleFlight
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# -----------------------------
+# GitHub Enrichment with ETag Revalidation
+# -----------------------------
+
+GITHUB_HEADERS = {"Accept": "application/vnd.github+json", "User-Agent": "career-navigator-local"}
+PER_PAGE = 100
+
+GITHUB_FLIGHT = SingleFlight()
+ASYNC_GITHUB_FLIGHT = AsyncSingleFlight()
+
+
+class GitHubCache:
+    """
+    Per-user repo pages (with their ETags) and the derived summary, shared by
+    every worker process on the host through SQLite.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        reset_connections_on_fork(self)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS github_cache ("
+            "username TEXT PRIMARY KEY, summary TEXT NOT NULL, pages TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, username):
+        row = self._connect().execute(
+            "SELECT summary, pages, fetched_at FROM github_cache WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"summary": json.loads(row[0]), "pages": json.loads(row[1]), "fetched_at": row[2]}
+
+    def set(self, username, summary, pages):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO github_cache (username, summary, pages, fetched_at) VALUES (?, ?, ?, ?)",
+            (username, json.dumps(summary), json.dumps(pages), time.time()),
+        )
+
+    def clear(self):
+        self._connect().execute("DELETE FROM github_cache")
+
+
+_cache = None
+_executor = None
+_revalidate_executor = None
+_lock = threading.Lock()
+_revalidating = set()
+
+
+def get_github_cache():
+    global _cache
+
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                path = get_setting("GITHUB_CACHE_PATH") or DEFAULT_CACHE_DIR / "github_cache.sqlite3"
+                _cache = GitHubCache(path)
+    return _cache
+
+
+def _get_executor():
+    """
+    Pool for single page fetches only; nothing running on it waits on other tasks.
+    """
+
+    global _executor
+
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                max_workers = int(get_setting("GITHUB_MAX_WORKERS", "8"))
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="github")
+    return _executor
+
+
+def _get_revalidate_executor():
+    """
+    Pool for background refreshes, which block on page fetches from `_get_executor()`;
+    sharing one bounded pool would let refreshes starve their own page fetches.
+    """
+
+    global _revalidate_executor
+
+    if _revalidate_executor is None:
+        with _lock:
+            if _revalidate_executor is None:
+                max_workers = int(get_setting("GITHUB_REVALIDATE_WORKERS", "2"))
+                _revalidate_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="github-revalidate")
+    return _revalidate_executor
+
+
+def _api_url():
+    # Point GITHUB_API_URL at a local stand-in server to exercise this module offline.
+    return get_setting("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+
+def _headers(etag=None, authorized=True):
+    # The token is never sent on a retry without certificate verification.
+    headers = dict(GITHUB_HEADERS)
+    token = get_setting("GITHUB_TOKEN") if authorized else None
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if etag:
+        headers["If-None-Match"] = etag
+    return headers
+
+
+def _page_url(username, page):
+    return f"{_api_url()}/users/{username}/repos?per_page={PER_PAGE}&page={page}"
+
+
+def _max_pages():
+    return int(get_setting("GITHUB_MAX_PAGES", "10"))
+
+
+def _ssl_fallback_enabled():
+    return get_setting("GITHUB_SSL_FALLBACK", "off").lower() in ("1", "on", "true", "yes")
+
+
+def _last_page(links):
+    url = (links or {}).get("last", {}).get("url")
+    if not url:
+        return None
+    try:
+        return int(parse_qs(urlparse(str(url)).query)["page"][0])
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+def _slim(repos):
+    # Only what the summary needs is kept in the cache.
+    return [{"language": repo.get("language"), "topics": repo.get("topics") or []} for repo in repos or []]
+
+
+def _summarize_repos(repos, username):
+    languages = {repo.get("language") for repo in repos if repo.get("language")}
+    topics = set()
+    for repo in repos:
+        for topic in repo.get("topics", []) or []:
+            topics.add(topic)
+    return {
+        "repoCount": len(repos),
+        "languages": list(languages),
+        "topics": list(topics),
+        "username": username,
+    }
+
+
+def _page_result(page, response, cached_pages):
+    """
+    `(page entry, last page)` from a response; a 304 reuses the cached entry.
+    """
+
+    if response.status_code == 304 and str(page) in cached_pages:
+        return cached_pages[str(page)], _last_page(response.links)
+    response.raise_for_status()
+    entry = {"etag": response.headers.get("ETag"), "repos": _slim(response.json())}
+    return entry, _last_page(response.links)
+
+
+def _merge(username, first, rest):
+    pages = {"1": first[0]}
+    for page, (entry, _) in rest:
+        pages[str(page)] = entry
+    repos = [repo for page in sorted(pages, key=int) for repo in pages[page]["repos"]]
+    return _summarize_repos(repos, username), pages
+
+
+def _page_count(first_last_page, cached_pages, first_response_status):
+    if first_last_page is not None:
+        return min(first_last_page, _max_pages())
+    if first_response_status == 304:
+        return min(max(len(cached_pages), 1), _max_pages())
+    return 1
+
+
+def _fetch_page(username, page, cached_pages):
+    session = get_http_session("github")
+    timeout = get_timeout("github", "10")
+    etag = (cached_pages.get(str(page)) or {}).get("etag")
+    url = _page_url(username, page)
+    try:
+        response = session.get(url, headers=_headers(etag), timeout=timeout)
+    except SSLError:
+        if not _ssl_fallback_enabled():
+            raise
+        response = session.get(url, headers=_headers(etag, authorized=False), timeout=timeout, verify=False)
+    return response
+
+
+def _refresh(username, cached_pages):
+    """
+    Revalidate every page: page 1 first (it reports the page count), the rest concurrently.
+    """
+
+    first_response = _fetch_page(username, 1, cached_pages)
+    first = _page_result(1, first_response, cached_pages)
+    last = _page_count(first[1], cached_pages, first_response.status_code)
+
+    futures = {
+        page: _get_executor().submit(_fetch_page, username, page, cached_pages)
+        for page in range(2, last + 1)
+    }
+    rest = [(page, _page_result(page, future.result(), cached_pages)) for page, future in futures.items()]
+
+    summary, pages = _merge(username, first, rest)
+    get_github_cache().set(username.lower(), summary, pages)
+    return summary
+
+
+def _is_ssl_error(exc):
+    while exc is not None:
+        if isinstance(exc, ssl.SSLError):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+async def _afetch_page(username, page, cached_pages):
+    client = get_async_http_client("github", default_timeout="10")
+    etag = (cached_pages.get(str(page)) or {}).get("etag")
+    url = _page_url(username, page)
+    try:
+        return await client.get(url, headers=_headers(etag))
+    except httpx.ConnectError as exc:
+        if not _is_ssl_error(exc) or not _ssl_fallback_enabled():
+            raise
+        async with httpx.AsyncClient(verify=False, timeout=get_timeout("github", "10")) as insecure:
+            return await insecure.get(url, headers=_headers(etag, authorized=False))
+
+
+async def _arefresh(username, cached_pages):
+    first_response = await _afetch_page(username, 1, cached_pages)
+    first = _page_result(1, first_response, cached_pages)
+    last = _page_count(first[1], cached_pages, first_response.status_code)
+
+    pages = list(range(2, last + 1))
+    responses = await asyncio.gather(*(_afetch_page(username, page, cached_pages) for page in pages))
+    rest = [(page, _page_result(page, response, cached_pages)) for page, response in zip(pages, responses)]
+
+    summary, merged = _merge(username, first, rest)
+    await asyncio.to_thread(_store_summary, username.lower(), summary, merged)
+    return summary
+
+
+def _cached_entry(key):
+    return get_github_cache().get(key)
+
+
+def _store_summary(key, summary, pages):
+    get_github_cache().set(key, summary, pages)
+
+
+def _freshness(entry):
+    """
+    "fresh", "stale" (serve and revalidate in the background) or "expired".
+    """
+
+    if entry is None:
+        return "expired"
+    age = time.time() - entry["fetched_at"]
+    if age < float(get_setting("GITHUB_CACHE_TTL", "600")):
+        return "fresh"
+    if age < float(get_setting("GITHUB_CACHE_STALE_TTL", "604800")):
+        return "stale"
+    return "expired"
+
+
+def _revalidate_in_background(username, cached_pages):
+    key = username.lower()
+    with _lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    def run():
+        try:
+            GITHUB_FLIGHT.do(key, lambda: _refresh(username, cached_pages))
+        except Exception:
+            pass
+        finally:
+            with _lock:
+                _revalidating.discard(key)
+
+    _get_revalidate_executor().submit(run)
+
+
+def fetch_github_summary(username):
+    """
+    Repo summary for a user: fresh cache hits are served directly, stale ones are
+    served while a background refresh revalidates them with conditional requests,
+    and a failed refresh falls back to any cached copy.
+    """
+
+    if not username:
+        return {}
+    username = username.strip()
+    entry = get_github_cache().get(username.lower())
+    state = _freshness(entry)
+    if state == "fresh":
+        return entry["summary"]
+    if state == "stale":
+        _revalidate_in_background(username, entry["pages"])
+        return entry["summary"]
+
+    cached_pages = entry["pages"] if entry else {}
+    try:
+        return GITHUB_FLIGHT.do(username.lower(), lambda: _refresh(username, cached_pages))
+    except Exception:
+        if entry is None:
+            raise
+        return entry["summary"]
+
+
+async def afetch_github_summary(username):
+    """
+    Async `fetch_github_summary`; the SQLite cache is read and written in worker threads.
+    """
+
+    if not username:
+        return {}
+    username = username.strip()
+    entry = await asyncio.to_thread(_cached_entry, username.lower())
+    state = _freshness(entry)
+    if state == "fresh":
+        return entry["summary"]
+    if state == "stale":
+        _revalidate_in_background(username, entry["pages"])
+        return entry["summary"]
+
+    cached_pages = entry["pages"] if entry else {}
+    try:
+        return await ASYNC_GITHUB_FLIGHT.do(username.lower(), lambda: _arefresh(username, cached_pages))
+    except Exception:
+        if entry is None:
+            raise
+        return entry["summary"]
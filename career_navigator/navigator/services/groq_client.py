@@ -1,33 +1,31 @@
-import os
+import asyncio
 import re
 import json
-import ast
-from pathlib import Path
-import requests
-from dotenv import load_dotenv
-from groq import Groq
-
-def _load_env():
-    for env_path in [
-        Path(__file__).resolve().parents[2] / ".env",
-        Path(__file__).resolve().parents[3] / ".env",
-    ]:
-        if env_path.exists():
-            load_dotenv(dotenv_path=env_path)
-    load_dotenv()
-
+from .clients import (
+    get_async_groq_client,
+    get_async_http_client,
+    get_groq_client,
+    get_http_session,
+    get_setting,
+    get_timeout,
+)
+from .hedging import ahedged_call, atimed_call, hedge_delay, hedged_call, timed_call
+from .llm_cache import LLMCache, get_llm_cache
+from .llm_json import extract_json
+from .provider_health import get_provider_health
+from .single_flight import AsyncSingleFlight, build_single_flight
+
+GROQ_MODEL = "llama-3.1-8b-instant"
+
+LLM_FLIGHT = build_single_flight()
+ASYNC_LLM_FLIGHT = AsyncSingleFlight()
 
 def _get_groq_client():
-    _load_env()
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        return None
-    return Groq(api_key=api_key)
+    return get_groq_client()
 
 
 def _get_gemini_key():
-    _load_env()
-    return os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    return get_setting("GEMINI_API_KEY") or get_setting("GOOGLE_API_KEY")
 
 
 def _strip_code_fences(text):
@@ -51,48 +49,16 @@ def _extract_gemini_text(response_json):
 
 
 def parse_llm_json(response_text):
-    cleaned = _strip_code_fences(response_text)
-
-    candidates = [cleaned]
-    fenced_blocks = re.findall(r"```(?:json)?\s*([\s\S]*?)\s*```", response_text or "", flags=re.IGNORECASE)
-    candidates.extend(block.strip() for block in fenced_blocks if block and block.strip())
-
-    json_objects = re.findall(r"\{[\s\S]*\}", cleaned)
-    candidates.extend(obj.strip() for obj in json_objects if obj and obj.strip())
-
-    if cleaned.startswith("[") and cleaned.endswith("]"):
-        candidates.append(cleaned)
-
-    for candidate in candidates:
-        if not candidate:
-            continue
-
-        normalized = candidate.strip()
-        normalized = normalized.replace("\u201c", '"').replace("\u201d", '"').replace("\u2018", "'").replace("\u2019", "'")
-        normalized = re.sub(r",\s*([}\]])", r"\1", normalized)
-
-        try:
-            return json.loads(normalized)
-        except json.JSONDecodeError:
-            pass
-
-        try:
-            parsed = ast.literal_eval(normalized)
-            if isinstance(parsed, (dict, list)):
-                return parsed
-        except (SyntaxError, ValueError):
-            pass
-
-    raise ValueError("Invalid JSON from LLM")
+    return extract_json(response_text)
 
 
-def _call_gemini(prompt, temperature):
+def _gemini_request(prompt, temperature):
     api_key = _get_gemini_key()
     if not api_key:
         raise ValueError("GEMINI_API_KEY not configured")
 
     model_candidates = []
-    configured_model = os.getenv("GEMINI_MODEL")
+    configured_model = get_setting("GEMINI_MODEL")
     if configured_model:
         model_candidates.append(configured_model)
     model_candidates.extend([
@@ -109,32 +75,153 @@ def _call_gemini(prompt, temperature):
         },
     }
 
-    last_error = "Unknown Gemini error"
-    for model in model_candidates:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-        response = requests.post(url, json=payload, timeout=45)
-        if response.ok:
+    health = get_provider_health()
+    if not health.allow("gemini"):
+        raise ValueError("Gemini API error: circuit open after repeated failures")
+
+    return api_key, health.order_models("gemini", model_candidates), payload
+
+
+def _gemini_url(model, api_key):
+    return f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+
+
+def _record_gemini_response(model, status_code, ok, body, rejected_models):
+    """
+    Update model health for one attempt.
+    Returns `(error, keep_trying)`; `error` is None on success.
+    """
+
+    health = get_provider_health()
+    if ok:
+        health.record_success("gemini", model)
+        # A 400 is only blamed on the model once another model accepted the same prompt.
+        for rejected in rejected_models:
+            health.mark_model_dead("gemini", rejected, "status=400")
+        return None, False
+
+    last_error = f"model={model}, status={status_code}, body={body[:200]}"
+    if status_code == 404:
+        health.mark_model_dead("gemini", model, "status=404")
+        return last_error, True
+    if status_code == 400:
+        rejected_models.append(model)
+        return last_error, True
+    health.record_failure("gemini")
+    return last_error, False
+
+
+def _call_gemini(prompt, temperature, cancel_event=None):
+    api_key, models, payload = _gemini_request(prompt, temperature)
+    session = get_http_session("gemini")
+    timeout = get_timeout("gemini", "45")
+    last_error = "no healthy Gemini model available"
+    rejected_models = []
+    for model in models:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ValueError("Gemini call cancelled")
+        try:
+            response = session.post(_gemini_url(model, api_key), json=payload, timeout=timeout)
+        except Exception:
+            get_provider_health().record_failure("gemini")
+            raise
+        error, keep_trying = _record_gemini_response(model, response.status_code, response.ok, response.text, rejected_models)
+        if error is None:
+            return _extract_gemini_text(response.json())
+        last_error = error
+        if not keep_trying:
+            break
+
+    raise ValueError(f"Gemini API error: {last_error}")
+
+
+async def _acall_gemini(prompt, temperature):
+    # Provider health lives in SQLite, so every health read and write runs off the event loop.
+    api_key, models, payload = await asyncio.to_thread(_gemini_request, prompt, temperature)
+    client = get_async_http_client("gemini")
+    last_error = "no healthy Gemini model available"
+    rejected_models = []
+    for model in models:
+        try:
+            response = await client.post(_gemini_url(model, api_key), json=payload)
+        except Exception:
+            await asyncio.to_thread(get_provider_health().record_failure, "gemini")
+            raise
+        error, keep_trying = await asyncio.to_thread(
+            _record_gemini_response, model, response.status_code, response.is_success, response.text, rejected_models
+        )
+        if error is None:
             return _extract_gemini_text(response.json())
-        last_error = f"model={model}, status={response.status_code}, body={response.text[:200]}"
-        if response.status_code not in (400, 404):
+        last_error = error
+        if not keep_trying:
             break
 
     raise ValueError(f"Gemini API error: {last_error}")
 
+
+def _provider_signature():
+    return f"gemini:{get_setting('GEMINI_MODEL') or 'default'}|groq:{GROQ_MODEL}"
+
+
 def call_llm(prompt, temperature=0.3):
     """
-    Central LLM call function (Gemini first, then Groq fallback)
+    Central LLM call function (Gemini first, then Groq fallback).
+    Responses are served from the content-addressed cache when possible.
     """
 
-    try:
-        return _call_gemini(prompt, temperature)
-    except Exception as gemini_error:
-        groq_client = _get_groq_client()
-        if not groq_client:
-            raise ValueError(str(gemini_error))
+    cache = get_llm_cache()
+    key = LLMCache.make_key(prompt, temperature, _provider_signature())
+    if cache is None:
+        return LLM_FLIGHT.do(key, lambda: _call_llm_uncached(prompt, temperature))
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    return LLM_FLIGHT.do(key, lambda: _call_llm_and_store(cache, key, prompt, temperature))
+
+
+def _call_llm_and_store(cache, key, prompt, temperature):
+    # Another process may have filled the shared cache while this one waited for the lease.
+    cached = cache.backend.get(key)
+    if cached is not None:
+        return cached
+
+    response = _call_llm_uncached(prompt, temperature)
+    if _is_valid_json(response):
+        cache.set(key, response)
+    return response
+
+
+async def acall_llm(prompt, temperature=0.3):
+    """
+    Async `call_llm` on the shared httpx.AsyncClient; same cache, health and hedging rules.
+    Cache tiers may be SQLite-backed, so cache reads and writes run in worker threads.
+    """
+
+    cache = get_llm_cache()
+    key = LLMCache.make_key(prompt, temperature, _provider_signature())
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
+
+    async def compute():
+        response = await _acall_llm_uncached(prompt, temperature)
+        if cache is not None and _is_valid_json(response):
+            await asyncio.to_thread(cache.set, key, response)
+        return response
 
-    request_payload = {
-        "model": "llama-3.1-8b-instant",
+    return await ASYNC_LLM_FLIGHT.do(key, compute)
+
+
+def _groq_request(prompt, temperature):
+    health = get_provider_health()
+    if not health.allow("groq"):
+        raise ValueError("Groq API error: circuit open after repeated failures")
+
+    return {
+        "model": GROQ_MODEL,
         "messages": [
             {
                 "role": "system",
@@ -148,16 +235,291 @@ def call_llm(prompt, temperature=0.3):
         "temperature": temperature,
     }
 
+
+def _call_groq(prompt, temperature, groq_client):
+    request_payload = _groq_request(prompt, temperature)
+    health = get_provider_health()
+
     try:
-        response = groq_client.chat.completions.create(
-            **request_payload,
-            response_format={"type": "json_object"},
-        )
+        try:
+            response = groq_client.chat.completions.create(
+                **request_payload,
+                response_format={"type": "json_object"},
+            )
+        except Exception:
+            response = groq_client.chat.completions.create(**request_payload)
+    except Exception:
+        health.record_failure("groq")
+        raise
+
+    health.record_success("groq", GROQ_MODEL)
+    return response.choices[0].message.content
+
+
+async def _acall_groq(prompt, temperature, groq_client):
+    request_payload = await asyncio.to_thread(_groq_request, prompt, temperature)
+    health = get_provider_health()
+
+    try:
+        try:
+            response = await groq_client.chat.completions.create(
+                **request_payload,
+                response_format={"type": "json_object"},
+            )
+        except Exception:
+            response = await groq_client.chat.completions.create(**request_payload)
     except Exception:
-        response = groq_client.chat.completions.create(**request_payload)
+        await asyncio.to_thread(health.record_failure, "groq")
+        raise
 
+    await asyncio.to_thread(health.record_success, "groq", GROQ_MODEL)
     return response.choices[0].message.content
 
 
+def _is_valid_json(response):
+    try:
+        parse_llm_json(response)
+    except ValueError:
+        return False
+    return True
+
+
+def _hedging_enabled():
+    # Off by default: a hedged call can pay for a request to both providers (see hedged_call).
+    return get_setting("LLM_HEDGING", "off").lower() in ("1", "on", "true", "yes")
+
+
+def _call_llm_hedged(prompt, temperature):
+    groq_client = _get_groq_client()
+    secondary = None
+    if groq_client:
+        secondary = ("groq", lambda cancel_event: _call_groq(prompt, temperature, groq_client))
+
+    try:
+        return hedged_call(
+            ("gemini", lambda cancel_event: _call_gemini(prompt, temperature, cancel_event)),
+            secondary,
+            delay=hedge_delay("gemini"),
+            is_valid=_is_valid_json,
+        )
+    except Exception as exc:
+        if secondary is None:
+            raise ValueError(str(exc))
+        raise
+
+
+def _call_llm_uncached(prompt, temperature):
+    if _hedging_enabled():
+        return _call_llm_hedged(prompt, temperature)
+
+    try:
+        return timed_call("gemini", _call_gemini, prompt, temperature)
+    except Exception as gemini_error:
+        groq_client = _get_groq_client()
+        if not groq_client:
+            raise ValueError(str(gemini_error))
+
+    return timed_call("groq", _call_groq, prompt, temperature, groq_client)
+
+
+async def _acall_llm_uncached(prompt, temperature):
+    groq_client = get_async_groq_client()
+
+    if _hedging_enabled():
+        secondary = None
+        if groq_client:
+            secondary = ("groq", lambda: _acall_groq(prompt, temperature, groq_client))
+        try:
+            return await ahedged_call(
+                ("gemini", lambda: _acall_gemini(prompt, temperature)),
+                secondary,
+                delay=hedge_delay("gemini"),
+                is_valid=_is_valid_json,
+            )
+        except Exception as exc:
+            if secondary is None:
+                raise ValueError(str(exc))
+            raise
+
+    try:
+        return await atimed_call("gemini", _acall_gemini(prompt, temperature))
+    except Exception as gemini_error:
+        if not groq_client:
+            raise ValueError(str(gemini_error))
+
+    return await atimed_call("groq", _acall_groq(prompt, temperature, groq_client))
+
+
 def call_groq(prompt, temperature=0.3):
-    return call_llm(prompt, temperature)
\ No newline at end of file
+    return call_llm(prompt, temperature)
+
+
+# -----------------------------
+# Streaming
+# -----------------------------
+
+
+def _gemini_stream_url(model, api_key):
+    return f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
+
+
+def _stream_gemini(prompt, temperature):
+    api_key, models, payload = _gemini_request(prompt, temperature)
+    session = get_http_session("gemini")
+    timeout = get_timeout("gemini", "45")
+    last_error = "no healthy Gemini model available"
+    rejected_models = []
+    health = get_provider_health()
+    for model in models:
+        try:
+            response = session.post(_gemini_stream_url(model, api_key), json=payload, timeout=timeout, stream=True)
+        except Exception:
+            health.record_failure("gemini")
+            raise
+
+        with response:
+            if not response.ok:
+                error, keep_trying = _record_gemini_response(model, response.status_code, False, response.text, rejected_models)
+                last_error = error
+                if keep_trying:
+                    continue
+                break
+
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[5:])
+                    for candidate in event.get("candidates") or []:
+                        for part in ((candidate or {}).get("content") or {}).get("parts") or []:
+                            text = (part or {}).get("text")
+                            if text:
+                                yield text
+            except Exception:
+                health.record_failure("gemini")
+                raise
+            _record_gemini_response(model, response.status_code, True, "", rejected_models)
+            return
+
+    raise ValueError(f"Gemini API error: {last_error}")
+
+
+def _stream_groq(prompt, temperature, groq_client):
+    request_payload = _groq_request(prompt, temperature)
+    health = get_provider_health()
+
+    try:
+        try:
+            stream = groq_client.chat.completions.create(
+                **request_payload,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+        except Exception:
+            stream = groq_client.chat.completions.create(**request_payload, stream=True)
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception:
+        health.record_failure("groq")
+        raise
+
+    health.record_success("groq", GROQ_MODEL)
+
+
+def stream_llm(prompt, temperature=0.3):
+    """
+    `call_llm` as a generator of text chunks (Gemini first, then Groq if Gemini
+    fails before producing any text). A cached response is yielded whole, and a
+    complete valid response is cached for later calls.
+    """
+
+    cache = get_llm_cache()
+    key = LLMCache.make_key(prompt, temperature, _provider_signature())
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    received = []
+    try:
+        for chunk in _stream_gemini(prompt, temperature):
+            received.append(chunk)
+            yield chunk
+    except Exception as gemini_error:
+        groq_client = _get_groq_client()
+        if received or not groq_client:
+            raise ValueError(str(gemini_error))
+        for chunk in _stream_groq(prompt, temperature, groq_client):
+            received.append(chunk)
+            yield chunk
+
+    response = "".join(received)
+    if cache is not None and _is_valid_json(response):
+        cache.set(key, response)
+
+
+def iter_json_members(chunks):
+    """
+    Incrementally scan a streamed JSON object and yield `(key, value)` for each
+    top-level member as soon as its value is complete. Text before the first `{`
+    (code fences, prose) is skipped; each value is parsed with `parse_llm_json`.
+    """
+
+    depth = 0
+    in_string = escaped = False
+    key = None
+    key_start = value_start = None
+    buffer = []
+
+    def member(end):
+        raw = "".join(buffer[value_start:end]).strip()
+        try:
+            return key, parse_llm_json(raw) if raw[:1] in "{[" else json.loads(raw)
+        except ValueError:
+            return key, raw
+
+    for chunk in chunks:
+        for char in chunk:
+            if depth == 0:
+                if char == "{":
+                    depth = 1
+                    buffer = []
+                continue
+
+            buffer.append(char)
+            position = len(buffer) - 1
+
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    if depth == 1 and key is None and value_start is None:
+                        key = "".join(buffer[key_start + 1:position])
+                continue
+
+            if char == '"':
+                in_string = True
+                if depth == 1 and key is None and value_start is None:
+                    key_start = position
+            elif char == ":" and depth == 1 and key is not None and value_start is None:
+                value_start = position + 1
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 1 and value_start is not None:
+                    yield member(position + 1)
+                    key = value_start = None
+                elif depth == 0:
+                    if value_start is not None and "".join(buffer[value_start:position]).strip():
+                        yield member(position)
+                    return
+            elif char == "," and depth == 1:
+                if value_start is not None:
+                    yield member(position)
+                key = value_start = None
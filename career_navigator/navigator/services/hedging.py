@@ -0,0 +1,217 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# -----------------------------
+# Provider Latency Tracking and Hedged Calls
+# -----------------------------
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies per provider.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, name, pct):
+        with self._lock:
+            samples = sorted(self._samples.get(name) or [])
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def count(self, name):
+        with self._lock:
+            return len(self._samples.get(name) or [])
+
+    def stats(self):
+        with self._lock:
+            names = list(self._samples)
+        return {
+            name: {
+                "samples": self.count(name),
+                "p50": self.percentile(name, 50),
+                "p95": self.percentile(name, 95),
+            }
+            for name in names
+        }
+
+
+LATENCY = LatencyTracker()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Separate from the pipeline pool so stages waiting on an LLM call never starve it.
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = int(os.getenv("LLM_HEDGE_MAX_WORKERS", "32"))
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+    return _executor
+
+
+def timed_call(name, func, *args, **kwargs):
+    started = time.monotonic()
+    result = func(*args, **kwargs)
+    LATENCY.record(name, time.monotonic() - started)
+    return result
+
+
+def hedge_delay(primary_name):
+    """
+    Explicit LLM_HEDGE_DELAY, else the primary's observed p95 once enough samples exist.
+    """
+
+    configured = os.getenv("LLM_HEDGE_DELAY")
+    if configured:
+        return float(configured)
+
+    min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    p95 = LATENCY.percentile(primary_name, 95)
+    if p95 is None or LATENCY.count(primary_name) < min_samples:
+        return float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "3"))
+    return min(max(p95, 0.5), float(os.getenv("LLM_HEDGE_MAX_DELAY", "15")))
+
+
+def hedged_call(primary, secondary, delay, is_valid=None):
+    """
+    Run `primary`, and `secondary` too if the primary has not produced a valid
+    result within `delay` seconds or fails. Each is `(name, func)` where `func`
+    takes a cancel event; the loser's event is set once a winner is chosen.
+
+    Returns the first valid result. If neither is valid, returns the first
+    result received; if both fail, re-raises the last error.
+
+    A blocking HTTP call cannot be interrupted, so the cancel event only stops
+    work the loser has not started yet (Gemini checks it between models). The
+    loser's in-flight request still completes and is billed and rate-limited
+    like any other; `ahedged_call` cancels the losing request outright.
+    """
+
+    executor = _get_executor()
+    events = {}
+    futures = {}
+
+    def launch(call):
+        name, func = call
+        events[name] = threading.Event()
+        futures[executor.submit(timed_call, name, func, events[name])] = name
+
+    def can_launch_secondary():
+        return secondary is not None and secondary[0] not in events
+
+    launch(primary)
+    timeout = delay
+    fallback = None
+    last_error = None
+
+    while futures:
+        done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            if can_launch_secondary():
+                launch(secondary)
+            timeout = None
+            continue
+
+        for future in done:
+            name = futures.pop(future)
+            try:
+                result = future.result()
+            except Exception as exc:
+                last_error = exc
+                continue
+
+            if is_valid is None or is_valid(result):
+                for other, event in events.items():
+                    if other != name:
+                        event.set()
+                return result
+            if fallback is None:
+                fallback = result
+
+        if can_launch_secondary():
+            launch(secondary)
+            timeout = None
+
+    if fallback is not None:
+        return fallback
+    raise last_error
+
+
+async def atimed_call(name, coroutine):
+    started = time.monotonic()
+    result = await coroutine
+    LATENCY.record(name, time.monotonic() - started)
+    return result
+
+
+async def ahedged_call(primary, secondary, delay, is_valid=None):
+    """
+    Async `hedged_call`: `(name, coroutine_function)` pairs; the loser task is cancelled.
+    """
+
+    tasks = {}
+
+    def launch(call):
+        name, func = call
+        tasks[asyncio.ensure_future(atimed_call(name, func()))] = name
+
+    def can_launch_secondary():
+        return secondary is not None and secondary[0] not in tasks.values()
+
+    launch(primary)
+    pending = set(tasks)
+    timeout = delay
+    fallback = None
+    last_error = None
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if can_launch_secondary():
+                    launch(secondary)
+                    pending = {task for task in tasks if not task.done()}
+                timeout = None
+                continue
+
+            for task in done:
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    last_error = exc
+                    continue
+                if is_valid is None or is_valid(result):
+                    return result
+                if fallback is None:
+                    fallback = result
+
+            if can_launch_secondary():
+                launch(secondary)
+                pending = {task for task in tasks if not task.done()}
+                timeout = None
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    if fallback is not None:
+        return fallback
+    raise last_error
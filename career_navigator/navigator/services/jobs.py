@@ -0,0 +1,366 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .llm_cache import DEFAULT_CACHE_DIR, reset_connections_on_fork
+
+# -----------------------------
+# Analysis Job Queue
+# -----------------------------
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+
+class MemoryJobStore:
+    """
+    Jobs and their stage events held in this process only.
+    The oldest finished jobs are dropped past `max_jobs`.
+    """
+
+    def __init__(self, max_jobs=1000):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._events = {}
+        self._changed = threading.Condition()
+
+    def create(self, params):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._changed:
+            self._jobs[job_id] = {
+                "id": job_id, "status": QUEUED, "params": params, "result": None,
+                "error": None, "created_at": now, "updated_at": now,
+            }
+            self._events[job_id] = []
+            self._prune()
+        return job_id
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in FINISHED]
+        while len(self._jobs) > self.max_jobs and finished:
+            job_id = finished.pop(0)
+            del self._jobs[job_id]
+            del self._events[job_id]
+
+    def claim(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                return False
+            job["status"] = RUNNING
+            job["updated_at"] = time.time()
+            return True
+
+    def claim_next(self):
+        with self._changed:
+            for job_id, job in self._jobs.items():
+                if job["status"] == QUEUED:
+                    job["status"] = RUNNING
+                    job["updated_at"] = time.time()
+                    return job_id
+        return None
+
+    def heartbeat(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] == RUNNING:
+                job["updated_at"] = time.time()
+
+    def requeue_stale(self, lease):
+        """
+        Put RUNNING jobs whose heartbeat is older than `lease` seconds back in the queue.
+        """
+
+        cutoff = time.time() - lease
+        with self._changed:
+            stale = [job_id for job_id, job in self._jobs.items() if job["status"] == RUNNING and job["updated_at"] < cutoff]
+            for job_id in stale:
+                self._jobs[job_id]["status"] = QUEUED
+        return stale
+
+    def add_event(self, job_id, event, data, status=None, result=None, error=None):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            events = self._events[job_id]
+            if all(existing != event for _, existing, _ in events):
+                events.append((len(events) + 1, event, data))
+            if status:
+                job.update(status=status, result=result, error=error)
+            job["updated_at"] = time.time()
+            self._changed.notify_all()
+
+    def get(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def events(self, job_id, after=0):
+        with self._changed:
+            return [item for item in self._events.get(job_id, []) if item[0] > after]
+
+    def wait_for_events(self, job_id, after=0, timeout=15):
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or len(self._events[job_id]) > after,
+                timeout=timeout,
+            )
+        return self.events(job_id, after)
+
+
+class SQLiteJobStore:
+    """
+    Jobs persisted in SQLite, so any worker process on the host can run or report them.
+    Finished jobs older than `retention` seconds are purged on submit.
+    """
+
+    def __init__(self, path, retention=86400, poll_interval=0.25):
+        self.path = Path(path)
+        self.retention = retention
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        reset_connections_on_fork(self)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            "job_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, seq))"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, params):
+        conn = self._connect()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn.execute(
+            "INSERT INTO jobs (id, status, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(params), now, now),
+        )
+        expired = [row[0] for row in conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (*FINISHED, now - self.retention)
+        )]
+        for expired_id in expired:
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (expired_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (expired_id,))
+        return job_id
+
+    def claim(self, job_id):
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), job_id, QUEUED),
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id):
+        self._connect().execute(
+            "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ?", (time.time(), job_id, RUNNING)
+        )
+
+    def requeue_stale(self, lease):
+        """
+        Put RUNNING jobs whose heartbeat is older than `lease` seconds (their
+        worker died) back in the queue; returns their ids.
+        """
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stale = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND updated_at < ?", (RUNNING, time.time() - lease)
+            )]
+            for job_id in stale:
+                conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (QUEUED, time.time(), job_id))
+            return stale
+        finally:
+            conn.execute("COMMIT")
+
+    def claim_next(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (RUNNING, time.time(), row[0]))
+            return row[0]
+        finally:
+            conn.execute("COMMIT")
+
+    def add_event(self, job_id, event, data, status=None, result=None, error=None):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            published = conn.execute(
+                "SELECT 1 FROM job_events WHERE job_id = ? AND event = ?", (job_id, event)
+            ).fetchone()
+            if published is None:
+                seq = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?", (job_id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO job_events (job_id, seq, event, data) VALUES (?, ?, ?, ?)",
+                    (job_id, seq, event, json.dumps(data)),
+                )
+            if status:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (status, json.dumps(result) if result is not None else None, error, now, job_id),
+                )
+            else:
+                conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+        finally:
+            conn.execute("COMMIT")
+
+    def get(self, job_id):
+        row = self._connect().execute(
+            "SELECT id, status, params, result, error, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0], "status": row[1], "params": json.loads(row[2]),
+            "result": json.loads(row[3]) if row[3] else None, "error": row[4],
+            "created_at": row[5], "updated_at": row[6],
+        }
+
+    def events(self, job_id, after=0):
+        return [
+            (seq, event, json.loads(data))
+            for seq, event, data in self._connect().execute(
+                "SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after),
+            )
+        ]
+
+    def wait_for_events(self, job_id, after=0, timeout=15):
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.events(job_id, after)
+            if events or time.monotonic() >= deadline:
+                return events
+            time.sleep(self.poll_interval)
+
+
+class JobRunner:
+    """
+    Runs queued jobs on a local thread pool. `pipeline(params, emit)` returns the
+    final result and calls `emit(stage, data)` as each stage completes.
+
+    A running job's heartbeat is refreshed every `lease / 4` seconds; jobs whose
+    heartbeat is older than `lease` belonged to a dead worker and are requeued.
+    A requeued job runs from the start, but the stores publish each event name
+    once per job, so stream clients never see a stage twice.
+    """
+
+    def __init__(self, store, pipeline, max_workers=4, lease=60.0):
+        self.store = store
+        self.pipeline = pipeline
+        self.lease = lease
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+
+    def submit(self, params):
+        job_id = self.store.create(params)
+        self._executor.submit(self._run_claimed, job_id)
+        self.recover()
+        return job_id
+
+    def recover(self):
+        """
+        Requeue jobs left RUNNING by a dead worker and schedule them here.
+        """
+
+        stale = self.store.requeue_stale(self.lease)
+        for job_id in stale:
+            self._executor.submit(self._run_claimed, job_id)
+        return stale
+
+    def _run_claimed(self, job_id):
+        # Another process draining the same SQLite queue may have claimed it first.
+        if self.store.claim(job_id):
+            self.run(job_id)
+
+    def _heartbeat(self, job_id, stopped):
+        while not stopped.wait(self.lease / 4):
+            try:
+                self.store.heartbeat(job_id)
+            except sqlite3.Error:
+                pass
+
+    def run(self, job_id):
+        job = self.store.get(job_id)
+
+        def emit(stage, data):
+            self.store.add_event(job_id, stage, data)
+
+        stopped = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(job_id, stopped), name="analysis-job-heartbeat", daemon=True).start()
+        try:
+            result = self.pipeline(job["params"], emit)
+        except Exception as exc:
+            self.store.add_event(job_id, FAILED, {"error": str(exc)}, status=FAILED, error=str(exc))
+            return
+        finally:
+            stopped.set()
+        self.store.add_event(job_id, DONE, result, status=DONE, result=result)
+
+
+def build_job_store():
+    kind = os.getenv("JOB_QUEUE_BACKEND", "memory").lower()
+    if kind == "memory":
+        return MemoryJobStore(int(os.getenv("JOB_MAX_RETAINED", "1000")))
+    if kind == "sqlite":
+        path = os.getenv("JOB_QUEUE_PATH") or DEFAULT_CACHE_DIR / "jobs.sqlite3"
+        return SQLiteJobStore(path, retention=float(os.getenv("JOB_RETENTION", "86400")))
+    raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {kind}")
+
+
+def job_lease():
+    return float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner(pipeline):
+    global _runner
+
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = JobRunner(
+                    build_job_store(),
+                    pipeline,
+                    max_workers=int(os.getenv("JOB_WORKERS", "4")),
+                    lease=job_lease(),
+                )
+    return _runner
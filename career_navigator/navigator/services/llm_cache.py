@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+
+# -----------------------------
+# Content-addressed LLM Response Cache
+# -----------------------------
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache"
+
+_forked_stores = weakref.WeakSet()
+_inherited_connections = []
+
+
+def reset_connections_on_fork(store):
+    """
+    Give `store` a fresh `_local` in forked children, so a worker forked from a
+    preloaded master (gunicorn --preload) opens its own SQLite connections.
+    """
+
+    _forked_stores.add(store)
+
+
+def _reset_forked_stores():
+    for store in list(_forked_stores):
+        # The parent's connections stay referenced and unclosed: closing them here
+        # could checkpoint or unlock the database under the parent.
+        _inherited_connections.append(store._local)
+        store._local = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_forked_stores)
+
+
+class MemoryBackend:
+    """
+    In-process LRU store with per-entry expiry.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        return self.lookup(key)[0]
+
+    def lookup(self, key):
+        """
+        `(value, expires_at)`, or `(None, None)` when missing or expired.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None, None
+            self._entries.move_to_end(key)
+            return value, expires_at
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def items(self):
+        """
+        Unexpired `(key, value)` pairs, without touching recency.
+        """
+
+        now = time.time()
+        with self._lock:
+            return [
+                (key, value) for key, (value, expires_at) in self._entries.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    On-disk store shared by every worker process on the host.
+    Least recently read entries are evicted once `max_entries` is exceeded.
+    """
+
+    def __init__(self, path, max_entries=10000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        reset_connections_on_fork(self)
+        self.evictions = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        return self.lookup(key)[0]
+
+    def lookup(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None, None
+        conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return value, expires_at
+
+    def set(self, key, value, ttl=None):
+        conn = self._connect()
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, expires_at, now),
+        )
+        conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        evicted = conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self.evictions += max(evicted, 0)
+
+    def clear(self):
+        self._connect().execute("DELETE FROM llm_cache")
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class TieredBackend:
+    """
+    Memory LRU in front of a shared store; shared hits are promoted to memory
+    with whatever lifetime they have left in the store.
+    """
+
+    def __init__(self, *layers):
+        self.layers = layers
+
+    def get(self, key):
+        return self.lookup(key)[0]
+
+    def lookup(self, key):
+        for index, layer in enumerate(self.layers):
+            value, expires_at = layer.lookup(key)
+            if value is None:
+                continue
+            if expires_at is not None:
+                ttl = expires_at - time.time()
+                if ttl <= 0:
+                    return None, None
+            else:
+                ttl = None
+            for upper in self.layers[:index]:
+                upper.set(key, value, ttl)
+            return value, expires_at
+        return None, None
+
+    def set(self, key, value, ttl=None):
+        for layer in self.layers:
+            layer.set(key, value, ttl)
+
+    def clear(self):
+        for layer in self.layers:
+            layer.clear()
+
+    @property
+    def evictions(self):
+        return sum(layer.evictions for layer in self.layers)
+
+    def __len__(self):
+        return len(self.layers[-1])
+
+
+class LLMCache:
+    def __init__(self, backend, ttl=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt, temperature, model):
+        raw = json.dumps([prompt, temperature, model], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if value is not None:
+            self.backend.set(key, value, self.ttl)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def build_backend(kind=None):
+    kind = (kind or os.getenv("LLM_CACHE_BACKEND", "tiered")).lower()
+    memory_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    disk_entries = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "10000"))
+    path = os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_DIR / "llm_cache.sqlite3"
+
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return MemoryBackend(memory_entries)
+    if kind == "sqlite":
+        return SQLiteBackend(path, disk_entries)
+    if kind == "tiered":
+        return TieredBackend(MemoryBackend(memory_entries), SQLiteBackend(path, disk_entries))
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND: {kind}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Process-wide cache, or None when LLM_CACHE_BACKEND=none.
+    """
+
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                backend = build_backend()
+                if backend is None:
+                    return None
+                ttl = int(os.getenv("LLM_CACHE_TTL", "86400")) or None
+                _cache = LLMCache(backend, ttl=ttl)
+
+    return _cache
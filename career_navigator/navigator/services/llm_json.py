@@ -0,0 +1,200 @@
+import json
+import re
+
+# -----------------------------
+# LLM JSON Extraction
+# -----------------------------
+
+_DECODER = json.JSONDecoder(strict=False)
+
+CLOSERS = {"{": "}", "[": "]"}
+DOUBLE_QUOTES = "\"“”"
+SINGLE_QUOTES = "'‘’"
+LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+
+_OPENER = re.compile(r"[{\[]")
+_JSON_STRING = r'"(?:[^"\\]|\\[^\'])*"'
+_JSON_NUMBER = r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?"
+# `plain` is a run of tokens that are already valid JSON and leave the depth unchanged,
+# so the loop below only steps through brackets and defects.
+_TOKEN = re.compile(
+    rf"\s*(?:(?P<plain>(?:\s*(?:{_JSON_STRING}|:|{_JSON_NUMBER}|true\b|false\b|null\b|,(?!\s*[}}\]])))+)"
+    r"|(?P<punct>[{}\[\],])|(?P<word>[A-Za-z_]\w*)|(?P<other>\S))",
+)
+
+# Next character that ends or escapes a string body, per opening quote.
+_STRING_STOPS = {
+    '"': re.compile(r'[\\"]'),
+    "“": re.compile("[\\\\\"“”]"),
+    "”": re.compile("[\\\\\"“”]"),
+    "'": re.compile(r"[\\\"']"),
+    "‘": re.compile("[\\\\\"‘’]"),
+    "’": re.compile("[\\\\\"‘’]"),
+}
+_STRING_CLOSERS = {
+    '"': '"',
+    "“": DOUBLE_QUOTES,
+    "”": DOUBLE_QUOTES,
+    "'": "'",
+    "‘": "‘’",
+    "’": "‘’",
+}
+
+
+class LLMJSONError(ValueError):
+    """
+    No JSON object or array could be recovered; `reason` says why and `position` where.
+    """
+
+    def __init__(self, reason, position=None):
+        self.reason = reason
+        self.position = position
+        where = f" at offset {position}" if position is not None else ""
+        super().__init__(f"Invalid JSON from LLM: {reason}{where}")
+
+
+def _scan_start(text):
+    # Prefer the body of a code fence over any brackets in the prose before it.
+    fence = text.find("```")
+    opener = _OPENER.search(text)
+    if fence < 0 or (opener is not None and opener.start() < fence):
+        return 0
+    newline = text.find("\n", fence)
+    return fence + 3 if newline < 0 else newline + 1
+
+
+def _repair_string(text, index, out):
+    """
+    Copy the string starting at `index` into `out` as a JSON string.
+    Returns the index after its closing quote, or -1 if it never closes.
+    """
+
+    opener = text[index]
+    stops = _STRING_STOPS[opener]
+    closers = _STRING_CLOSERS[opener]
+    out.append('"')
+    index += 1
+    while True:
+        match = stops.search(text, index)
+        if match is None:
+            return -1
+        stop = match.start()
+        out.append(text[index:stop])
+        char = text[stop]
+        if char == "\\":
+            escaped = text[stop + 1:stop + 2]
+            out.append("'" if escaped == "'" else "\\" + escaped)
+            index = stop + 2
+        elif char in closers:
+            out.append('"')
+            return stop + 1
+        else:
+            # A double quote inside a single- or smart-quoted string.
+            out.append('\\"')
+            index = stop + 1
+
+
+def _repair_value(text, start):
+    """
+    Rewrite the bracketed value at `start` into strict JSON in one pass.
+    Returns `(json_text, None, end)` or `(None, (reason, position), resume_at)`.
+    """
+
+    out = []
+    stack = []
+    comma = False
+    index = start
+    length = len(text)
+
+    while True:
+        match = _TOKEN.match(text, index)
+        if match is None:
+            return None, (f"truncated output, {len(stack)} unclosed bracket(s)", length), length
+        kind = match.lastgroup
+        token = match.group(kind)
+        position = match.start(kind)
+        index = match.end()
+
+        if comma and token not in "}]":
+            out.append(",")
+        comma = False
+
+        if kind == "plain":
+            out.append(token)
+        elif kind == "punct":
+            if token in CLOSERS:
+                stack.append(token)
+            elif token in "}]":
+                if CLOSERS[stack.pop()] != token:
+                    return None, (f"mismatched {token!r}", position), index
+                if not stack:
+                    out.append(token)
+                    return "".join(out), None, index
+            else:
+                # Held back until the next token, so a trailing comma before a closer is dropped.
+                comma = True
+                continue
+            out.append(token)
+        elif kind == "word":
+            literal = LITERALS.get(token)
+            if literal is None:
+                return None, (f"unexpected token {token!r}", position), index
+            out.append(literal)
+        elif token in DOUBLE_QUOTES or token in SINGLE_QUOTES:
+            end = _repair_string(text, position, out)
+            if end < 0:
+                return None, ("unterminated string", position), length
+            index = end
+        else:
+            return None, (f"unexpected character {token!r}", position), index
+
+
+def extract_json(text):
+    """
+    First complete JSON object in an LLM response, else the first array.
+
+    Well-formed JSON is decoded directly from each bracket. Otherwise one
+    bracket-balancing pass repairs code fences and surrounding prose, smart and
+    single quotes, trailing commas and Python literals. An array is only
+    returned when no object follows it, so a bracketed reference in the prose
+    ("Note [1]: ...") never wins over the real object. Raises `LLMJSONError`
+    with the reason of the first failed candidate.
+    """
+
+    text = text or ""
+    index = _scan_start(text)
+    first_error = None
+    first_array = None
+
+    while True:
+        match = _OPENER.search(text, index)
+        if match is None:
+            break
+        start = match.start()
+
+        try:
+            value, index = _DECODER.raw_decode(text, start)
+        except ValueError:
+            value = None
+            repaired, error, index = _repair_value(text, start)
+            if repaired is not None:
+                try:
+                    value = _DECODER.decode(repaired)
+                except ValueError as exc:
+                    # Repairs keep the text's layout, so the offset maps back onto the response.
+                    error = (exc.msg, start + exc.pos)
+            if value is None:
+                if first_error is None:
+                    first_error = error
+                continue
+
+        if isinstance(value, dict):
+            return value
+        if first_array is None:
+            first_array = value
+
+    if first_array is not None:
+        return first_array
+    if first_error is not None:
+        raise LLMJSONError(*first_error)
+    raise LLMJSONError("no JSON object or array found")
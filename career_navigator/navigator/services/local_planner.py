@@ -0,0 +1,355 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .llm_cache import DEFAULT_CACHE_DIR
+from .skill_matcher import SkillMatcher, load_vocabulary
+
+# -----------------------------
+# Skill Prerequisite Graph
+# -----------------------------
+
+GRAPH_VERSION = 1
+
+
+def skill_key(skill):
+    return " ".join(str(skill).lower().split())
+
+
+def graph_vocabulary():
+    """
+    The fallback matcher vocabulary plus the technical skills and tools of every known role.
+    """
+
+    from .role_ranker import known_roles
+
+    vocabulary = load_vocabulary()
+    for _, skills in known_roles():
+        for category in ("technical", "tools"):
+            vocabulary.setdefault(category, []).extend(skills[category])
+    return vocabulary
+
+
+class SkillGraph:
+    """
+    Prerequisite edges between skills, mined from job postings.
+
+    `a` is a prerequisite of `b` when most postings asking for `b` also ask for
+    `a` (P(a|b) >= min_confidence), `a` is asked for in more postings overall,
+    and postings naming both mention `a` first at least as often as `b`.
+    Edges only run from more to less requested skills, so the graph is acyclic.
+    """
+
+    def __init__(self, skills=None, prerequisites=None, postings=0, fingerprint=None):
+        self.skills = skills or {}
+        self.prerequisites = prerequisites or {}
+        self.postings = postings
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def mine(cls, descriptions, matcher, min_support=20, min_confidence=0.5, max_prerequisites=3,
+             fingerprint=None, batch_size=10000):
+        keys = sorted(matcher.categories)
+        ids = {key: index for index, key in enumerate(keys)}
+        size = len(keys)
+        postings = 0
+        counts = np.zeros(size, dtype=np.int64)
+        pair_ids = np.zeros(0, dtype=np.int64)
+        pair_counts = np.zeros(0, dtype=np.int64)
+        triangles = {}
+
+        def merge(batch, pair_ids, pair_counts):
+            # Ordered pairs (a mentioned before b) as a*size+b, summed into the running counts.
+            if not batch:
+                return pair_ids, pair_counts
+            merged, inverse = np.unique(np.concatenate([pair_ids, *batch]), return_inverse=True)
+            weights = np.concatenate([pair_counts, np.ones(sum(len(pairs) for pairs in batch), dtype=np.int64)])
+            return merged, np.bincount(inverse, weights=weights, minlength=len(merged)).astype(np.int64)
+
+        batch = []
+        for description in descriptions:
+            postings += 1
+            first = matcher.positions(description or "")
+            if not first:
+                continue
+            mentioned = np.array(
+                [ids[key] for key, _ in sorted(first.items(), key=lambda item: (item[1], ids[item[0]]))],
+                dtype=np.int64,
+            )
+            counts[mentioned] += 1
+            if len(mentioned) > 1:
+                if len(mentioned) not in triangles:
+                    triangles[len(mentioned)] = np.triu_indices(len(mentioned), k=1)
+                earlier, later = triangles[len(mentioned)]
+                batch.append(mentioned[earlier] * size + mentioned[later])
+            if len(batch) >= batch_size:
+                pair_ids, pair_counts = merge(batch, pair_ids, pair_counts)
+                batch = []
+        pair_ids, pair_counts = merge(batch, pair_ids, pair_counts)
+
+        # Each ordered pair next to its reverse: co-occurrence is the sum of both orders.
+        first_ids, second_ids = pair_ids // size, pair_ids % size
+        reverse = second_ids * size + first_ids
+        slots = np.minimum(np.searchsorted(pair_ids, reverse), max(len(pair_ids) - 1, 0))
+        reverse_counts = np.where(pair_ids[slots] == reverse, pair_counts[slots], 0) if len(pair_ids) else pair_counts
+        together = pair_counts + reverse_counts
+        confidence = together / np.maximum(counts[second_ids], 1)
+        edges = np.flatnonzero(
+            (together >= min_support)
+            & (confidence >= min_confidence)
+            & (counts[first_ids] > counts[second_ids])
+            & (pair_counts >= reverse_counts)
+        )
+
+        prerequisites = {}
+        for edge in edges[np.lexsort((first_ids[edges], -confidence[edges]))]:
+            required = prerequisites.setdefault(keys[second_ids[edge]], [])
+            if len(required) < max_prerequisites:
+                required.append([keys[first_ids[edge]], round(float(confidence[edge]), 4)])
+
+        skills = {
+            key: {"name": matcher.display[key], "postings": int(counts[index])}
+            for index, key in enumerate(keys)
+            if counts[index]
+        }
+        return cls(skills, prerequisites, postings=postings, fingerprint=fingerprint)
+
+    def edge_count(self):
+        return sum(len(required) for required in self.prerequisites.values())
+
+    def to_dict(self):
+        return {
+            "version": GRAPH_VERSION,
+            "built_at": time.time(),
+            "dataset_fingerprint": self.fingerprint,
+            "postings": self.postings,
+            "skills": self.skills,
+            "prerequisites": self.prerequisites,
+        }
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        The graph stored at `path`, or None if it is missing, unreadable or from another version.
+        """
+
+        try:
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != GRAPH_VERSION:
+            return None
+        return cls(
+            data.get("skills") or {},
+            data.get("prerequisites") or {},
+            postings=data.get("postings") or 0,
+            fingerprint=data.get("dataset_fingerprint"),
+        )
+
+    def stats(self):
+        return {"skills": len(self.skills), "edges": self.edge_count(), "postings": self.postings}
+
+
+def get_graph_path():
+    return Path(os.getenv("SKILL_GRAPH_PATH") or DEFAULT_CACHE_DIR / "skill_graph.json")
+
+
+_graph = None
+_graph_mtime = None
+_lock = threading.Lock()
+
+
+def get_skill_graph():
+    """
+    The stored SkillGraph, reloaded when the file changes; empty until one is built.
+    """
+
+    global _graph, _graph_mtime
+
+    path = get_graph_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        mtime = None
+    if _graph is None or mtime != _graph_mtime:
+        with _lock:
+            if _graph is None or mtime != _graph_mtime:
+                _graph = (SkillGraph.load(path) if mtime is not None else None) or SkillGraph()
+                _graph_mtime = mtime
+    return _graph
+
+
+def build_skill_graph(descriptions, fingerprint=None, **options):
+    return SkillGraph.mine(descriptions, SkillMatcher(graph_vocabulary()), fingerprint=fingerprint, **options)
+
+
+# -----------------------------
+# Deterministic 4-week Planner
+# -----------------------------
+
+PLAN_WEEKS = 4
+
+# Study hours per missing skill at an intermediate pace.
+SKILL_HOURS = {"missing_technical": 10, "missing_tools": 5}
+LEVEL_PACE = {"beginner": 1.5, "intermediate": 1.0, "advanced": 0.75}
+# Share of each week kept for the weekly project and soft-skill practice.
+PRACTICE_SHARE = 0.25
+
+
+def roadmap_mode():
+    """
+    ROADMAP_MODE: `llm` (default), `local` (never call the LLM planner) or
+    `local_first` (answer with the local plan, then swap in the LLM plan).
+    """
+
+    mode = os.getenv("ROADMAP_MODE", "llm").strip().lower()
+    return mode if mode in ("llm", "local", "local_first") else "llm"
+
+
+def order_skills(skills, graph):
+    """
+    `skills` topologically sorted by the graph's prerequisite edges among
+    them; ties keep the given order.
+    """
+
+    keys = [skill_key(skill) for skill in skills]
+    position = {}
+    for index, key in enumerate(keys):
+        position.setdefault(key, index)
+
+    waiting = {index: 0 for index in position.values()}
+    unlocks = {index: [] for index in position.values()}
+    for key, index in position.items():
+        for required, _ in graph.prerequisites.get(key, ()):
+            if required in position and required != key:
+                waiting[index] += 1
+                unlocks[position[required]].append(index)
+
+    # Kahn's algorithm; a sorted ready list is enough for the dozen skills a gap holds.
+    ready = sorted(index for index, count in waiting.items() if not count)
+    ordered = []
+    while ready:
+        index = ready.pop(0)
+        ordered.append(index)
+        for unlocked in unlocks[index]:
+            waiting[unlocked] -= 1
+            if not waiting[unlocked]:
+                ready.append(unlocked)
+                ready.sort()
+    return [skills[index] for index in ordered]
+
+
+def _assign_weeks(items, weekly_hours):
+    """
+    Split `(skill, hours)` items, in order, across PLAN_WEEKS weeks; `(weeks, deferred)`.
+    """
+
+    weeks = [[] for _ in range(PLAN_WEEKS)]
+    total = sum(hours for _, hours in items)
+    if total <= weekly_hours * PLAN_WEEKS:
+        if len(items) <= PLAN_WEEKS:
+            # One skill a week; the weeks left over are for practice.
+            for week, item in enumerate(items):
+                weeks[week].append(item)
+            return weeks, []
+        # Everything fits: spread it evenly, each skill going to the week its midpoint falls in.
+        start = 0.0
+        for skill, hours in items:
+            weeks[min(PLAN_WEEKS - 1, int((start + hours / 2) / total * PLAN_WEEKS))].append((skill, hours))
+            start += hours
+        return weeks, []
+
+    week, used, deferred = 0, 0.0, []
+    for skill, hours in items:
+        while week < PLAN_WEEKS and weeks[week] and used + hours > weekly_hours:
+            week, used = week + 1, 0.0
+        if week >= PLAN_WEEKS:
+            deferred.append(skill)
+            continue
+        weeks[week].append((skill, hours))
+        used += hours
+    return weeks, deferred
+
+
+def build_local_plan(missing_skills, experience_level, hours_per_day, dream_role=None, graph=None):
+    """
+    A 4-week plan in the LLM planner's shape, built without the LLM: missing
+    technical skills and tools in prerequisite order, packed into weeks sized
+    by `hours_per_day`. None when there is no technical or tool gap to plan.
+    """
+
+    missing_skills = missing_skills or {}
+    graph = graph if graph is not None else get_skill_graph()
+    pace = LEVEL_PACE.get(str(experience_level or "").strip().lower(), 1.0)
+
+    hours = {}
+    skills = []
+    for category, base in SKILL_HOURS.items():
+        for skill in missing_skills.get(category) or []:
+            skill = str(skill).strip()
+            if skill and skill_key(skill) not in hours:
+                hours[skill_key(skill)] = max(1, round(base * pace))
+                skills.append(skill)
+    if not skills:
+        return None
+
+    try:
+        hours_per_day = max(float(hours_per_day), 0.5)
+    except (TypeError, ValueError):
+        hours_per_day = 2.0
+    weekly_hours = hours_per_day * 7 * (1 - PRACTICE_SHARE)
+
+    ordered = order_skills(skills, graph)
+    weeks, deferred = _assign_weeks([(skill, hours[skill_key(skill)]) for skill in ordered], weekly_hours)
+    soft = [str(skill) for skill in missing_skills.get("missing_soft") or [] if str(skill).strip()]
+    known = {skill_key(skill) for skill in skills}
+    role = dream_role or "your target role"
+
+    plan = {}
+    learned = []
+    for index, entries in enumerate(weeks):
+        names = [skill for skill, _ in entries]
+        tasks = []
+        for skill, skill_hours in entries:
+            required = [
+                graph.skills.get(key, {}).get("name", key)
+                for key, _ in graph.prerequisites.get(skill_key(skill), ())
+                if key in known
+            ]
+            suffix = f", building on {', '.join(required)}" if required else ""
+            tasks.append(f"Learn {skill} (~{skill_hours}h){suffix}")
+        if soft:
+            tasks.append(f"Practice {soft[index % len(soft)]} while presenting this week's work")
+
+        if names:
+            focus = ("Foundations: " if index == 0 else "Build on: ") + ", ".join(names)
+            project = f"Build a small project that applies {' and '.join(names[:2])}"
+            checkpoint = f"Demo {', '.join(names)} and explain the trade-offs you made"
+        else:
+            focus = "Applied practice" if index < PLAN_WEEKS - 1 else "Capstone and interview readiness"
+            recent = learned[-3:] or ["your core skills"]
+            tasks.extend(f"Work through a harder {skill} exercise" for skill in recent)
+            project = f"Extend your project with {recent[-1]}"
+            checkpoint = "Get feedback on your project from a peer or mentor"
+        if index == PLAN_WEEKS - 1:
+            tasks.append(f"Run a mock interview for {role} covering this month's skills")
+            project = f"Capstone for {role} combining {', '.join((learned + names)[:3])}"
+            if deferred:
+                checkpoint = f"{checkpoint}; next up: {', '.join(deferred)}"
+        learned.extend(names)
+
+        plan[f"week_{index + 1}"] = {"focus": focus, "tasks": tasks, "project": project, "checkpoint": checkpoint}
+    return plan
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# -----------------------------
+# Stage Orchestrator
+# -----------------------------
+
+
+def _max_workers():
+    """
+    PIPELINE_MAX_WORKERS: stage threads per `run_stages` call (i.e. per request), not per server.
+    """
+
+    return max(int(os.getenv("PIPELINE_MAX_WORKERS", "4")), 1)
+
+
+def run_stages(stages, on_complete=None):
+    """
+    Run a dependency graph of stages, executing independent ones concurrently.
+
+    `stages` maps a stage name to `(callable, [dependency names])`. Each callable
+    receives its dependencies' results as keyword arguments. The first stage
+    exception is re-raised once it is observed; stages that depend on it never run.
+
+    Each call gets its own small pool, so a request whose stages block on a
+    slow provider never holds up the stages of another request.
+    """
+
+    for name, (_, deps) in stages.items():
+        unknown = [dep for dep in deps if dep not in stages]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {unknown}")
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(len(stages), _max_workers()) or 1, thread_name_prefix="pipeline"
+    )
+    results = {}
+    pending = dict(stages)
+    running = {}
+
+    try:
+        while pending or running:
+            for name, (func, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    del pending[name]
+                    inputs = {dep: results[dep] for dep in deps}
+                    running[executor.submit(func, **inputs)] = name
+
+            if not running:
+                raise ValueError(f"Stage dependency cycle between: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    raise error
+
+                results[name] = future.result()
+                if on_complete:
+                    on_complete(name, results[name])
+    finally:
+        # Stages still running after a failure finish in the background; queued ones never start.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+async def run_stages_async(stages, on_complete=None):
+    """
+    Async `run_stages`: each callable is a coroutine function run as a task on the current loop.
+    """
+
+    for name, (_, deps) in stages.items():
+        unknown = [dep for dep in deps if dep not in stages]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {unknown}")
+
+    results = {}
+    pending = dict(stages)
+    running = {}
+
+    try:
+        while pending or running:
+            for name, (func, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    del pending[name]
+                    inputs = {dep: results[dep] for dep in deps}
+                    running[asyncio.ensure_future(func(**inputs))] = name
+
+            if not running:
+                raise ValueError(f"Stage dependency cycle between: {sorted(pending)}")
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                results[name] = task.result()
+                if on_complete:
+                    on_complete(name, results[name])
+    finally:
+        for task in running:
+            task.cancel()
+
+    return results
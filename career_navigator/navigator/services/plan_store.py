@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+import numpy as np
+
+from .llm_cache import DEFAULT_CACHE_DIR, reset_connections_on_fork
+
+# -----------------------------
+# Near-duplicate Roadmap Reuse
+# -----------------------------
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Only the categories the planner prompt uses decide what a plan looks like.
+PLAN_CATEGORIES = ("missing_technical", "missing_soft")
+
+_SEEDS = np.random.default_rng(20240611).integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+def gap_tokens(missing_skills):
+    """
+    Canonical gap set: category-prefixed, case- and whitespace-normalized skills.
+    """
+
+    tokens = set()
+    for category in PLAN_CATEGORIES:
+        for skill in (missing_skills or {}).get(category) or []:
+            skill = " ".join(str(skill).lower().split())
+            if skill:
+                tokens.add(f"{category}:{skill}")
+    return frozenset(tokens)
+
+
+def _bucket(experience_level, hours_per_day):
+    return f"{str(experience_level or '').strip().lower()}|{hours_per_day}"
+
+
+def _mix(values):
+    # splitmix64 finalizer; uint64 arithmetic wraps, which is what the hash wants.
+    with np.errstate(over="ignore"):
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def minhash(tokens):
+    """
+    NUM_PERM-value MinHash signature of a non-empty token set.
+    """
+
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little") for token in tokens],
+        dtype=np.uint64,
+    )
+    return _mix(hashes[:, None] ^ _SEEDS[None, :]).min(axis=0)
+
+
+def jaccard(left, right):
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+class PlanStore:
+    """
+    LLM-generated plans indexed by their gap set, level and hours per day.
+
+    An identical gap set is a dict hit; otherwise MinHash LSH bands propose
+    candidates and the closest by exact Jaccard similarity is served if it
+    reaches `threshold`. Plans live in SQLite so every worker process shares
+    them; each lookup first indexes rows other processes have added and drops
+    rows evicted since. Past `max_entries` the oldest plans are evicted.
+    """
+
+    def __init__(self, path, threshold=0.8, max_entries=50000):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        reset_connections_on_fork(self)
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._bands = defaultdict(list)
+        self._sets = {}
+        self._order = deque()
+        self._last_id = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, bucket TEXT NOT NULL, skills TEXT NOT NULL, "
+            "plan TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _index(self, plan_id, bucket, tokens):
+        self._sets[plan_id] = (bucket, tokens)
+        self._order.append(plan_id)
+        self._exact.setdefault((bucket, tokens), plan_id)
+        if tokens:
+            signature = minhash(tokens)
+            for band in range(BANDS):
+                self._bands[(bucket, band, signature[band * ROWS:(band + 1) * ROWS].tobytes())].append(plan_id)
+
+    def _unindex_below(self, floor):
+        while self._order and self._order[0] < floor:
+            plan_id = self._order.popleft()
+            bucket, tokens = self._sets.pop(plan_id)
+            if self._exact.get((bucket, tokens)) == plan_id:
+                del self._exact[(bucket, tokens)]
+            if tokens:
+                signature = minhash(tokens)
+                for band in range(BANDS):
+                    key = (bucket, band, signature[band * ROWS:(band + 1) * ROWS].tobytes())
+                    self._bands[key].remove(plan_id)
+                    if not self._bands[key]:
+                        del self._bands[key]
+
+    def _sync(self):
+        conn = self._connect()
+        # Rows are only ever evicted oldest first, so the smallest id left is the cut-off.
+        floor = conn.execute("SELECT MIN(id) FROM plans").fetchone()[0]
+        self._unindex_below(self._last_id + 1 if floor is None else floor)
+        rows = conn.execute(
+            "SELECT id, bucket, skills FROM plans WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        for plan_id, bucket, skills in rows:
+            self._index(plan_id, bucket, frozenset(json.loads(skills)))
+            self._last_id = plan_id
+
+    def _load(self, plan_id):
+        row = self._connect().execute("SELECT plan FROM plans WHERE id = ?", (plan_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, missing_skills, experience_level, hours_per_day):
+        bucket = _bucket(experience_level, hours_per_day)
+        tokens = gap_tokens(missing_skills)
+
+        with self._lock:
+            self._sync()
+            plan_id = self._exact.get((bucket, tokens))
+            if plan_id is not None:
+                self.exact_hits += 1
+                return self._load(plan_id)
+
+            best, best_score = None, self.threshold
+            if tokens and self.threshold < 1:
+                signature = minhash(tokens)
+                candidates = set()
+                for band in range(BANDS):
+                    candidates.update(self._bands.get((bucket, band, signature[band * ROWS:(band + 1) * ROWS].tobytes()), ()))
+                for candidate in candidates:
+                    score = jaccard(tokens, self._sets[candidate][1])
+                    if score >= best_score:
+                        best, best_score = candidate, score
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.near_hits += 1
+            return self._load(best)
+
+    def add(self, missing_skills, experience_level, hours_per_day, plan):
+        bucket = _bucket(experience_level, hours_per_day)
+        tokens = gap_tokens(missing_skills)
+        with self._lock:
+            self._sync()
+            if (bucket, tokens) in self._exact:
+                return
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO plans (bucket, skills, plan, created_at) VALUES (?, ?, ?, ?)",
+                (bucket, json.dumps(sorted(tokens)), json.dumps(plan), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM plans WHERE id <= (SELECT id FROM plans ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            # Indexes the new row along with any another process added first.
+            self._sync()
+
+    def stats(self):
+        lookups = self.exact_hits + self.near_hits + self.misses
+        return {
+            "entries": len(self._sets),
+            "threshold": self.threshold,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.exact_hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_plan_store():
+    """
+    The shared PlanStore, or None when PLAN_REUSE is off.
+    """
+
+    global _store
+
+    if os.getenv("PLAN_REUSE", "on").lower() in ("0", "off", "false", "no"):
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PlanStore(
+                    os.getenv("PLAN_STORE_PATH") or DEFAULT_CACHE_DIR / "plan_store.sqlite3",
+                    threshold=float(os.getenv("PLAN_REUSE_THRESHOLD", "0.8")),
+                    max_entries=int(os.getenv("PLAN_STORE_MAX_ENTRIES", "50000")),
+                )
+    return _store
+
+
+def find_similar_plan(missing_skills, experience_level, hours_per_day):
+    """
+    A stored plan for the same or a near-identical gap profile, or None.
+    """
+
+    try:
+        store = get_plan_store()
+        return store.find(missing_skills, experience_level, hours_per_day) if store else None
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def remember_plan(missing_skills, experience_level, hours_per_day, plan):
+    """
+    Keep a complete LLM plan for later near-duplicate requests.
+    """
+
+    if not isinstance(plan, dict) or plan.get("error") or len(plan) < 4:
+        return
+    try:
+        store = get_plan_store()
+        if store:
+            store.add(missing_skills, experience_level, hours_per_day, plan)
+    except (sqlite3.Error, OSError):
+        pass
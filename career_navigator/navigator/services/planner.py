@@ -1,13 +1,14 @@
-from .groq_client import call_llm, parse_llm_json
+import asyncio
+import json
 
+from .groq_client import acall_llm, call_llm, iter_json_members, parse_llm_json, stream_llm
+from .plan_store import find_similar_plan, remember_plan
 
-def generate_30_day_plan(
-    missing_skills,
-    experience_level="Intermediate",
-    hours_per_day=2
-):
+ALLOWED_WEEKS = ["week_1", "week_2", "week_3", "week_4"]
 
-    prompt = f"""
+
+def _build_plan_prompt(missing_skills, experience_level, hours_per_day):
+    return f"""
     You are an AI career planning system.
 
     The user:
@@ -59,16 +60,142 @@ def generate_30_day_plan(
     }}
     """
 
-    response = call_llm(prompt, temperature=0.2)
 
+def _parse_plan(response):
     try:
         plan = parse_llm_json(response)
 
         # Hard constraint: keep only first 4 weeks
-        allowed_weeks = ["week_1", "week_2", "week_3", "week_4"]
-        cleaned_plan = {k: plan[k] for k in allowed_weeks if k in plan}
+        cleaned_plan = {k: plan[k] for k in ALLOWED_WEEKS if k in plan}
 
         return cleaned_plan
 
-    except ValueError:
-        return {"error": "Invalid JSON from LLM", "raw_output": response}
+    except ValueError as exc:
+        return {"error": str(exc), "raw_output": response}
+
+
+def generate_30_day_plan(
+    missing_skills,
+    experience_level="Intermediate",
+    hours_per_day=2
+):
+    reused = find_similar_plan(missing_skills, experience_level, hours_per_day)
+    if reused is not None:
+        return reused
+
+    prompt = _build_plan_prompt(missing_skills, experience_level, hours_per_day)
+    plan = _parse_plan(call_llm(prompt, temperature=0.2))
+    remember_plan(missing_skills, experience_level, hours_per_day, plan)
+    return plan
+
+
+async def agenerate_30_day_plan(
+    missing_skills,
+    experience_level="Intermediate",
+    hours_per_day=2
+):
+    # The plan store is SQLite; keep its lookups and writes off the event loop.
+    reused = await asyncio.to_thread(find_similar_plan, missing_skills, experience_level, hours_per_day)
+    if reused is not None:
+        return reused
+
+    prompt = _build_plan_prompt(missing_skills, experience_level, hours_per_day)
+    plan = _parse_plan(await acall_llm(prompt, temperature=0.2))
+    await asyncio.to_thread(remember_plan, missing_skills, experience_level, hours_per_day, plan)
+    return plan
+
+
+def stream_30_day_plan(
+    missing_skills,
+    experience_level="Intermediate",
+    hours_per_day=2
+):
+    """
+    Yield `(week_key, week)` as each week object completes in the LLM stream.
+    Weeks past week_4 are dropped; the rest of the stream is still read so the
+    complete response lands in the LLM cache. A stored near-duplicate plan is
+    replayed without calling the LLM.
+    """
+
+    reused = find_similar_plan(missing_skills, experience_level, hours_per_day)
+    if reused is not None:
+        yield from reused.items()
+        return
+
+    prompt = _build_plan_prompt(missing_skills, experience_level, hours_per_day)
+    chunks = stream_llm(prompt, temperature=0.2)
+    plan = {}
+    try:
+        for week_key, content in iter_json_members(chunks):
+            if week_key in ALLOWED_WEEKS and week_key not in plan and isinstance(content, dict):
+                plan[week_key] = content
+                yield week_key, content
+        for _ in chunks:
+            pass
+    finally:
+        chunks.close()
+    remember_plan(missing_skills, experience_level, hours_per_day, plan)
+
+
+def _build_week_patch_prompt(plan, weeks, missing_skills, experience_level, hours_per_day):
+    kept = {key: plan[key].get("focus") for key in ALLOWED_WEEKS if key in plan and key not in weeks}
+    return f"""
+    You are an AI career planning system updating an existing 4-week plan.
+
+    The user:
+    - Level: {experience_level}
+    - Study time per day: {hours_per_day} hours
+
+    The user has just completed some skills, so these weeks must be rewritten: {weeks}
+
+    Current content of those weeks:
+    {json.dumps({key: plan[key] for key in weeks}, indent=2)}
+
+    Weeks that stay as they are (focus only): {json.dumps(kept)}
+
+    Remaining Missing Technical Skills:
+    {missing_skills["missing_technical"]}
+
+    Remaining Missing Tools:
+    {missing_skills["missing_tools"]}
+
+    Remaining Missing Soft Skills:
+    {missing_skills["missing_soft"]}
+
+    RULES:
+    - Return ONLY the weeks listed above, with the same keys.
+    - Do not repeat what the kept weeks already cover.
+    - Keep tasks concise.
+    - Strictly valid JSON.
+    - No explanations.
+
+    FORMAT (one entry per rewritten week):
+
+    {{
+        "week_n": {{
+            "focus": "",
+            "tasks": [],
+            "project": "",
+            "checkpoint": ""
+        }}
+    }}
+    """
+
+
+def regenerate_weeks(
+    plan,
+    weeks,
+    missing_skills,
+    experience_level="Intermediate",
+    hours_per_day=2
+):
+    """
+    Rewrite only `weeks` of an existing plan with one LLM call.
+    Returns `{week_key: week}` for the requested weeks, or an error dict.
+    """
+
+    prompt = _build_week_patch_prompt(plan, weeks, missing_skills, experience_level, hours_per_day)
+    patch = _parse_plan(call_llm(prompt, temperature=0.2))
+    if patch.get("error"):
+        return patch
+    return {key: patch[key] for key in weeks if isinstance(patch.get(key), dict)}
@@ -0,0 +1,178 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .llm_cache import DEFAULT_CACHE_DIR, reset_connections_on_fork
+
+# -----------------------------
+# Shared Circuit Breaker and Model Health
+# -----------------------------
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """
+    Circuit state per provider and dead-model memory per (provider, model),
+    stored in SQLite so every worker on the host sees the same picture.
+
+    closed    -> calls flow; `failure_threshold` consecutive failures open it
+    open      -> calls are refused until `cooldown` seconds have passed
+    half_open -> one probe call is let through; success closes, failure reopens
+    """
+
+    def __init__(self, path, failure_threshold=3, cooldown=30, dead_model_ttl=3600):
+        self.path = Path(path)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.dead_model_ttl = dead_model_ttl
+        self._local = threading.local()
+        reset_connections_on_fork(self)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS provider_health ("
+            "provider TEXT PRIMARY KEY, state TEXT NOT NULL, failures INTEGER NOT NULL, "
+            "opened_at REAL, probe_at REAL, last_ok_model TEXT, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS model_health ("
+            "provider TEXT NOT NULL, model TEXT NOT NULL, dead_until REAL NOT NULL, reason TEXT, "
+            "PRIMARY KEY (provider, model))"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _row(self, conn, provider):
+        return conn.execute(
+            "SELECT state, failures, opened_at, probe_at, last_ok_model FROM provider_health WHERE provider = ?",
+            (provider,),
+        ).fetchone()
+
+    def allow(self, provider):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._row(conn, provider)
+            if row is None or row[0] == CLOSED:
+                return True
+            state, _, opened_at, probe_at, _ = row
+            if state == OPEN and now - (opened_at or 0) < self.cooldown:
+                return False
+            if state == HALF_OPEN and probe_at and now - probe_at < self.cooldown:
+                return False
+            conn.execute(
+                "UPDATE provider_health SET state = ?, probe_at = ?, updated_at = ? WHERE provider = ?",
+                (HALF_OPEN, now, now, provider),
+            )
+            return True
+        finally:
+            conn.execute("COMMIT")
+
+    def record_success(self, provider, model=None):
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO provider_health (provider, state, failures, opened_at, probe_at, last_ok_model, updated_at) "
+            "VALUES (?, ?, 0, NULL, NULL, ?, ?) "
+            "ON CONFLICT(provider) DO UPDATE SET state = excluded.state, failures = 0, opened_at = NULL, "
+            "probe_at = NULL, last_ok_model = COALESCE(excluded.last_ok_model, last_ok_model), "
+            "updated_at = excluded.updated_at",
+            (provider, CLOSED, model, now),
+        )
+
+    def record_failure(self, provider):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._row(conn, provider)
+            failures = (row[1] if row else 0) + 1
+            state = row[0] if row else CLOSED
+            if state == HALF_OPEN or failures >= self.failure_threshold:
+                state, opened_at = OPEN, now
+            else:
+                opened_at = row[2] if row else None
+            conn.execute(
+                "INSERT INTO provider_health (provider, state, failures, opened_at, probe_at, last_ok_model, updated_at) "
+                "VALUES (?, ?, ?, ?, NULL, NULL, ?) "
+                "ON CONFLICT(provider) DO UPDATE SET state = excluded.state, failures = excluded.failures, "
+                "opened_at = excluded.opened_at, probe_at = NULL, updated_at = excluded.updated_at",
+                (provider, state, failures, opened_at, now),
+            )
+        finally:
+            conn.execute("COMMIT")
+
+    def mark_model_dead(self, provider, model, reason=None):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO model_health (provider, model, dead_until, reason) VALUES (?, ?, ?, ?)",
+            (provider, model, time.time() + self.dead_model_ttl, reason),
+        )
+
+    def order_models(self, provider, models):
+        """
+        Last model that worked first, known-dead models dropped.
+        """
+
+        conn = self._connect()
+        dead = {
+            model for (model,) in conn.execute(
+                "SELECT model FROM model_health WHERE provider = ? AND dead_until > ?",
+                (provider, time.time()),
+            )
+        }
+        row = self._row(conn, provider)
+        preferred = row[4] if row else None
+
+        ordered = [model for model in dict.fromkeys(models) if model not in dead]
+        if preferred in ordered:
+            ordered.remove(preferred)
+            ordered.insert(0, preferred)
+        return ordered
+
+    def stats(self):
+        conn = self._connect()
+        now = time.time()
+        return {
+            "providers": {
+                provider: {"state": state, "failures": failures, "last_ok_model": last_ok_model}
+                for provider, state, failures, last_ok_model in conn.execute(
+                    "SELECT provider, state, failures, last_ok_model FROM provider_health"
+                )
+            },
+            "dead_models": [
+                f"{provider}:{model}" for provider, model in conn.execute(
+                    "SELECT provider, model FROM model_health WHERE dead_until > ?", (now,)
+                )
+            ],
+        }
+
+
+_health = None
+_health_lock = threading.Lock()
+
+
+def get_provider_health():
+    global _health
+
+    if _health is None:
+        with _health_lock:
+            if _health is None:
+                _health = ProviderHealth(
+                    os.getenv("PROVIDER_HEALTH_PATH") or DEFAULT_CACHE_DIR / "provider_health.sqlite3",
+                    failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3")),
+                    cooldown=float(os.getenv("CIRCUIT_COOLDOWN", "30")),
+                    dead_model_ttl=float(os.getenv("DEAD_MODEL_TTL", "3600")),
+                )
+    return _health
@@ -0,0 +1,304 @@
+import base64
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from .llm_cache import DEFAULT_CACHE_DIR, MemoryBackend, SQLiteBackend, TieredBackend
+
+# -----------------------------
+# Bounded-memory PDF Resume Extraction
+# -----------------------------
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ResumeTooLarge(ValueError):
+    pass
+
+
+class ResumeParseTimeout(ValueError):
+    pass
+
+
+def _setting(name, default):
+    return int(os.getenv(name, default))
+
+
+class ResumeUpload:
+    """
+    An uploaded PDF spooled to memory (small) or a temp file (large), with its sha256.
+    `path` is set when the bytes already live in a named file on disk.
+    """
+
+    def __init__(self, file, sha256, size, path=None):
+        self.file = file
+        self.sha256 = sha256
+        self.size = size
+        self.path = path
+
+    def close(self):
+        self.file.close()
+
+
+def spool_chunks(chunks, max_bytes=None):
+    """
+    Copy byte chunks into a spooled temp file, hashing as they arrive.
+    Raises ResumeTooLarge as soon as `max_bytes` is exceeded.
+    """
+
+    max_bytes = max_bytes or _setting("RESUME_MAX_BYTES", str(10 * 1024 * 1024))
+    spool = tempfile.SpooledTemporaryFile(max_size=_setting("RESUME_SPOOL_BYTES", str(1024 * 1024)))
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            spool.close()
+            raise ResumeTooLarge(f"Resume file exceeds the {max_bytes}-byte limit")
+        digest.update(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return ResumeUpload(spool, digest.hexdigest(), size)
+
+
+def spool_stream(stream, max_bytes=None):
+    return spool_chunks(iter(lambda: stream.read(CHUNK_SIZE), b""), max_bytes)
+
+
+def spool_base64(data, max_bytes=None):
+    # Decode in 4-character-aligned slices so only one decoded chunk exists at a time.
+    data = str(data)
+    if data.startswith("data:"):
+        data = data.partition(",")[2]
+    if re.search(r"\s", data):
+        data = "".join(data.split())
+    step = CHUNK_SIZE // 3 * 4
+    return spool_chunks(
+        (base64.b64decode(data[start:start + step]) for start in range(0, len(data), step)),
+        max_bytes,
+    )
+
+
+def spool_uploaded_file(uploaded, max_bytes=None):
+    """
+    Wrap a Django UploadedFile. Files Django already wrote to disk are hashed in place.
+    """
+
+    max_bytes = max_bytes or _setting("RESUME_MAX_BYTES", str(10 * 1024 * 1024))
+    if uploaded.size and uploaded.size > max_bytes:
+        raise ResumeTooLarge(f"Resume file exceeds the {max_bytes}-byte limit")
+    if not hasattr(uploaded, "temporary_file_path"):
+        return spool_chunks(uploaded.chunks(CHUNK_SIZE), max_bytes)
+
+    digest = hashlib.sha256()
+    for chunk in uploaded.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    uploaded.seek(0)
+    return ResumeUpload(uploaded, digest.hexdigest(), uploaded.size, path=uploaded.temporary_file_path())
+
+
+def save_upload(upload, directory):
+    """
+    Copy a spooled upload into `directory`, where another process can parse it; returns the path.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4().hex}.pdf"
+    upload.file.seek(0)
+    with open(path, "wb") as handle:
+        shutil.copyfileobj(upload.file, handle, CHUNK_SIZE)
+    return path
+
+
+def open_saved_upload(path, sha256):
+    return ResumeUpload(open(path, "rb"), sha256, os.path.getsize(path), path=str(path))
+
+
+def _read_pages(reader, start, stop, cpu_budget):
+    started = time.thread_time()
+    texts = []
+    for number in range(start, min(stop, len(reader.pages))):
+        if time.thread_time() - started > cpu_budget:
+            raise ResumeParseTimeout(f"Resume parsing exceeded {cpu_budget:g}s of CPU time")
+        texts.append(reader.pages[number].extract_text() or "")
+    return texts
+
+
+def _extract_pages(path, start, stop, cpu_budget):
+    # Runs in a pool process, which opens its own reader over the file on disk.
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(path)
+    return len(reader.pages), _read_pages(reader, start, stop, cpu_budget)
+
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def _pool_size():
+    return _setting("RESUME_PARSE_PROCESSES", "2")
+
+
+def _get_pool():
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Forking a threaded server process can copy held locks into the child.
+                _pool = ProcessPoolExecutor(
+                    max_workers=_pool_size(), mp_context=multiprocessing.get_context("forkserver")
+                )
+    return _pool
+
+
+def _get_slots():
+    global _slots
+
+    if _slots is None:
+        with _pool_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(_pool_size())
+    return _slots
+
+
+def _recycle_pool(pool):
+    """
+    Kill every worker of a pool one parse overran; the next parse starts a fresh pool.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # ProcessPoolExecutor cannot kill a busy worker; once its processes are gone it
+    # marks itself broken and fails whatever was still running on it.
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+
+
+def _extract_isolated(upload, max_pages, timeout):
+    # A parse only submits to workers it holds a slot for, so its deadline never
+    # includes time queued behind other parses.
+    slots = _get_slots()
+    slots.acquire()
+    held = 1
+    if max_pages >= _setting("RESUME_PARALLEL_MIN_PAGES", "8"):
+        while held < min(_pool_size(), max_pages) and slots.acquire(blocking=False):
+            held += 1
+
+    path = upload.path
+    scratch = None
+    try:
+        pool = _get_pool()
+        if path is None:
+            upload.file.seek(0)
+            scratch = tempfile.NamedTemporaryFile(suffix=".pdf")
+            shutil.copyfileobj(upload.file, scratch, CHUNK_SIZE)
+            scratch.flush()
+            path = scratch.name
+
+        step = -(-max_pages // held)
+        futures = [
+            pool.submit(_extract_pages, path, start, start + step, timeout)
+            for start in range(0, max_pages, step)
+        ]
+        deadline = time.monotonic() + timeout
+        page_count, texts = 0, []
+        for future in futures:
+            try:
+                page_count, chunk = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                _recycle_pool(pool)
+                raise ResumeParseTimeout(f"Resume parsing exceeded {timeout:g}s") from None
+            texts.extend(chunk)
+        return page_count, texts
+    finally:
+        if scratch is not None:
+            scratch.close()
+        for _ in range(held):
+            slots.release()
+
+
+def extract_text(upload):
+    """
+    `(text, warnings)` for a spooled PDF, reading at most RESUME_MAX_PAGES pages.
+
+    Parsing runs on a pool of RESUME_PARSE_PROCESSES processes (long files split
+    across idle workers), and a parse still running after RESUME_PARSE_TIMEOUT
+    seconds has its pool killed. With RESUME_PARSE_PROCESSES=0 the file is parsed
+    in this thread and the limit is only checked between pages, so opening the
+    file or one pathological page can run past it.
+    """
+
+    max_pages = _setting("RESUME_MAX_PAGES", "10")
+    timeout = float(os.getenv("RESUME_PARSE_TIMEOUT", "10"))
+
+    if _pool_size() > 0:
+        try:
+            page_count, texts = _extract_isolated(upload, max_pages, timeout)
+        except BrokenProcessPool:
+            # Another parse's timeout killed the pool under this one.
+            page_count, texts = _extract_isolated(upload, max_pages, timeout)
+    else:
+        from PyPDF2 import PdfReader
+
+        upload.file.seek(0)
+        reader = PdfReader(upload.file)
+        page_count = len(reader.pages)
+        texts = _read_pages(reader, 0, max_pages, timeout)
+
+    warnings = []
+    if page_count > max_pages:
+        warnings.append(f"Resume has {page_count} pages; only the first {max_pages} were read.")
+    return "".join(texts), warnings
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache():
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                layers = [MemoryBackend(_setting("RESUME_CACHE_MAX_ENTRIES", "256"))]
+                # Resume text is personal data, so it only reaches disk when asked to.
+                if os.getenv("RESUME_CACHE_DISK", "off").lower() in ("1", "on", "true", "yes"):
+                    path = os.getenv("RESUME_CACHE_PATH") or DEFAULT_CACHE_DIR / "resume_text.sqlite3"
+                    layers.append(SQLiteBackend(path, _setting("RESUME_CACHE_MAX_DISK_ENTRIES", "5000")))
+                _cache = TieredBackend(*layers)
+    return _cache
+
+
+def extract_resume_text(upload):
+    """
+    Cached `extract_text`, keyed by the file's sha256 and the page cap, so re-uploads skip parsing.
+    """
+
+    key = f"resume:{upload.sha256}:{_setting('RESUME_MAX_PAGES', '10')}"
+    cache = _get_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        text, warnings = json.loads(cached)
+        return text, warnings
+
+    text, warnings = extract_text(upload)
+    cache.set(key, json.dumps([text, warnings]), int(os.getenv("RESUME_CACHE_TTL", "604800")) or None)
+    return text, warnings
@@ -0,0 +1,169 @@
+import math
+import os
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from .dataset_loader import get_title_index, load_job_dataset
+
+# -----------------------------
+# Relevance-ranked Description Retrieval
+# -----------------------------
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can could do does
+for from has have having he her his how i if in into is it its job may more most must not
+of on or our out over role she should so such than that the their them then there these
+they this those to under up us we were what when where which while who will with would you
+your
+""".split())
+
+POOL_SIZE = int(os.getenv("RETRIEVAL_POOL_SIZE", "400"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 64
+DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(1234)
+_HASH_A = _rng.randint(1, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+_HASH_B = _rng.randint(0, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(str(text or "").lower()) if token not in STOPWORDS]
+
+
+def minhash_signature(text):
+    words = str(text or "").lower().split()
+    shingles = {
+        " ".join(words[i:i + SHINGLE_SIZE])
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    }
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+    permuted = (_HASH_A[:, None] * hashes[None, :] + _HASH_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def estimate_jaccard(signature_a, signature_b):
+    return float(np.mean(signature_a == signature_b))
+
+
+def _candidate_rows(role_name):
+    index = get_title_index()
+    rows = index.lookup(role_name)
+
+    if not len(rows):
+        per_token = [index.lookup(token) for token in tokenize(role_name) if len(token) >= 3]
+        per_token = [token_rows for token_rows in per_token if len(token_rows)]
+        if per_token:
+            rows = np.unique(np.concatenate(per_token))
+
+    if len(rows) > POOL_SIZE:
+        rows = rows[np.linspace(0, len(rows) - 1, POOL_SIZE).astype(np.int64)]
+    return rows
+
+
+def _score_documents(query_tokens, documents):
+    """
+    BM25 relevance to the role name plus TF-IDF cosine to the pool centroid,
+    so postings that read like the typical posting for the role rank first.
+    """
+
+    counts = [Counter(tokenize(document)) for document in documents]
+    n_docs = len(counts)
+    lengths = np.array([sum(count.values()) for count in counts], dtype=float)
+    avg_length = lengths.mean() if n_docs else 0.0
+
+    document_frequency = Counter()
+    for count in counts:
+        document_frequency.update(count.keys())
+    idf = {
+        term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for term, df in document_frequency.items()
+    }
+
+    bm25 = np.zeros(n_docs)
+    for i, count in enumerate(counts):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[i] / (avg_length or 1.0))
+        for term in set(query_tokens):
+            tf = count.get(term, 0)
+            if tf:
+                bm25[i] += idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+
+    weights = []
+    centroid = Counter()
+    for count in counts:
+        vector = {term: (1 + math.log(tf)) * idf[term] for term, tf in count.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        vector = {term: value / norm for term, value in vector.items()}
+        weights.append(vector)
+        centroid.update(vector)
+    centroid_norm = math.sqrt(sum(value * value for value in centroid.values())) or 1.0
+    representativeness = np.array([
+        sum(value * centroid[term] for term, value in vector.items()) / centroid_norm
+        for vector in weights
+    ])
+
+    relevance = bm25 / bm25.max() if bm25.max() > 0 else bm25
+    return representativeness + 0.5 * relevance
+
+
+def _trim_to_sentence(text, budget):
+    clipped = text[:budget]
+    boundary = max(clipped.rfind(". "), clipped.rfind("\n"))
+    return clipped[:boundary + 1].strip() if boundary > 0 else clipped.strip()
+
+
+def retrieve_role_descriptions(role_name, char_budget=8000, top_k=12):
+    """
+    Return the most representative, de-duplicated postings for a role,
+    whole descriptions only, fitting inside `char_budget` characters.
+    """
+
+    rows = _candidate_rows(role_name)
+    if not len(rows):
+        return []
+
+    pool = [
+        (str(title or ""), str(description))
+        for title, description in zip(*load_job_dataset().take(rows))
+        if description is not None
+    ]
+    if not pool:
+        return []
+
+    titles = [title for title, _ in pool]
+    descriptions = [description for _, description in pool]
+    documents = [f"{title} {title} {description}" for title, description in zip(titles, descriptions)]
+    scores = _score_documents(tokenize(role_name), documents)
+
+    selected = []
+    signatures = []
+    used = 0
+    for position in np.argsort(-scores, kind="stable"):
+        description = descriptions[position].strip()
+        if not description:
+            continue
+
+        remaining = char_budget - used
+        if len(description) > remaining:
+            if selected:
+                continue
+            description = _trim_to_sentence(description, remaining)
+
+        signature = minhash_signature(description)
+        if any(estimate_jaccard(signature, other) >= DUPLICATE_THRESHOLD for other in signatures):
+            continue
+
+        selected.append(description)
+        signatures.append(signature)
+        used += len(description) + 2
+        if len(selected) >= top_k or used >= char_budget:
+            break
+
+    return selected
@@ -0,0 +1,302 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .llm_cache import DEFAULT_CACHE_DIR
+from .role_skill_extractor import role_key
+from .skill_matcher import SkillMatcher, load_vocabulary
+
+# -----------------------------
+# Statistical Role Profiles
+# -----------------------------
+
+PROFILE_VERSION = 1
+CATEGORIES = ("technical", "tools", "soft")
+
+# Skills kept per category in a mined profile.
+TOP_SKILLS = {"technical": 10, "tools": 8, "soft": 5}
+
+
+def role_skill_lists():
+    """
+    `{category: skill names}` across the hand-written and snapshot roles.
+    """
+
+    from .role_data import ROLE_SKILL_FALLBACK
+    from .role_skill_extractor import ROLE_SKILL_SNAPSHOT, load_role_skill_snapshot
+
+    load_role_skill_snapshot()
+    lists = {category: [] for category in CATEGORIES}
+    for skills in [*ROLE_SKILL_FALLBACK.values(), *ROLE_SKILL_SNAPSHOT.values()]:
+        if not isinstance(skills, dict) or skills.get("error"):
+            continue
+        for category in CATEGORIES:
+            lists[category].extend(str(skill) for skill in skills.get(category) or [])
+    return lists
+
+
+def role_vocabulary(role_lists=None):
+    """
+    The fallback matcher vocabulary plus every skill of the hand-written and snapshot roles.
+    """
+
+    role_lists = role_skill_lists() if role_lists is None else role_lists
+    vocabulary = {category: list(role_lists.get(category) or []) for category in CATEGORIES}
+    for category, keywords in load_vocabulary().items():
+        vocabulary.setdefault(category, []).extend(keywords)
+    return vocabulary
+
+
+def _role_display_names(role_lists):
+    """
+    `{key: label}` spelled as the role lists write it ("Power BI", not "Power Bi").
+    """
+
+    display = {}
+    for category in CATEGORIES:
+        for skill in (role_lists or {}).get(category) or []:
+            display.setdefault(str(skill).strip().lower(), str(skill).strip())
+    return display
+
+
+def _category_votes(vocabulary):
+    votes = {}
+    for category, keywords in (vocabulary or {}).items():
+        if category not in CATEGORIES:
+            continue
+        for keyword in keywords:
+            key = str(keyword).strip().lower()
+            votes.setdefault(key, dict.fromkeys(CATEGORIES, 0))[category] += 1
+    return votes
+
+
+def _skill_categories(vocabulary, role_lists=None):
+    """
+    One category per keyword: the one most vocabulary entries file it under,
+    with ties going to the category the role lists use most.
+    """
+
+    votes = _category_votes(vocabulary)
+    role_votes = _category_votes(role_lists)
+    empty = dict.fromkeys(CATEGORIES, 0)
+    return {
+        key: max(CATEGORIES, key=lambda category: (counts[category], role_votes.get(key, empty)[category]))
+        for key, counts in votes.items()
+    }
+
+
+_worker_matcher = None
+_worker_ids = None
+
+
+def _init_worker(vocabulary):
+    global _worker_matcher, _worker_ids
+
+    _worker_matcher = SkillMatcher(vocabulary)
+    _worker_ids = {key: index for index, key in enumerate(sorted(_worker_matcher.categories))}
+
+
+def _match_chunk(descriptions):
+    """
+    Per-posting skill counts and the concatenated skill ids for one chunk of postings.
+    """
+
+    lengths = np.zeros(len(descriptions), dtype=np.int32)
+    ids = []
+    for row, description in enumerate(descriptions):
+        found = [_worker_ids[key] for key in _worker_matcher.keys(description or "")]
+        lengths[row] = len(found)
+        ids.extend(found)
+    return lengths, np.asarray(ids, dtype=np.int32)
+
+
+def match_postings(descriptions, vocabulary, workers=None, chunk_size=5000):
+    """
+    `(lengths, skill_ids)` for every posting, matched across `workers`
+    processes (all cores by default; 1 matches in this process).
+    """
+
+    chunks = [descriptions[start:start + chunk_size] for start in range(0, len(descriptions), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(vocabulary)
+        results = [_match_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)), initializer=_init_worker, initargs=(vocabulary,)
+        ) as executor:
+            results = list(executor.map(_match_chunk, chunks))
+
+    if not results:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    return np.concatenate([lengths for lengths, _ in results]), np.concatenate([ids for _, ids in results])
+
+
+def mine_role_profiles(
+    titles, descriptions, vocabulary, role_lists=None, min_postings=20, min_share=0.05, workers=None
+):
+    """
+    Ranked skills per role title, scored by TF-IDF over postings.
+
+    A skill's term frequency for a role is the share of the role's postings
+    naming it; its inverse document frequency is taken over every posting, so
+    skills every job asks for rank below the ones that set a role apart.
+    Skills named in `role_lists` keep that spelling and, on a category tie,
+    that category. Returns `{role key: profile}` for roles with at least
+    `min_postings` postings.
+    """
+
+    matcher = SkillMatcher(vocabulary, display=_role_display_names(role_lists))
+    keys = sorted(matcher.categories)
+    size = len(keys)
+    categories = _skill_categories(vocabulary, role_lists)
+
+    role_keys = [role_key(title) for title in titles]
+    names, codes, counts = {}, np.full(len(titles), -1, dtype=np.int64), {}
+    for key, title in zip(role_keys, titles):
+        if key:
+            counts[key] = counts.get(key, 0) + 1
+            names.setdefault(key, str(title).strip())
+    roles = sorted(key for key, count in counts.items() if count >= min_postings)
+    role_ids = {key: index for index, key in enumerate(roles)}
+    for row, key in enumerate(role_keys):
+        codes[row] = role_ids.get(key, -1)
+    role_sizes = np.bincount(codes[codes >= 0], minlength=len(roles))
+
+    lengths, skill_ids = match_postings(descriptions, vocabulary, workers=workers)
+    postings = np.repeat(np.arange(len(descriptions)), lengths)
+    document_frequency = np.bincount(skill_ids, minlength=size)
+    idf = np.log((1 + len(descriptions)) / (1 + document_frequency)) + 1
+
+    # Sparse role x skill posting counts, role-major.
+    posting_roles = codes[postings]
+    kept = posting_roles >= 0
+    cells, cell_counts = np.unique(posting_roles[kept] * size + skill_ids[kept], return_counts=True)
+    cell_roles, cell_skills = cells // size, cells % size
+    share = cell_counts / role_sizes[cell_roles]
+    scores = share * idf[cell_skills]
+
+    order = np.lexsort((cell_skills, -scores, cell_roles))
+    bounds = np.searchsorted(cell_roles[order], np.arange(len(roles) + 1))
+
+    profiles = {}
+    for index, key in enumerate(roles):
+        skills = {category: [] for category in CATEGORIES}
+        ranked = {}
+        for cell in order[bounds[index]:bounds[index + 1]]:
+            if share[cell] < min_share:
+                continue
+            skill = keys[cell_skills[cell]]
+            category = categories.get(skill)
+            if category is not None and len(skills[category]) < TOP_SKILLS[category]:
+                skills[category].append(matcher.display[skill])
+                ranked[matcher.display[skill]] = round(float(scores[cell]), 4)
+        profiles[key] = {
+            "role": names[key],
+            "postings": int(role_sizes[index]),
+            "skills": skills,
+            "scores": ranked,
+        }
+    return profiles
+
+
+def profile_agreement(skills, profile_skills):
+    """
+    Per-category share of `skills` (e.g. an LLM extraction) that the mined profile also lists.
+    """
+
+    agreement = {}
+    for category in CATEGORIES:
+        listed = {str(skill).strip().lower() for skill in (skills or {}).get(category) or []}
+        mined = {str(skill).strip().lower() for skill in (profile_skills or {}).get(category) or []}
+        agreement[category] = round(len(listed & mined) / len(listed), 4) if listed else None
+    return agreement
+
+
+def get_profiles_path():
+    return Path(os.getenv("ROLE_PROFILES_PATH") or DEFAULT_CACHE_DIR / "role_profiles.json")
+
+
+def write_role_profiles(profiles, path, fingerprint=None, postings=0):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({
+            "version": PROFILE_VERSION,
+            "built_at": time.time(),
+            "dataset_fingerprint": fingerprint,
+            "postings": postings,
+            "roles": profiles,
+        }, handle, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+ROLE_PROFILES = {}
+ROLE_PROFILE_NAMES = {}
+_profiles_loaded = False
+_profiles_generation = 0
+_profiles_lock = threading.Lock()
+
+
+def load_role_profiles(path=None):
+    """
+    Load the mined profiles once per process; lookups are then plain dict hits.
+    """
+
+    global _profiles_loaded, _profiles_generation
+
+    with _profiles_lock:
+        if _profiles_loaded and path is None:
+            return ROLE_PROFILES
+        try:
+            with open(path or get_profiles_path(), encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict) or data.get("version") != PROFILE_VERSION:
+            data = {}
+        roles = data.get("roles")
+        roles = {
+            key: entry for key, entry in roles.items() if isinstance(entry, dict) and "skills" in entry
+        } if isinstance(roles, dict) else {}
+        ROLE_PROFILES.clear()
+        ROLE_PROFILES.update({key: entry["skills"] for key, entry in roles.items()})
+        ROLE_PROFILE_NAMES.clear()
+        ROLE_PROFILE_NAMES.update({key: entry.get("role") or key for key, entry in roles.items()})
+        _profiles_loaded = True
+        _profiles_generation += 1
+
+    return ROLE_PROFILES
+
+
+def role_profiles_generation():
+    if not _profiles_loaded:
+        load_role_profiles()
+    return _profiles_generation
+
+
+def get_role_profile(role_name):
+    """
+    The mined skills for a role, or None when the dataset has too few postings for it.
+    """
+
+    if not _profiles_loaded:
+        load_role_profiles()
+    return ROLE_PROFILES.get(role_key(role_name))
+
+
+def role_skill_source():
+    """
+    ROLE_SKILL_SOURCE: `llm` (default) or `profile`, which answers from the
+    mined profile before asking the LLM.
+    """
+
+    source = os.getenv("ROLE_SKILL_SOURCE", "llm").strip().lower()
+    return source if source in ("llm", "profile") else "llm"
+
@@ -0,0 +1,163 @@
+import threading
+
+import numpy as np
+
+from .gap_analyzer import WEIGHTS, calculate_readiness_estimate, identify_missing_skills
+from .role_data import ROLE_SKILL_FALLBACK
+from .role_profiles import ROLE_PROFILE_NAMES, ROLE_PROFILES, load_role_profiles
+from .role_skill_extractor import (
+    ROLE_SKILL_CACHE,
+    ROLE_SKILL_SNAPSHOT,
+    ROLE_SKILL_SNAPSHOT_NAMES,
+    role_catalog_version,
+    role_key,
+)
+
+# -----------------------------
+# Vectorized Multi-role Alignment
+# -----------------------------
+
+CATEGORIES = ("technical", "tools", "soft")
+
+
+def _role_skills(skills):
+    if not isinstance(skills, dict) or skills.get("error"):
+        return None
+    return {category: [str(item) for item in (skills.get(category) or [])] for category in CATEGORIES}
+
+
+class RoleMatrix:
+    """
+    Every known role's skills as one sparse role x skill matrix per category.
+
+    Each category is stored in coordinate form (`rows[i]` holds skill
+    `columns[i]`), so scoring a user against all roles is a vocabulary lookup
+    plus one `bincount` per category. Scores follow `calculate_alignment`:
+    matched distinct skills over the role's list length, weighted by WEIGHTS.
+    """
+
+    def __init__(self, roles):
+        self.names = [name for name, _ in roles]
+        self.skills = [skills for _, skills in roles]
+        self.vocabulary = {}
+        self.rows = {}
+        self.columns = {}
+        self.totals = {}
+
+        for category in CATEGORIES:
+            vocabulary = {}
+            rows, columns, totals = [], [], []
+            for row, skills in enumerate(self.skills):
+                items = skills[category]
+                totals.append(len(items))
+                for skill in set(items):
+                    rows.append(row)
+                    columns.append(vocabulary.setdefault(skill, len(vocabulary)))
+            self.vocabulary[category] = vocabulary
+            self.rows[category] = np.asarray(rows, dtype=np.int32)
+            self.columns[category] = np.asarray(columns, dtype=np.int32)
+            self.totals[category] = np.asarray(totals, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def scores(self, user_skills):
+        """
+        Unrounded weighted alignment (0-1) of `user_skills` against every role, in row order.
+        """
+
+        total = np.zeros(len(self), dtype=np.float64)
+        for category in CATEGORIES:
+            vocabulary = self.vocabulary[category]
+            held = np.zeros(len(vocabulary), dtype=np.float64)
+            ids = [vocabulary[skill] for skill in set(user_skills.get(category) or []) if skill in vocabulary]
+            held[ids] = 1.0
+
+            matches = np.bincount(self.rows[category], weights=held[self.columns[category]], minlength=len(self))
+            totals = self.totals[category]
+            ratio = np.divide(matches, totals, out=np.zeros_like(matches), where=totals > 0)
+            total += ratio * WEIGHTS[category]
+        return total
+
+    def top(self, user_skills, k):
+        """
+        Row ids of the `k` best-aligned roles, best first (ties keep catalog order).
+        """
+
+        scores = self.scores(user_skills)
+        k = min(k, len(self))
+        if k <= 0:
+            return [], scores
+        # Everything scoring at least the k-th best score, then a stable sort of just those rows.
+        threshold = np.partition(scores, len(self) - k)[len(self) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return order.tolist(), scores
+
+
+def known_roles():
+    """
+    `[(name, skills)]` for the fallback catalog, the mined role profiles, the
+    offline snapshot and every cached extraction; later sources win for the
+    same role key.
+    """
+
+    load_role_profiles()
+    names = {**ROLE_PROFILE_NAMES, **ROLE_SKILL_SNAPSHOT_NAMES}
+    roles = {}
+    for name, skills in ROLE_SKILL_FALLBACK.items():
+        if name != "default":
+            names[role_key(name)] = name
+            roles[role_key(name)] = skills
+    roles.update(ROLE_PROFILES)
+    roles.update(ROLE_SKILL_SNAPSHOT)
+    roles.update(ROLE_SKILL_CACHE.items())
+
+    catalog = []
+    for key, skills in roles.items():
+        skills = _role_skills(skills)
+        if skills is not None:
+            catalog.append((names.get(key, key), skills))
+    return catalog
+
+
+_matrix = None
+_matrix_version = None
+_lock = threading.Lock()
+
+
+def get_role_matrix():
+    """
+    The shared RoleMatrix, rebuilt only when the role catalog has changed.
+    """
+
+    global _matrix, _matrix_version
+
+    version = role_catalog_version()
+    if _matrix is None or _matrix_version != version:
+        with _lock:
+            if _matrix is None or _matrix_version != version:
+                _matrix = RoleMatrix(known_roles())
+                _matrix_version = version
+    return _matrix
+
+
+def rank_roles(user_skills, top_k=5):
+    """
+    Best-fit roles for a user, with the same score, missing skills and
+    readiness the single-role analysis would report.
+    """
+
+    matrix = get_role_matrix()
+    rows, scores = matrix.top(user_skills, top_k)
+    ranked = []
+    for row in rows:
+        alignment_score = round(float(scores[row]) * 100, 2)
+        ranked.append({
+            "role": matrix.names[row],
+            "alignment_score": alignment_score,
+            "missing_skills": identify_missing_skills(user_skills, matrix.skills[row]),
+            "readiness": calculate_readiness_estimate(alignment_score),
+            "role_skills": matrix.skills[row],
+        })
+    return ranked
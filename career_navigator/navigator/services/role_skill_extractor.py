@@ -1,17 +1,198 @@
-from .groq_client import call_llm, parse_llm_json
-from .dataset_loader import get_role_descriptions
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from .groq_client import acall_llm, call_llm, parse_llm_json
+from .llm_cache import DEFAULT_CACHE_DIR, MemoryBackend
+from .single_flight import AsyncSingleFlight, SingleFlight
 
-# In-memory cache
-ROLE_SKILL_CACHE = {}
+# Bump whenever role_key changes, so snapshots keyed the old way are rebuilt.
+SNAPSHOT_VERSION = 2
 
-def extract_role_skills(role_name):
+ROLE_ABBREVIATIONS = {
+    "eng": "engineer",
+    "engr": "engineer",
+    "dev": "developer",
+    "devs": "developer",
+    "sr": "senior",
+    "jr": "junior",
+    "mgr": "manager",
+    "mngr": "manager",
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "fullstack": "full stack",
+    "front-end": "frontend",
+    "back-end": "backend",
+}
+
+
+def role_key(role_name):
+    """
+    Canonical cache key: lowercase, punctuation-trimmed, abbreviations expanded.
+    """
+
+    words = re.findall(r"[a-z0-9][a-z0-9+#./-]*", str(role_name or "").lower())
+    words = [ROLE_ABBREVIATIONS.get(word.rstrip(".-"), word.rstrip(".-")) for word in words]
+    return " ".join(word for word in words if word)
+
+
+class RoleSkillCache:
+    """
+    Bounded, thread-safe role skill cache keyed by `role_key`.
+    LLM error results are kept only for a short negative TTL.
+    """
+
+    def __init__(self, max_entries=512, ttl=None, error_ttl=60):
+        self._store = MemoryBackend(max_entries)
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        # Bumped whenever a role's skills change, so derived indexes know to rebuild.
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def get(self, role_name):
+        value = self._store.get(role_key(role_name))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            elif isinstance(value, dict) and value.get("error"):
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+        return value
+
+    def peek(self, role_name):
+        return self._store.get(role_key(role_name))
+
+    def set(self, role_name, skills):
+        is_error = isinstance(skills, dict) and skills.get("error")
+        ttl = self.error_ttl if is_error else self.ttl
+        if is_error and not ttl:
+            return
+        key = role_key(role_name)
+        if not is_error and self._store.get(key) != skills:
+            with self._lock:
+                self.version += 1
+        self._store.set(key, skills, ttl)
+
+    def items(self):
+        """
+        `(role key, skills)` for every cached role that is not an error result.
+        """
+
+        return [
+            (key, value) for key, value in self._store.items()
+            if not (isinstance(value, dict) and value.get("error"))
+        ]
+
+    def clear(self):
+        self._store.clear()
+        with self._lock:
+            self.version += 1
+
+    def stats(self):
+        total = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._store),
+            "max_entries": self._store.max_entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self._store.evictions,
+            "hit_rate": round((self.hits + self.negative_hits) / total, 4) if total else 0.0,
+        }
 
-    if role_name in ROLE_SKILL_CACHE:
-        return ROLE_SKILL_CACHE[role_name]
 
-    descriptions = get_role_descriptions(role_name)
+ROLE_SKILL_CACHE = RoleSkillCache(
+    max_entries=int(os.getenv("ROLE_SKILL_CACHE_MAX_ENTRIES", "512")),
+    ttl=int(os.getenv("ROLE_SKILL_CACHE_TTL", "0")) or None,
+    error_ttl=int(os.getenv("ROLE_SKILL_ERROR_TTL", "60")),
+)
 
-    prompt = f"""
+ROLE_FLIGHT = SingleFlight()
+ASYNC_ROLE_FLIGHT = AsyncSingleFlight()
+
+# Offline snapshot built by `manage.py build_role_skill_snapshot`
+ROLE_SKILL_SNAPSHOT = {}
+ROLE_SKILL_SNAPSHOT_NAMES = {}
+_snapshot_loaded = False
+_snapshot_generation = 0
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot_path():
+    return Path(os.getenv("ROLE_SKILL_SNAPSHOT_PATH") or DEFAULT_CACHE_DIR / "role_skill_snapshot.json")
+
+
+def read_snapshot(path=None):
+    path = Path(path or get_snapshot_path())
+    try:
+        with open(path, encoding="utf-8") as handle:
+            snapshot = json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def load_role_skill_snapshot(path=None):
+    """
+    Load the offline snapshot once per process; lookups are then plain dict hits.
+    """
+
+    global _snapshot_loaded, _snapshot_generation
+
+    with _snapshot_lock:
+        if _snapshot_loaded and path is None:
+            return ROLE_SKILL_SNAPSHOT
+        snapshot = read_snapshot(path) or {}
+        roles = snapshot.get("roles") or {}
+        ROLE_SKILL_SNAPSHOT.clear()
+        ROLE_SKILL_SNAPSHOT.update({key: entry["skills"] for key, entry in roles.items()})
+        ROLE_SKILL_SNAPSHOT_NAMES.clear()
+        ROLE_SKILL_SNAPSHOT_NAMES.update({key: entry.get("role") or key for key, entry in roles.items()})
+        _snapshot_loaded = True
+        _snapshot_generation += 1
+
+    return ROLE_SKILL_SNAPSHOT
+
+
+def role_catalog_version():
+    """
+    Changes whenever the snapshot or mined profiles are reloaded or a cached role's skills change.
+    """
+
+    from .role_profiles import role_profiles_generation
+
+    if not _snapshot_loaded:
+        load_role_skill_snapshot()
+    return _snapshot_generation, role_profiles_generation(), ROLE_SKILL_CACHE.version
+
+
+def get_role_postings(role_name):
+    # Imported here so numpy, pyarrow and the dataset stay out of process startup.
+    from .retrieval import retrieve_role_descriptions
+
+    return "\n\n".join(retrieve_role_descriptions(
+        role_name,
+        char_budget=int(os.getenv("ROLE_PROMPT_CHAR_BUDGET", "8000")),
+    ))
+
+
+def postings_hash(descriptions):
+    return hashlib.sha256(descriptions.encode("utf-8")).hexdigest()
+
+
+def _build_prompt(descriptions):
+    return f"""
     Extract required skills from the following job descriptions.
 
     Return ONLY valid JSON in this format:
@@ -23,15 +204,82 @@ def extract_role_skills(role_name):
     }}
 
     Job Descriptions:
-    {descriptions[:8000]}
+    {descriptions}
     """
 
-    response = call_llm(prompt)
 
+def _parse_response(response):
     try:
         skills = parse_llm_json(response)
-    except ValueError:
-        return {"error": "Invalid JSON from LLM"}
+    except ValueError as exc:
+        return {"error": str(exc)}
+
+    return skills
+
+
+def extract_skills_from_postings(descriptions):
+    return _parse_response(call_llm(_build_prompt(descriptions)))
+
+
+def _known_role_skills(role_name):
+    cached = ROLE_SKILL_CACHE.peek(role_name)
+    if cached is not None:
+        return cached
+
+    if not _snapshot_loaded:
+        load_role_skill_snapshot()
+    snapshot_skills = ROLE_SKILL_SNAPSHOT.get(role_key(role_name))
+    if snapshot_skills is not None:
+        ROLE_SKILL_CACHE.set(role_name, snapshot_skills)
+        return snapshot_skills
 
-    ROLE_SKILL_CACHE[role_name] = skills
+    from .role_profiles import get_role_profile, role_skill_source
+
+    if role_skill_source() == "profile":
+        profile_skills = get_role_profile(role_name)
+        if profile_skills is not None:
+            ROLE_SKILL_CACHE.set(role_name, profile_skills)
+        return profile_skills
+    return None
+
+
+def extract_role_skills(role_name):
+
+    cached = ROLE_SKILL_CACHE.get(role_name)
+    if cached is not None:
+        return cached
+
+    return ROLE_FLIGHT.do(role_key(role_name), lambda: _extract_role_skills_uncached(role_name))
+
+
+def _extract_role_skills_uncached(role_name):
+    known = _known_role_skills(role_name)
+    if known is not None:
+        return known
+
+    skills = extract_skills_from_postings(get_role_postings(role_name))
+    ROLE_SKILL_CACHE.set(role_name, skills)
     return skills
+
+
+async def aextract_role_skills(role_name):
+    """
+    Async `extract_role_skills`; the snapshot load, pandas retrieval and any
+    other blocking lookups run in worker threads.
+    """
+
+    cached = ROLE_SKILL_CACHE.get(role_name)
+    if cached is not None:
+        return cached
+
+    async def compute():
+        known = await asyncio.to_thread(_known_role_skills, role_name)
+        if known is not None:
+            return known
+
+        descriptions = await asyncio.to_thread(get_role_postings, role_name)
+        skills = _parse_response(await acall_llm(_build_prompt(descriptions)))
+        ROLE_SKILL_CACHE.set(role_name, skills)
+        return skills
+
+    return await ASYNC_ROLE_FLIGHT.do(role_key(role_name), compute)
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from .llm_cache import DEFAULT_CACHE_DIR, reset_connections_on_fork
+
+# -----------------------------
+# Single-flight Coalescing
+# -----------------------------
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LeaseStore:
+    """
+    Cross-process mutual exclusion per key, backed by SQLite rows with an expiry
+    so a crashed holder cannot block others for longer than `ttl` seconds.
+    """
+
+    def __init__(self, path, ttl=60):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._token = uuid.uuid4().hex
+        self._local = threading.local()
+        reset_connections_on_fork(self)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    @property
+    def owner(self):
+        # Includes the pid so forked workers never mistake each other's leases for their own.
+        return f"{os.getpid()}-{self._token}"
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def try_acquire(self, key):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != self.owner and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + self.ttl),
+            )
+            return True
+        finally:
+            conn.execute("COMMIT")
+
+    def acquire(self, key):
+        delay = 0.05
+        deadline = time.monotonic() + self.ttl
+        while not self.try_acquire(key):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        return True
+
+    def release(self, key):
+        self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+
+class SingleFlight:
+    """
+    Concurrent callers with the same key share one execution of `func`.
+
+    Within a process, followers block on the leader's result. With a
+    `LeaseStore`, leaders in different processes also take turns per key, so
+    the second process runs `func` only after the first has finished (and, for
+    cache-backed work, finds the result already stored).
+    """
+
+    def __init__(self, lease_store=None):
+        self.lease_store = lease_store
+        self.leaders = 0
+        self.followers = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.followers += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        leased = self.lease_store.acquire(key) if self.lease_store else False
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            if leased:
+                self.lease_store.release(key)
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.followers,
+            "in_flight": len(self._calls),
+            "cross_process": self.lease_store is not None,
+        }
+
+
+class AsyncSingleFlight:
+    """
+    `SingleFlight` for coroutines on one event loop.
+
+    The shared call runs in its own task and every caller, the first one
+    included, awaits it through `asyncio.shield`, so a cancelled caller (a
+    client that disconnected) stops waiting without cancelling the call for
+    the others.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._calls = {}
+
+    def _forget(self, loop_key, task):
+        if self._calls.get(loop_key) is task:
+            del self._calls[loop_key]
+        if not task.cancelled():
+            # Mark the error retrieved; callers that still wait re-raise it themselves.
+            task.exception()
+
+    async def do(self, key, func):
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        task = self._calls.get(loop_key)
+        if task is not None and task.get_loop() is loop:
+            self.followers += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._calls[loop_key] = task
+            task.add_done_callback(lambda done: self._forget(loop_key, done))
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.followers,
+            "in_flight": len(self._calls),
+        }
+
+
+def build_single_flight():
+    """
+    In-process coalescing, plus a SQLite lease when SINGLE_FLIGHT_CROSS_PROCESS is on.
+    """
+
+    if os.getenv("SINGLE_FLIGHT_CROSS_PROCESS", "off").lower() not in ("1", "on", "true", "yes"):
+        return SingleFlight()
+    path = os.getenv("SINGLE_FLIGHT_LEASE_PATH") or DEFAULT_CACHE_DIR / "single_flight.sqlite3"
+    return SingleFlight(LeaseStore(path, ttl=float(os.getenv("SINGLE_FLIGHT_LEASE_TTL", "60"))))
@@ -1,9 +1,8 @@
-from .groq_client import call_llm, parse_llm_json
+from .groq_client import acall_llm, call_llm, parse_llm_json
 
 
-def extract_user_skills(resume_text):
-
-    prompt = f"""
+def _build_prompt(resume_text):
+    return f"""
     Extract structured skills from the following resume.
 
     Return ONLY valid JSON in this format:
@@ -19,11 +18,19 @@ def extract_user_skills(resume_text):
     {resume_text}
     """
 
-    response = call_llm(prompt)
 
+def _parse_response(response):
     try:
         skills = parse_llm_json(response)
-    except ValueError:
-        return {"error": "Invalid JSON from LLM"}
+    except ValueError as exc:
+        return {"error": str(exc)}
 
     return skills
+
+
+def extract_user_skills(resume_text):
+    return _parse_response(call_llm(_build_prompt(resume_text)))
+
+
+async def aextract_user_skills(resume_text):
+    return _parse_response(await acall_llm(_build_prompt(resume_text)))
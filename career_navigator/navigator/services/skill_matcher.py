@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import threading
+
+# -----------------------------
+# Single-pass Keyword Skill Matcher
+# -----------------------------
+
+KEYWORD_SKILLS = {
+    "technical": [
+        "python", "java", "javascript", "typescript", "react", "node", "sql", "django", "flask", "api",
+        "machine learning", "data analysis", "excel", "tableau", "power bi", "a/b testing", "statistics",
+    ],
+    "tools": [
+        "git", "github", "docker", "firebase", "figma", "jira", "vscode", "postman",
+    ],
+    "soft": [
+        "communication", "leadership", "collaboration", "problem solving", "stakeholder management", "storytelling",
+    ],
+}
+
+_END = ""
+
+
+def _display_name(keyword):
+    # Lowercase entries keep the historical title-cased labels; mixed-case ones ("Node.js") are kept as written.
+    return keyword.title() if keyword == keyword.lower() else keyword
+
+
+def _is_word(char):
+    return char.isalnum() or char == "_"
+
+
+def _alternation(branches):
+    return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+
+def _trie_pattern(node, last_char=""):
+    """
+    Regex for a character trie, so each text position costs at most one keyword length of work.
+    A keyword ending in a word character must not be followed by one.
+    """
+
+    end = r"(?!\w)" if _is_word(last_char) else ""
+    branches = [re.escape(char) + _trie_pattern(child, char) for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return end
+    body = _alternation(branches)
+    if _END in node:
+        return f"(?:{body}|{end})" if end else f"(?:{body})?"
+    return body
+
+
+def _matcher_pattern(trie):
+    """
+    The whole trie inside a lookahead, so overlapping keywords are all found.
+    Only keywords starting with a word character need a word start (".net" matches in "asp.net").
+    """
+
+    word = [re.escape(char) + _trie_pattern(child, char) for char, child in sorted(trie.items()) if _is_word(char)]
+    other = [re.escape(char) + _trie_pattern(child, char) for char, child in sorted(trie.items()) if not _is_word(char)]
+    branches = ([r"(?<!\w)" + _alternation(word)] if word else []) + other
+    return re.compile(rf"(?=({_alternation(branches)}))")
+
+
+class SkillMatcher:
+    """
+    Every vocabulary keyword found in a text, in one scan.
+
+    Keywords are compiled into a single trie-shaped regex inside a lookahead,
+    so matches may overlap ("machine learning" and "learning" are both found).
+    A keyword edge that is a word character must sit on a word boundary, as
+    with the previous per-keyword `\\bkeyword\\b` searches; an edge that is
+    not ("c++", ".net") needs no boundary, so "C++", "C#" and the ".net" in
+    "asp.net" are all found.
+    `display` optionally maps keywords to the labels reported for them,
+    overriding the spelling of whichever entry registered the keyword first.
+    """
+
+    def __init__(self, vocabulary, display=None):
+        self.categories = {}
+        self.display = {}
+        trie = {}
+        for category, keywords in vocabulary.items():
+            for keyword in keywords:
+                key = str(keyword).strip().lower()
+                if not key:
+                    continue
+                self.categories.setdefault(key, set()).add(category)
+                self.display.setdefault(key, _display_name(str(keyword).strip()))
+                node = trie
+                for char in key:
+                    node = node.setdefault(char, {})
+                node[_END] = True
+        for keyword, label in (display or {}).items():
+            key = str(keyword).strip().lower()
+            if key in self.categories and str(label).strip():
+                self.display[key] = str(label).strip()
+
+        # Shorter keywords that start where a longer one does ("power" inside "power bi").
+        self.prefixes = {
+            key: [
+                key[:cut] for cut in range(1, len(key))
+                if key[:cut] in self.categories and not (_is_word(key[cut - 1]) and _is_word(key[cut]))
+            ]
+            for key in self.categories
+        }
+        self.pattern = _matcher_pattern(trie) if trie else None
+
+    def __len__(self):
+        return len(self.categories)
+
+    def positions(self, text):
+        """
+        `{key: offset of its first mention}` for every keyword in `text`.
+        """
+
+        first = {}
+        if self.pattern is None or not text:
+            return first
+        for match in self.pattern.finditer(text.lower()):
+            key = match.group(1)
+            if key in first:
+                continue
+            first[key] = match.start()
+            for prefix in self.prefixes[key]:
+                first.setdefault(prefix, match.start())
+        return first
+
+    def keys(self, text):
+        """
+        Lowercase keys of every keyword in `text`.
+        """
+
+        return set(self.positions(text))
+
+    def find(self, text):
+        """
+        `{category: set of display names}` for every keyword in `text`.
+        """
+
+        found = {category: set() for keywords in self.categories.values() for category in keywords}
+        for key in self.keys(text):
+            for category in self.categories[key]:
+                found[category].add(self.display[key])
+        return found
+
+
+def load_vocabulary():
+    """
+    KEYWORD_SKILLS merged with the optional SKILL_VOCABULARY_PATH file
+    (a JSON object of category -> keyword list).
+    """
+
+    vocabulary = {category: list(keywords) for category, keywords in KEYWORD_SKILLS.items()}
+    path = os.getenv("SKILL_VOCABULARY_PATH")
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            for category, keywords in json.load(handle).items():
+                vocabulary.setdefault(category, []).extend(keywords)
+    return vocabulary
+
+
+_matcher = None
+_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    global _matcher
+
+    if _matcher is None:
+        with _lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(load_vocabulary())
+    return _matcher
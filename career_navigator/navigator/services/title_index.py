@@ -0,0 +1,129 @@
+import pickle
+from collections import defaultdict
+
+import numpy as np
+
+# -----------------------------
+# Trigram Index over Job Titles
+# -----------------------------
+
+NGRAM = 3
+INDEX_VERSION = 1
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class TitleIndex:
+    """
+    Case-insensitive substring lookup over job titles.
+
+    Titles are deduplicated, each distinct title is indexed by its character
+    trigrams, and a query intersects the posting lists of its own trigrams
+    before confirming candidates with a plain substring check. Results are the
+    same row ids a case-insensitive `str.contains` scan returns, in row order.
+    """
+
+    def __init__(self, titles, row_order, row_offsets, postings, fingerprint=None):
+        self.titles = titles
+        self.row_order = row_order
+        self.row_offsets = row_offsets
+        self.postings = postings
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, titles, fingerprint=None):
+        import pandas as pd
+
+        normalized = pd.Series(titles, dtype="object").str.lower()
+        codes, uniques = pd.factorize(normalized)
+        uniques = [str(title) for title in uniques]
+
+        valid_rows = np.flatnonzero(codes >= 0)
+        valid_codes = codes[valid_rows]
+        order = np.argsort(valid_codes, kind="stable")
+        row_order = valid_rows[order].astype(np.int64)
+        row_offsets = np.searchsorted(valid_codes[order], np.arange(len(uniques) + 1)).astype(np.int64)
+
+        postings = defaultdict(list)
+        for title_id, title in enumerate(uniques):
+            for gram in _ngrams(title):
+                postings[gram].append(title_id)
+
+        postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        return cls(uniques, row_order, row_offsets, postings, fingerprint=fingerprint)
+
+    def _candidate_titles(self, query):
+        grams = _ngrams(query)
+        if not grams:
+            return range(len(self.titles))
+
+        lists = []
+        for gram in grams:
+            ids = self.postings.get(gram)
+            if ids is None:
+                return []
+            lists.append(ids)
+
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                break
+        return candidates
+
+    def lookup(self, query):
+        """
+        Row ids whose title contains `query` (case-insensitive), ascending.
+        """
+
+        query = str(query or "").lower()
+        matched = [
+            title_id for title_id in self._candidate_titles(query)
+            if query in self.titles[title_id]
+        ]
+        if not matched:
+            return np.empty(0, dtype=np.int64)
+
+        rows = np.concatenate([
+            self.row_order[self.row_offsets[title_id]:self.row_offsets[title_id + 1]]
+            for title_id in matched
+        ])
+        rows.sort()
+        return rows
+
+    def save(self, path):
+        with open(path, "wb") as handle:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "fingerprint": self.fingerprint,
+                "titles": self.titles,
+                "row_order": self.row_order,
+                "row_offsets": self.row_offsets,
+                "postings": self.postings,
+            }, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, fingerprint=None):
+        """
+        Load a saved index, or return None if it is missing or stale.
+        """
+
+        try:
+            with open(path, "rb") as handle:
+                data = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        if data.get("version") != INDEX_VERSION or data.get("fingerprint") != fingerprint:
+            return None
+
+        return cls(
+            data["titles"],
+            data["row_order"],
+            data["row_offsets"],
+            data["postings"],
+            fingerprint=fingerprint,
+        )
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+
+# -----------------------------
+# Worker Warm-up
+# -----------------------------
+
+WARMUP_TIMINGS = {}
+_lock = threading.Lock()
+
+# Steps import what they load, so importing this module (e.g. from wsgi.py) stays cheap.
+
+
+def _load_config():
+    from .clients import load_config
+
+    load_config()
+
+
+def _import_heavy_modules():
+    from . import retrieval  # noqa: F401  (numpy, pyarrow)
+    import pandas  # noqa: F401
+    import PyPDF2  # noqa: F401
+    import groq  # noqa: F401
+
+
+def _load_job_dataset():
+    from .dataset_loader import load_job_dataset
+
+    load_job_dataset()
+
+
+def _load_title_index():
+    from .dataset_loader import get_title_index
+
+    get_title_index()
+
+
+def _load_role_skill_snapshot():
+    from .role_skill_extractor import load_role_skill_snapshot
+
+    load_role_skill_snapshot()
+
+
+def _load_role_profiles():
+    from .role_profiles import load_role_profiles
+
+    load_role_profiles()
+
+
+def _build_skill_matcher():
+    from .skill_matcher import get_skill_matcher
+
+    get_skill_matcher()
+
+
+def _load_skill_graph():
+    from .local_planner import get_skill_graph
+
+    get_skill_graph()
+
+
+def _open_llm_cache():
+    from .llm_cache import get_llm_cache
+
+    get_llm_cache()
+
+
+def _open_provider_health():
+    from .provider_health import get_provider_health
+
+    get_provider_health()
+
+
+def _open_clients():
+    from .clients import get_groq_client, get_http_session
+
+    for name in ("gemini", "github"):
+        get_http_session(name)
+    get_groq_client()
+
+
+WARMUP_STEPS = [
+    ("config", _load_config),
+    ("imports", _import_heavy_modules),
+    ("job_dataset", _load_job_dataset),
+    ("title_index", _load_title_index),
+    ("role_skill_snapshot", _load_role_skill_snapshot),
+    ("role_profiles", _load_role_profiles),
+    ("skill_matcher", _build_skill_matcher),
+    ("skill_graph", _load_skill_graph),
+    ("llm_cache", _open_llm_cache),
+    ("provider_health", _open_provider_health),
+    ("clients", _open_clients),
+]
+
+
+def warmup_enabled():
+    return os.getenv("WARMUP_ON_START", "off").lower() in ("1", "on", "true", "yes")
+
+
+def warm_up():
+    """
+    Run every warm-up step once per process and return `{step: seconds}`.
+    A failed step is recorded as its error message; later steps still run.
+    """
+
+    with _lock:
+        if WARMUP_TIMINGS:
+            return dict(WARMUP_TIMINGS)
+        for name, step in WARMUP_STEPS:
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:
+                WARMUP_TIMINGS[name] = f"failed: {exc}"
+                continue
+            WARMUP_TIMINGS[name] = round(time.perf_counter() - started, 4)
+        return dict(WARMUP_TIMINGS)
+
+
+def warm_up_on_start():
+    """
+    Warm the serving process when WARMUP_ON_START is on; called from the WSGI/ASGI
+    entry points so manage.py commands (migrate, runserver's reloader, workers) skip it.
+    """
+
+    if warmup_enabled():
+        warm_up()
@@ -0,0 +1,28 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from navigator.services.clients import close_clients, get_async_http_client
+
+
+class AsyncClientTests(SimpleTestCase):
+    def test_each_loop_gets_a_client_closed_with_it(self):
+        async def fetch():
+            client = get_async_http_client("gemini")
+            self.assertIs(get_async_http_client("gemini"), client)
+            return client
+
+        first = asyncio.run(fetch())
+        second = asyncio.run(fetch())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed and second.is_closed)
+
+    def test_close_clients_closes_clients_of_a_running_loop(self):
+        async def run():
+            client = get_async_http_client("github")
+            close_clients()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            return client.is_closed
+
+        self.assertTrue(asyncio.run(run()))
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from navigator.services.llm_cache import LLMCache, MemoryBackend, SQLiteBackend, TieredBackend
+
+
+class MemoryBackendTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", "1")
+        backend.set("b", "2")
+        backend.get("a")
+        backend.set("c", "3")
+        self.assertEqual((backend.get("a"), backend.get("b"), backend.get("c")), ("1", None, "3"))
+        self.assertEqual(backend.evictions, 1)
+
+    def test_expired_entries_are_misses(self):
+        backend = MemoryBackend()
+        backend.set("a", "1", ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(backend.get("a"))
+
+
+class TieredBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.memory = MemoryBackend()
+        self.disk = SQLiteBackend(Path(self.directory.name) / "cache.sqlite3", max_entries=2)
+        self.tiered = TieredBackend(self.memory, self.disk)
+
+    def test_writes_every_tier(self):
+        self.tiered.set("a", "1")
+        self.assertEqual((self.memory.get("a"), self.disk.get("a")), ("1", "1"))
+
+    def test_promotes_disk_hits_with_remaining_ttl(self):
+        self.disk.set("a", "1", ttl=60)
+        self.assertEqual(self.tiered.get("a"), "1")
+        value, expires_at = self.memory.lookup("a")
+        self.assertEqual(value, "1")
+        self.assertAlmostEqual(expires_at, self.disk.lookup("a")[1], delta=1)
+
+    def test_promoted_entry_expires_with_disk_entry(self):
+        self.disk.set("a", "1", ttl=0.05)
+        self.tiered.get("a")
+        time.sleep(0.06)
+        self.assertIsNone(self.tiered.get("a"))
+        self.assertIsNone(self.memory.get("a"))
+
+    def test_disk_tier_evicts_beyond_max_entries(self):
+        for key in "abc":
+            self.disk.set(key, key)
+        self.assertEqual(len(self.disk), 2)
+        self.assertIsNone(self.disk.get("a"))
+
+
+class LLMCacheTests(SimpleTestCase):
+    def test_counts_hits_and_misses(self):
+        cache = LLMCache(MemoryBackend())
+        key = LLMCache.make_key("prompt", 0.2, "model")
+        self.assertIsNone(cache.get(key))
+        cache.set(key, "{}")
+        self.assertEqual(cache.get(key), "{}")
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+
+    def test_key_depends_on_every_input(self):
+        keys = {
+            LLMCache.make_key("prompt", 0.2, "model"),
+            LLMCache.make_key("prompt", 0.3, "model"),
+            LLMCache.make_key("prompt", 0.2, "other"),
+            LLMCache.make_key("other", 0.2, "model"),
+        }
+        self.assertEqual(len(keys), 4)
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+class ForkTests(SimpleTestCase):
+    def test_forked_child_opens_its_own_connection(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backend = SQLiteBackend(Path(directory.name) / "cache.sqlite3")
+        parent_conn = backend._connect()
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            backend.set("a", "child")
+            os.write(write_end, b"1" if backend._connect() is not parent_conn else b"0")
+            os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read_end, 1), b"1")
+        self.assertIs(backend._connect(), parent_conn)
+        self.assertEqual(backend.get("a"), "child")
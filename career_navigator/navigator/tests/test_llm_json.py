@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+
+from navigator.services.llm_json import LLMJSONError, extract_json
+
+
+class ExtractJSONTests(SimpleTestCase):
+    def test_plain_object(self):
+        self.assertEqual(extract_json('{"technical": ["SQL"]}'), {"technical": ["SQL"]})
+
+    def test_code_fence_and_prose(self):
+        text = 'Here you go:\n```json\n{"a": 1}\n```\nHope this helps.'
+        self.assertEqual(extract_json(text), {"a": 1})
+
+    def test_repairs_common_defects(self):
+        text = "{'a': True, “b”: [1, 2,], 'c': None,}"
+        self.assertEqual(extract_json(text), {"a": True, "b": [1, 2], "c": None})
+
+    def test_object_wins_over_bracketed_prose(self):
+        self.assertEqual(extract_json('See [1] and [2].\n{"week_1": {"focus": "SQL"}}'), {"week_1": {"focus": "SQL"}})
+
+    def test_falls_back_to_first_array(self):
+        self.assertEqual(extract_json('Skills: ["SQL", "Python"]'), ["SQL", "Python"])
+
+    def test_truncated_output_raises(self):
+        with self.assertRaises(LLMJSONError) as context:
+            extract_json('{"a": [1, 2')
+        self.assertIn("truncated", context.exception.reason)
+
+    def test_reports_position_of_defect(self):
+        with self.assertRaises(LLMJSONError) as context:
+            extract_json('prefix {"a": oops}')
+        self.assertEqual(context.exception.position, len('prefix {"a": '))
+
+    def test_no_json_raises(self):
+        with self.assertRaisesMessage(LLMJSONError, "no JSON object or array found"):
+            extract_json("no brackets here")
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from navigator.services.local_planner import PLAN_WEEKS, SkillGraph, _assign_weeks, build_local_plan, order_skills
+
+
+def graph(prerequisites):
+    return SkillGraph(prerequisites={key: [[required, 1.0] for required in needed] for key, needed in prerequisites.items()})
+
+
+class OrderSkillsTests(SimpleTestCase):
+    def test_prerequisites_come_first(self):
+        ordered = order_skills(["Django", "SQL", "Python"], graph({"django": ["python", "sql"]}))
+        self.assertEqual(ordered, ["SQL", "Python", "Django"])
+
+    def test_keeps_given_order_without_edges(self):
+        self.assertEqual(order_skills(["B", "A", "C"], graph({})), ["B", "A", "C"])
+
+    def test_ignores_prerequisites_outside_the_gap(self):
+        self.assertEqual(order_skills(["Django", "Docker"], graph({"django": ["python"]})), ["Django", "Docker"])
+
+    def test_chains(self):
+        ordered = order_skills(["C", "B", "A"], graph({"c": ["b"], "b": ["a"]}))
+        self.assertEqual(ordered, ["A", "B", "C"])
+
+
+class AssignWeeksTests(SimpleTestCase):
+    def test_one_skill_a_week_when_few(self):
+        weeks, deferred = _assign_weeks([("A", 5), ("B", 5)], weekly_hours=10)
+        self.assertEqual(weeks, [[("A", 5)], [("B", 5)], [], []])
+        self.assertEqual(deferred, [])
+
+    def test_spreads_evenly_when_everything_fits(self):
+        items = [(name, 2) for name in "ABCDEFGH"]
+        weeks, deferred = _assign_weeks(items, weekly_hours=10)
+        self.assertEqual([len(week) for week in weeks], [2, 2, 2, 2])
+        self.assertEqual([skill for week in weeks for skill, _ in week], list("ABCDEFGH"))
+        self.assertEqual(deferred, [])
+
+    def test_defers_what_does_not_fit(self):
+        items = [(name, 10) for name in "ABCDEF"]
+        weeks, deferred = _assign_weeks(items, weekly_hours=10)
+        self.assertEqual([[skill for skill, _ in week] for week in weeks], [["A"], ["B"], ["C"], ["D"]])
+        self.assertEqual(deferred, ["E", "F"])
+
+
+class BuildLocalPlanTests(SimpleTestCase):
+    def test_plan_shape_and_order(self):
+        missing = {"missing_technical": ["Django", "Python"], "missing_tools": ["Docker"], "missing_soft": ["Communication"]}
+        plan = build_local_plan(missing, "Intermediate", 2, "Backend Engineer", graph=graph({"django": ["python"]}))
+        self.assertEqual(list(plan), [f"week_{index}" for index in range(1, PLAN_WEEKS + 1)])
+        focus = " ".join(week["focus"] for week in plan.values())
+        self.assertLess(focus.index("Python"), focus.index("Django"))
+
+    def test_no_gap_gives_no_plan(self):
+        self.assertIsNone(build_local_plan({"missing_soft": ["Communication"]}, "Beginner", 2, graph=graph({})))
+
+
+class FallbackPlanTests(SimpleTestCase):
+    gap = {"missing_technical": ["Docker"], "missing_tools": [], "missing_soft": []}
+
+    def fallback(self, skill_graph):
+        from navigator import views
+
+        with mock.patch.object(views, "get_skill_graph", return_value=skill_graph):
+            return views._build_fallback_plan(self.gap, "Intermediate", 2, "Data Analyst")
+
+    def test_loaded_graph_plans_the_gap_for_hand_written_roles(self):
+        plan = self.fallback(SkillGraph(skills={"docker": {"name": "Docker", "postings": 40}}, postings=100))
+        self.assertIn("Docker", str(plan["week_1"]))
+
+    def test_hand_written_role_plan_without_a_graph(self):
+        from navigator.services.role_data import ROLE_ROADMAP_FALLBACK
+
+        self.assertIs(self.fallback(SkillGraph()), ROLE_ROADMAP_FALLBACK["Data Analyst"])
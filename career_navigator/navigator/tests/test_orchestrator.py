@@ -0,0 +1,101 @@
+import asyncio
+import os
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from navigator.services.orchestrator import run_stages, run_stages_async
+
+
+class RunStagesTests(SimpleTestCase):
+    def test_passes_dependency_results(self):
+        results = run_stages({
+            "a": (lambda: 1, []),
+            "b": (lambda: 2, []),
+            "sum": (lambda a, b: a + b, ["a", "b"]),
+        })
+        self.assertEqual(results, {"a": 1, "b": 2, "sum": 3})
+
+    def test_runs_independent_stages_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        results = run_stages({
+            "a": (lambda: barrier.wait() is not None, []),
+            "b": (lambda: barrier.wait() is not None, []),
+        })
+        self.assertEqual(results, {"a": True, "b": True})
+
+    def test_reports_completed_stages(self):
+        completed = []
+        run_stages({"a": (lambda: 1, []), "b": (lambda a: a + 1, ["a"])}, on_complete=lambda *item: completed.append(item))
+        self.assertEqual(completed, [("a", 1), ("b", 2)])
+
+    def test_reraises_stage_error_and_skips_dependents(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaisesMessage(RuntimeError, "boom"):
+            run_stages({"a": (fail, []), "b": (lambda a: ran.append(a), ["a"])})
+        self.assertEqual(ran, [])
+
+    def test_failure_does_not_wait_for_slow_stages(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        started = time.monotonic()
+        with self.assertRaises(RuntimeError):
+            run_stages({"slow": (lambda: time.sleep(1), []), "fail": (fail, [])})
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    def test_rejects_unknown_dependencies_and_cycles(self):
+        with self.assertRaises(ValueError):
+            run_stages({"a": (lambda missing: None, ["missing"])})
+        with self.assertRaises(ValueError):
+            run_stages({"a": (lambda b: None, ["b"]), "b": (lambda a: None, ["a"])})
+
+    def test_pool_is_bounded_per_call(self):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def stage():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+        with mock.patch.dict(os.environ, {"PIPELINE_MAX_WORKERS": "2"}):
+            run_stages({f"s{index}": (stage, []) for index in range(6)})
+        self.assertEqual(peak[0], 2)
+
+
+class RunStagesAsyncTests(SimpleTestCase):
+    def test_passes_dependency_results(self):
+        async def one():
+            return 1
+
+        async def plus_one(a):
+            return a + 1
+
+        results = asyncio.run(run_stages_async({"a": (one, []), "b": (plus_one, ["a"])}))
+        self.assertEqual(results, {"a": 1, "b": 2})
+
+    def test_cancels_running_stages_on_error(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run_stages_async({"slow": (slow, []), "fail": (fail, [])}))
+        self.assertEqual(cancelled, [True])
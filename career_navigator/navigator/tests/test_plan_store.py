@@ -0,0 +1,43 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from navigator.services.plan_store import PlanStore
+
+
+def gap(*skills):
+    return {"missing_technical": list(skills), "missing_soft": []}
+
+
+class PlanStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "plans.sqlite3"
+
+    def test_exact_and_near_duplicate_hits(self):
+        store = PlanStore(self.path, threshold=0.6)
+        store.add(gap("sql", "python", "tableau"), "Intermediate", 2, {"week_1": "a"})
+        self.assertEqual(store.find(gap("SQL", "python", "tableau"), "intermediate", 2), {"week_1": "a"})
+        self.assertEqual(store.find(gap("sql", "python", "tableau", "excel"), "Intermediate", 2), {"week_1": "a"})
+        self.assertIsNone(store.find(gap("sql", "python", "tableau"), "Intermediate", 3))
+
+    def test_evicts_oldest_plans_past_max_entries(self):
+        store = PlanStore(self.path, threshold=1, max_entries=2)
+        for skill in ("sql", "python", "docker"):
+            store.add(gap(skill), "Intermediate", 2, {"skill": skill})
+        self.assertIsNone(store.find(gap("sql"), "Intermediate", 2))
+        self.assertEqual(store.find(gap("docker"), "Intermediate", 2), {"skill": "docker"})
+        self.assertEqual(store.stats()["entries"], 2)
+
+    def test_other_processes_see_evictions_and_additions(self):
+        first = PlanStore(self.path, threshold=0.5, max_entries=2)
+        second = PlanStore(self.path, threshold=0.5, max_entries=2)
+        first.add(gap("sql", "python"), "Intermediate", 2, {"skill": "sql"})
+        self.assertEqual(second.find(gap("sql", "python", "excel"), "Intermediate", 2), {"skill": "sql"})
+        second.add(gap("docker"), "Intermediate", 2, {"skill": "docker"})
+        second.add(gap("kubernetes"), "Intermediate", 2, {"skill": "kubernetes"})
+        self.assertIsNone(first.find(gap("sql", "python", "excel"), "Intermediate", 2))
+        self.assertEqual(first.stats()["entries"], 2)
+        self.assertFalse(any(1 in ids for ids in first._bands.values()))
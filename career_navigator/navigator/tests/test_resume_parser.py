@@ -0,0 +1,64 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from navigator.services import resume_parser
+from navigator.services.llm_cache import MemoryBackend
+
+
+def make_pdf(pages):
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+class ExtractTextTests(SimpleTestCase):
+    pdf = make_pdf([f"Page {number}" for number in range(12)])
+
+    def extract(self, **env):
+        env = {"RESUME_MAX_PAGES": "10", **env}
+        with mock.patch.dict(os.environ, env):
+            return resume_parser.extract_text(resume_parser.spool_chunks([self.pdf]))
+
+    def test_pool_reads_pages_in_order_up_to_the_cap(self):
+        text, warnings = self.extract(RESUME_PARALLEL_MIN_PAGES="4")
+        self.assertEqual(text, "".join(f"Page {number}" for number in range(10)))
+        self.assertEqual(warnings, ["Resume has 12 pages; only the first 10 were read."])
+
+    def test_in_thread_parse_matches_the_pool(self):
+        self.assertEqual(self.extract(RESUME_PARSE_PROCESSES="0"), self.extract())
+
+    def test_timeout_recycles_the_pool(self):
+        self.extract()
+        pool = resume_parser._get_pool()
+        with self.assertRaises(resume_parser.ResumeParseTimeout):
+            self.extract(RESUME_PARSE_TIMEOUT="0.000001")
+        self.assertIsNot(resume_parser._get_pool(), pool)
+        self.assertTrue(self.extract()[0].startswith("Page 0"))
+
+
+class ResumeCacheTests(SimpleTestCase):
+    def test_resume_text_stays_off_disk_by_default(self):
+        with mock.patch.object(resume_parser, "_cache", None), mock.patch.dict(os.environ):
+            os.environ.pop("RESUME_CACHE_DISK", None)
+            layers = resume_parser._get_cache().layers
+        self.assertEqual([type(layer) for layer in layers], [MemoryBackend])
@@ -0,0 +1,31 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from navigator.services import role_profiles
+
+
+class LoadRoleProfilesTests(SimpleTestCase):
+    def load(self, data):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "profiles.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        with mock.patch.dict(role_profiles.ROLE_PROFILES, clear=True), \
+                mock.patch.dict(role_profiles.ROLE_PROFILE_NAMES, clear=True), \
+                mock.patch.object(role_profiles, "_profiles_loaded", False):
+            return dict(role_profiles.load_role_profiles(path))
+
+    def test_loads_current_version(self):
+        skills = {"technical": ["SQL"]}
+        data = {"version": role_profiles.PROFILE_VERSION, "roles": {"data analyst": {"role": "Data Analyst", "skills": skills}}}
+        self.assertEqual(self.load(data), {"data analyst": skills})
+
+    def test_malformed_files_load_no_profiles(self):
+        version = role_profiles.PROFILE_VERSION
+        for data in ([1, 2], "profiles", {"version": version, "roles": []}, {"version": version, "roles": {"x": 1}}):
+            with self.subTest(data=data):
+                self.assertEqual(self.load(data), {})
@@ -0,0 +1,103 @@
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from navigator.services.single_flight import AsyncSingleFlight, LeaseStore, SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        while flight.followers < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["value"] * 4)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_error_reaches_every_caller_and_is_not_cached(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("key", fail)
+        self.assertEqual(flight.do("key", lambda: "retried"), "retried")
+
+    def test_lease_store_excludes_other_owners_until_released(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "leases.sqlite3"
+            first, second = LeaseStore(path, ttl=60), LeaseStore(path, ttl=60)
+            self.assertTrue(first.try_acquire("key"))
+            self.assertFalse(second.try_acquire("key"))
+            first.release("key")
+            self.assertTrue(second.try_acquire("key"))
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def main():
+            return await asyncio.gather(*(flight.do("key", work) for _ in range(4)))
+
+        self.assertEqual(asyncio.run(main()), ["value"] * 4)
+        self.assertEqual(calls, [1])
+        self.assertEqual(flight.stats(), {"leaders": 1, "coalesced": 3, "in_flight": 0})
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = AsyncSingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "value"
+
+        async def main():
+            leader = asyncio.create_task(flight.do("key", work))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flight.do("key", work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower, leader.cancelled()
+
+        self.assertEqual(asyncio.run(main()), ("value", True))
+
+    def test_error_reaches_every_caller(self):
+        flight = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main():
+            return await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+        self.assertEqual([type(result) for result in asyncio.run(main())], [ValueError, ValueError])
@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from navigator.services.skill_matcher import KEYWORD_SKILLS, SkillMatcher
+
+
+class SkillMatcherTests(SimpleTestCase):
+    def test_matches_on_word_boundaries(self):
+        matcher = SkillMatcher({"technical": ["java", "sql"]})
+        self.assertEqual(matcher.keys("JavaScript, NoSQL and Java"), {"java"})
+
+    def test_overlapping_keywords_are_all_found(self):
+        matcher = SkillMatcher({"technical": ["machine learning", "learning", "power", "power bi"]})
+        self.assertEqual(
+            matcher.keys("Machine learning and Power BI"),
+            {"machine learning", "learning", "power", "power bi"},
+        )
+
+    def test_keywords_with_non_word_edges(self):
+        matcher = SkillMatcher({"technical": ["c++", "c#", ".net", "node.js"]})
+        self.assertEqual(matcher.keys("ASP.NET, C++ and C#"), {".net", "c++", "c#"})
+        self.assertEqual(matcher.keys("abc++ node.jsx node.network"), set())
+
+    def test_positions_are_first_mentions(self):
+        matcher = SkillMatcher({"technical": ["sql", "python"]})
+        self.assertEqual(matcher.positions("python, sql, python"), {"python": 0, "sql": 8})
+
+    def test_find_uses_display_names(self):
+        matcher = SkillMatcher({"technical": ["sql", "Node.js"], "tools": ["power bi"]}, display={"power bi": "Power BI"})
+        self.assertEqual(
+            matcher.find("Node.js, SQL and Power BI"),
+            {"technical": {"Node.js", "Sql"}, "tools": {"Power BI"}},
+        )
+
+    def test_default_vocabulary(self):
+        found = SkillMatcher(KEYWORD_SKILLS).find("Python, Docker and stakeholder management")
+        self.assertEqual(found["technical"], {"Python"})
+        self.assertEqual(found["tools"], {"Docker"})
+        self.assertEqual(found["soft"], {"Stakeholder Management"})
@@ -1,7 +1,32 @@
+import os
 from django.urls import path
-from .views import analyze_profile, health_check
+from .views import (
+    analysis_detail,
+    analysis_job,
+    analysis_job_events,
+    analyze_profile,
+    analyze_profile_async,
+    analyze_profile_stream,
+    best_fit_roles,
+    health_check,
+    metrics,
+    replan_analysis,
+    submit_analysis_job,
+)
+
+# Under ASGI, ANALYZE_PROFILE_ASYNC=on serves the main endpoint from the async pipeline.
+ASYNC_ANALYSIS = os.getenv("ANALYZE_PROFILE_ASYNC", "off").lower() in ("1", "on", "true", "yes")
 
 urlpatterns = [
     path('health/', health_check),
-    path('analyze-profile/', analyze_profile),
+    path('analyze-profile/', analyze_profile_async if ASYNC_ANALYSIS else analyze_profile),
+    path('analyze-profile/async/', analyze_profile_async),
+    path('analyze-profile/stream/', analyze_profile_stream),
+    path('best-fit-roles/', best_fit_roles),
+    path('jobs/', submit_analysis_job),
+    path('jobs/<str:job_id>/', analysis_job),
+    path('jobs/<str:job_id>/events/', analysis_job_events),
+    path('analyses/<str:analysis_id>/', analysis_detail),
+    path('analyses/<str:analysis_id>/replan/', replan_analysis),
+    path('metrics/', metrics),
 ]
@@ -1,70 +1,62 @@
-import base64
+import asyncio
 import json
-from io import BytesIO
-import re
-import requests
-from requests.exceptions import SSLError
-import urllib3
-from PyPDF2 import PdfReader
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import queue
+import threading
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .services.skill_extractor import extract_user_skills
-from .services.role_skill_extractor import extract_role_skills
+from .services.skill_extractor import aextract_user_skills, extract_user_skills
+from .services.role_skill_extractor import (
+    ASYNC_ROLE_FLIGHT,
+    ROLE_FLIGHT,
+    ROLE_SKILL_CACHE,
+    aextract_role_skills,
+    extract_role_skills,
+)
 from .services.gap_analyzer import (
     calculate_alignment,
     identify_missing_skills,
     calculate_readiness_estimate,
 )
-from .services.planner import generate_30_day_plan
+from .services.plan_store import get_plan_store
+from .services.planner import agenerate_30_day_plan, generate_30_day_plan, regenerate_weeks, stream_30_day_plan
+from .services.orchestrator import run_stages, run_stages_async
+from .services.jobs import FINISHED, get_job_runner
+from .services.llm_cache import DEFAULT_CACHE_DIR, get_llm_cache
+from .services.groq_client import ASYNC_LLM_FLIGHT, LLM_FLIGHT
+from .services.github import afetch_github_summary, fetch_github_summary
+from .services.hedging import LATENCY
+from .services.provider_health import get_provider_health
+from .services.warmup import WARMUP_TIMINGS
+from .services.resume_parser import (
+    ResumeTooLarge,
+    extract_resume_text,
+    open_saved_upload,
+    save_upload,
+    spool_base64,
+    spool_stream,
+    spool_uploaded_file,
+)
+from .services.skill_matcher import get_skill_matcher
+from .services.role_ranker import rank_roles
+from .services.analysis_store import (
+    find_recent_analysis,
+    get_analysis,
+    get_analysis_writer,
+    new_analysis_id,
+    put_analysis,
+    put_roadmap,
+    save_analysis,
+)
+from .services.local_planner import build_local_plan, get_skill_graph, roadmap_mode
+from .services.evaluator import evaluate_completed_skills, prune_completed_tasks
 from .services.role_data import ROLE_SKILL_FALLBACK, ROLE_ROADMAP_FALLBACK
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-
-def parse_pdf_base64(file_data):
-    decoded = base64.b64decode(file_data)
-    reader = PdfReader(BytesIO(decoded))
-    text = "".join(page.extract_text() or "" for page in reader.pages)
-    return text
-
-
-def fetch_github_summary(username):
-    if not username:
-        return {}
-    url = f"https://api.github.com/users/{username}/repos?per_page=50"
-    headers = {"Accept": "application/vnd.github+json", "User-Agent": "career-navigator-local"}
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-    except SSLError:
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
-    response.raise_for_status()
-    repos = response.json() or []
-    languages = {repo.get("language") for repo in repos if repo.get("language")}
-    topics = set()
-    for repo in repos:
-        for topic in repo.get("topics", []) or []:
-            topics.add(topic)
-    return {
-        "repoCount": len(repos),
-        "languages": list(languages),
-        "topics": list(topics),
-        "username": username,
-    }
-
-
-KEYWORD_SKILLS = {
-    "technical": [
-        "python", "java", "javascript", "typescript", "react", "node", "sql", "django", "flask", "api",
-        "machine learning", "data analysis", "excel", "tableau", "power bi", "a/b testing", "statistics",
-    ],
-    "tools": [
-        "git", "github", "docker", "firebase", "figma", "jira", "vscode", "postman",
-    ],
-    "soft": [
-        "communication", "leadership", "collaboration", "problem solving", "stakeholder management", "storytelling",
-    ],
-}
-
 
 def _normalize_skills(skills):
     if not isinstance(skills, dict):
@@ -78,14 +70,8 @@ def _normalize_skills(skills):
 
 
 def _extract_skills_fallback(combined_text, github_summary):
-    text = (combined_text or "").lower()
-    found = {"technical": set(), "tools": set(), "soft": set()}
-
-    for category, candidates in KEYWORD_SKILLS.items():
-        for candidate in candidates:
-            pattern = rf"\b{re.escape(candidate)}\b"
-            if re.search(pattern, text):
-                found[category].add(candidate.title())
+    matched = get_skill_matcher().find(combined_text or "")
+    found = {category: set(matched.get(category, ())) for category in ("technical", "tools", "soft")}
 
     for language in github_summary.get("languages", []) or []:
         if language:
@@ -102,7 +88,14 @@ def _extract_skills_fallback(combined_text, github_summary):
 
 
 def _build_fallback_plan(missing_skills, experience_level, hours_per_day, dream_role):
+    # The hand-written role plans ignore the user's gap, so they only stand in
+    # when no skill graph is loaded or there is no technical gap to plan.
+    graph = get_skill_graph()
     role_plan = ROLE_ROADMAP_FALLBACK.get(dream_role)
+    if graph.skills or not role_plan:
+        local_plan = build_local_plan(missing_skills, experience_level, hours_per_day, dream_role, graph=graph)
+        if local_plan:
+            return local_plan
     if role_plan:
         return role_plan
 
@@ -157,6 +150,9 @@ def _personalize_plan_with_gaps(plan, missing_skills):
     if not isinstance(plan, dict):
         return plan
 
+    # Plans can be shared (ROLE_ROADMAP_FALLBACK entries, reused plans), so weeks are copied before editing.
+    plan = {key: dict(value) if isinstance(value, dict) else value for key, value in plan.items()}
+
     missing_technical = list((missing_skills or {}).get("missing_technical", []))
     missing_tools = list((missing_skills or {}).get("missing_tools", []))
     missing_soft = list((missing_skills or {}).get("missing_soft", []))
@@ -187,77 +183,111 @@ def _personalize_plan_with_gaps(plan, missing_skills):
     return plan
 
 
-@api_view(["GET"])
-def health_check(request):
-    return Response({"message": "Career Navigator API Running"})
+class ResumeParseError(Exception):
+    pass
 
 
-@api_view(["POST"])
-def analyze_profile(request):
-    payload = request.data
-    dream_role = payload.get("dream_role") or "Product Analyst"
-    resume_text = payload.get("resume_text") or ""
-    resume_file = payload.get("resume_file_base64")
-    github_username = payload.get("github_username")
+def _resume_stage(params):
+    upload = params["resume_upload"]
+    if upload is None:
+        return params["resume_text"], params.get("resume_warnings", [])
     try:
-        hours_per_day = int(payload.get("hours_per_day") or 2)
-    except (TypeError, ValueError):
-        hours_per_day = 2
-    experience_level = payload.get("experience_level") or "Intermediate"
-    warnings = []
+        return extract_resume_text(upload)
+    except Exception as exc:
+        raise ResumeParseError(f"Failed to parse resume file: {str(exc)}") from exc
+    finally:
+        upload.close()
 
-    if not any([resume_text.strip(), resume_file, (github_username or "").strip()]):
-        return Response({"error": "Provide at least one input: github_username, resume_text, or resume_file_base64."}, status=400)
 
-    if resume_file:
-        try:
-            resume_text = parse_pdf_base64(resume_file)
-        except Exception as exc:
-            return Response({"error": f"Failed to parse resume file: {str(exc)}"}, status=400)
+def _finish_github(github_summary, error):
+    warnings = []
+    if error is not None:
+        warnings.append(f"GitHub import failed: {str(error)}")
+        github_summary = {}
+    return github_summary, warnings
+
 
-    github_summary = {}
+def _github_stage(params):
+    github_summary, error = {}, None
     try:
-        github_summary = fetch_github_summary(github_username)
+        github_summary = fetch_github_summary(params["github_username"])
     except Exception as exc:
-        warnings.append(f"GitHub import failed: {str(exc)}")
-        github_summary = {}
+        error = exc
+    return _finish_github(github_summary, error)
+
 
-    combined_text = "\n".join([
-        resume_text,
+def _combined_text(resume, github_summary):
+    return "\n".join([
+        resume,
         json.dumps(github_summary),
     ])
 
-    try:
-        user_skills = extract_user_skills(combined_text)
-    except Exception as exc:
-        warnings.append(f"AI skill extraction unavailable ({str(exc)}). Used fallback extraction.")
+
+def _finish_user_skills(user_skills, error, combined_text, github_summary, resume_warnings):
+    warnings = list(resume_warnings)
+    if error is not None:
+        warnings.append(f"AI skill extraction unavailable ({str(error)}). Used fallback extraction.")
         user_skills = _extract_skills_fallback(combined_text, github_summary)
 
     if isinstance(user_skills, dict) and user_skills.get("error"):
         warnings.append(f"AI skill extraction returned an error ({user_skills.get('error')}). Used fallback extraction.")
         user_skills = _extract_skills_fallback(combined_text, github_summary)
 
-    user_skills = _normalize_skills(user_skills)
+    return _normalize_skills(user_skills), warnings
+
 
+def _user_skills_stage(resume, github):
+    resume_text, resume_warnings = resume
+    github_summary, _ = github
+    combined_text = _combined_text(resume_text, github_summary)
+    user_skills, error = None, None
     try:
-        role_skills = extract_role_skills(dream_role)
+        user_skills = extract_user_skills(combined_text)
     except Exception as exc:
-        warnings.append(f"AI role extraction unavailable ({str(exc)}). Used fallback role map.")
+        error = exc
+    return _finish_user_skills(user_skills, error, combined_text, github_summary, resume_warnings)
+
+
+def _finish_role_skills(role_skills, error, dream_role):
+    warnings = []
+    if error is not None:
+        warnings.append(f"AI role extraction unavailable ({str(error)}). Used fallback role map.")
         role_skills = ROLE_SKILL_FALLBACK.get(dream_role, ROLE_SKILL_FALLBACK["default"])
 
     if isinstance(role_skills, dict) and role_skills.get("error"):
         warnings.append(f"AI role extraction returned an error ({role_skills.get('error')}). Used fallback role map.")
         role_skills = ROLE_SKILL_FALLBACK.get(dream_role, ROLE_SKILL_FALLBACK["default"])
 
-    role_skills = _normalize_skills(role_skills)
+    return _normalize_skills(role_skills), warnings
 
-    alignment_score = calculate_alignment(user_skills, role_skills)
-    missing_skills = identify_missing_skills(user_skills, role_skills)
-    readiness = calculate_readiness_estimate(alignment_score)
+
+def _role_skills_stage(params):
+    role_skills, error = None, None
     try:
-        plan = generate_30_day_plan(missing_skills, experience_level, hours_per_day)
+        role_skills = extract_role_skills(params["dream_role"])
     except Exception as exc:
-        warnings.append(f"AI planner unavailable ({str(exc)}). Used fallback 4-week plan.")
+        error = exc
+    return _finish_role_skills(role_skills, error, params["dream_role"])
+
+
+def _alignment_stage(user_skills, role_skills):
+    user_skills, _ = user_skills
+    role_skills, _ = role_skills
+    alignment_score = calculate_alignment(user_skills, role_skills)
+    return {
+        "alignment_score": alignment_score,
+        "missing_skills": identify_missing_skills(user_skills, role_skills),
+        "readiness": calculate_readiness_estimate(alignment_score),
+    }
+
+
+def _finish_roadmap(plan, error, params, missing_skills):
+    experience_level = params["experience_level"]
+    hours_per_day = params["hours_per_day"]
+    dream_role = params["dream_role"]
+    warnings = []
+    if error is not None:
+        warnings.append(f"AI planner unavailable ({str(error)}). Used fallback 4-week plan.")
         plan = _build_fallback_plan(missing_skills, experience_level, hours_per_day, dream_role)
 
     if isinstance(plan, dict) and plan.get("error"):
@@ -265,7 +295,10 @@ def analyze_profile(request):
         plan = _build_fallback_plan(missing_skills, experience_level, hours_per_day, dream_role)
 
     plan = _personalize_plan_with_gaps(plan, missing_skills)
+    return _roadmap_items(plan), warnings
+
 
+def _roadmap_items(plan):
     roadmap = []
     for week_key, content in plan.items():
         roadmap.append({
@@ -275,25 +308,779 @@ def analyze_profile(request):
             "project": content.get("project"),
             "checkpoint": content.get("checkpoint"),
         })
+    return roadmap
+
+
+def _local_roadmap(params, missing_skills):
+    """
+    The roadmap without the LLM planner (ROADMAP_MODE=local or local_first).
+    """
+
+    plan = _build_fallback_plan(missing_skills, params["experience_level"], params["hours_per_day"], params["dream_role"])
+    return _roadmap_items(_personalize_plan_with_gaps(plan, missing_skills)), []
+
+
+def _roadmap_stage(params, alignment):
+    missing_skills = alignment["missing_skills"]
+    if roadmap_mode() != "llm":
+        return _local_roadmap(params, missing_skills)
+    plan, error = None, None
+    try:
+        plan = generate_30_day_plan(missing_skills, params["experience_level"], params["hours_per_day"])
+    except Exception as exc:
+        error = exc
+    return _finish_roadmap(plan, error, params, missing_skills)
+
+
+async def _aresume_stage(params):
+    return await asyncio.to_thread(_resume_stage, params)
+
+
+async def _agithub_stage(params):
+    github_summary, error = {}, None
+    try:
+        github_summary = await afetch_github_summary(params["github_username"])
+    except Exception as exc:
+        error = exc
+    return _finish_github(github_summary, error)
+
+
+async def _auser_skills_stage(resume, github):
+    resume_text, resume_warnings = resume
+    github_summary, _ = github
+    combined_text = _combined_text(resume_text, github_summary)
+    user_skills, error = None, None
+    try:
+        user_skills = await aextract_user_skills(combined_text)
+    except Exception as exc:
+        error = exc
+    return _finish_user_skills(user_skills, error, combined_text, github_summary, resume_warnings)
+
+
+async def _arole_skills_stage(params):
+    role_skills, error = None, None
+    try:
+        role_skills = await aextract_role_skills(params["dream_role"])
+    except Exception as exc:
+        error = exc
+    return _finish_role_skills(role_skills, error, params["dream_role"])
+
+
+async def _aalignment_stage(user_skills, role_skills):
+    return _alignment_stage(user_skills, role_skills)
+
+
+async def _aroadmap_stage(params, alignment):
+    # The local planner loads the skill graph from disk, so it runs in a worker thread.
+    missing_skills = alignment["missing_skills"]
+    if roadmap_mode() != "llm":
+        return await asyncio.to_thread(_local_roadmap, params, missing_skills)
+    plan, error = None, None
+    try:
+        plan = await agenerate_30_day_plan(missing_skills, params["experience_level"], params["hours_per_day"])
+    except Exception as exc:
+        error = exc
+    return await asyncio.to_thread(_finish_roadmap, plan, error, params, missing_skills)
+
+
+def _analysis_stages(params):
+    """
+    Dependency graph of the analysis pipeline.
+    Resume parsing, GitHub import and role extraction run concurrently.
+    """
+
+    return {
+        "resume": (partial(_resume_stage, params), []),
+        "github": (partial(_github_stage, params), []),
+        "user_skills": (_user_skills_stage, ["resume", "github"]),
+        "role_skills": (partial(_role_skills_stage, params), []),
+        "alignment": (_alignment_stage, ["user_skills", "role_skills"]),
+        "roadmap": (partial(_roadmap_stage, params), ["alignment"]),
+    }
+
+
+def _user_skills_stages(params):
+    """
+    The part of the analysis graph that profiles the user, for role recommendations.
+    """
+
+    stages = _analysis_stages(params)
+    return {name: stages[name] for name in ("resume", "github", "user_skills")}
+
+
+def _analysis_stages_async(params):
+    return {
+        "resume": (partial(_aresume_stage, params), []),
+        "github": (partial(_agithub_stage, params), []),
+        "user_skills": (_auser_skills_stage, ["resume", "github"]),
+        "role_skills": (partial(_arole_skills_stage, params), []),
+        "alignment": (_aalignment_stage, ["user_skills", "role_skills"]),
+        "roadmap": (partial(_aroadmap_stage, params), ["alignment"]),
+    }
+
+
+def _stream_roadmap(params, alignment):
+    """
+    Streaming `_roadmap_stage`: yields `("roadmap_week", item)` as each LLM week
+    completes and returns `(roadmap, warnings)`. Weeks the stream did not deliver
+    come from the fallback plan, as the non-streaming stage does.
+    """
+
+    missing_skills = alignment["missing_skills"]
+    if roadmap_mode() != "llm":
+        roadmap, warnings = _local_roadmap(params, missing_skills)
+        for item in roadmap:
+            yield "roadmap_week", item
+        return roadmap, warnings
+
+    roadmap, warnings = [], []
+    streamed = set()
+    try:
+        for week_key, content in stream_30_day_plan(missing_skills, params["experience_level"], params["hours_per_day"]):
+            item = _roadmap_items(_personalize_plan_with_gaps({week_key: content}, missing_skills))[0]
+            streamed.add(week_key)
+            roadmap.append(item)
+            yield "roadmap_week", item
+    except Exception as exc:
+        warnings.append(f"AI planner unavailable ({str(exc)}). Used fallback 4-week plan.")
+
+    if not streamed and not warnings:
+        warnings.append("AI planner returned an error (Invalid JSON from LLM). Used fallback 4-week plan.")
+    if warnings:
+        fallback = _build_fallback_plan(missing_skills, params["experience_level"], params["hours_per_day"], params["dream_role"])
+        remaining = {key: value for key, value in fallback.items() if key not in streamed}
+        for item in _roadmap_items(_personalize_plan_with_gaps(remaining, missing_skills)):
+            roadmap.append(item)
+            yield "roadmap_week", item
+
+    return roadmap, warnings
+
+
+def _analysis_events(params):
+    """
+    Yield `(event, data)` for the streaming endpoint: each stage as it completes,
+    each roadmap week as it is generated, then `done` with the full response.
+    """
+
+    stored = _stored_analysis(params)
+    if stored is not None:
+        yield "done", stored
+        return
+
+    stages = _analysis_stages(params)
+    del stages["roadmap"]
+    completed = queue.Queue()
+    outcome = {}
+
+    def run():
+        try:
+            outcome["results"] = run_stages(stages, on_complete=lambda name, result: completed.put((name, result)))
+        except Exception as exc:
+            outcome["error"] = exc
+        finally:
+            completed.put(None)
+
+    threading.Thread(target=run, name="analysis-stream", daemon=True).start()
+    while (item := completed.get()) is not None:
+        name, result = item
+        if name in JOB_EVENT_STAGES:
+            yield name, _stage_event(name, result)
+
+    if "error" in outcome:
+        yield "failed", {"error": str(outcome["error"])}
+        return
+
+    results = outcome["results"]
+    results["roadmap"] = yield from _stream_roadmap(params, results["alignment"])
+    yield "roadmap", _stage_event("roadmap", results["roadmap"])
+    yield "done", _build_analysis_response(params, results)
+
+
+def _request_params(request):
+    """
+    Validated pipeline inputs for the plain (non-DRF) views, or `(None, error response)`.
+    Accepts a JSON body, a multipart form, or a raw PDF body with the other fields in the query string.
+    """
+
+    if _is_pdf_body(request):
+        params, error = _analysis_params(request.GET, stream=request)
+    elif request.content_type == "multipart/form-data":
+        params, error = _analysis_params(request.POST, files=request.FILES)
+    else:
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return None, JsonResponse({"error": "Request body must be valid JSON."}, status=400)
+        if not isinstance(payload, dict):
+            return None, JsonResponse({"error": "Request body must be a JSON object."}, status=400)
+        params, error = _analysis_params(payload)
+
+    if error:
+        return None, JsonResponse({"error": error}, status=400)
+    return params, None
+
+
+def _drf_request_params(request):
+    if _is_pdf_body(request):
+        return _analysis_params(request.query_params, stream=request.stream)
+    return _analysis_params(request.data, files=request.FILES)
+
+
+def _job_upload_dir():
+    return os.getenv("JOB_UPLOAD_DIR") or DEFAULT_CACHE_DIR / "job_uploads"
+
+
+def _detach_resume(params):
+    """
+    Jobs may run in another process, so an uploaded resume is copied to a
+    shared directory and parsed by the worker; only its path travels with the job.
+    """
+
+    upload = params["resume_upload"]
+    if upload is not None:
+        try:
+            path = save_upload(upload, _job_upload_dir())
+        finally:
+            upload.close()
+        params.update(resume_path=str(path), resume_sha256=upload.sha256)
+    params["resume_upload"] = None
+    return params
+
+
+def _attach_resume(params):
+    if params.get("resume_path"):
+        params["resume_upload"] = open_saved_upload(params["resume_path"], params["resume_sha256"])
+    return params
+
+
+def _spool_resume(payload, files=None, stream=None):
+    """
+    The request's PDF resume as a spooled upload: a multipart `resume_file`,
+    a raw `application/pdf` body, or `resume_file_base64` in the payload.
+    """
+
+    if files is not None and files.get("resume_file"):
+        return spool_uploaded_file(files["resume_file"])
+    if stream is not None:
+        return spool_stream(stream)
+    if payload.get("resume_file_base64"):
+        return spool_base64(payload["resume_file_base64"])
+    return None
+
+
+def _is_pdf_body(request):
+    return (request.content_type or "").split(";")[0].strip() == "application/pdf"
+
+
+def _analysis_params(payload, files=None, stream=None):
+    """
+    Validated pipeline inputs, or `(None, error message)`.
+    """
+
+    resume_text = payload.get("resume_text") or ""
+    resume_file = payload.get("resume_file_base64") or (files is not None and files.get("resume_file")) or stream is not None
+    github_username = payload.get("github_username")
+    try:
+        hours_per_day = min(max(int(payload.get("hours_per_day") or 2), 1), 24)
+    except (TypeError, ValueError):
+        hours_per_day = 2
+
+    if not any([resume_text.strip(), resume_file, (github_username or "").strip()]):
+        return None, "Provide at least one input: github_username, resume_text, resume_file_base64, or a resume_file upload."
+
+    try:
+        resume_upload = _spool_resume(payload, files, stream)
+    except ResumeTooLarge as exc:
+        return None, str(exc)
+    except ValueError as exc:
+        return None, f"Failed to parse resume file: {str(exc)}"
+
+    return {
+        "dream_role": payload.get("dream_role") or "Product Analyst",
+        "resume_text": resume_text,
+        "resume_upload": resume_upload,
+        "github_username": github_username,
+        "hours_per_day": hours_per_day,
+        "experience_level": payload.get("experience_level") or "Intermediate",
+    }, None
+
+
+def _save_analysis(params, response):
+    """
+    Persist the analysis with what a later re-plan needs; a storage failure never fails the analysis.
+    """
+
+    analysis_id = new_analysis_id()
+    response["analysis_id"] = analysis_id
+    try:
+        save_analysis(analysis_id, params, {
+            "dream_role": params["dream_role"],
+            "experience_level": params["experience_level"],
+            "hours_per_day": params["hours_per_day"],
+            "user_skills": response["user_skills"],
+            "role_skills": response["role_skills"],
+            "alignment_score": response["alignment_score"],
+            "missing_skills": response["missing_skills"],
+            "roadmap": response["roadmap"],
+            "completed_skills": [],
+        }, response)
+    except Exception:
+        response["analysis_id"] = None
+    return response
+
+
+def _stored_analysis(params):
+    """
+    A recent stored response for identical inputs, or None. A reused request's upload is closed here.
+    """
+
+    try:
+        response = find_recent_analysis(params)
+    except Exception:
+        return None
+    if response is not None and params.get("resume_upload") is not None:
+        params["resume_upload"].close()
+    return response
+
+
+def _plan_from_roadmap(roadmap):
+    return {
+        item["week"].lower().replace(" ", "_"): {key: item.get(key) for key in ("focus", "tasks", "project", "checkpoint")}
+        for item in roadmap
+    }
+
+
+def _replan_roadmap(record, progress):
+    """
+    Rewrite only the affected weeks (one LLM call at most); `(patch, warnings)`.
+    """
+
+    weeks = progress["affected_weeks"]
+    if not weeks:
+        return {}, []
+
+    plan = _plan_from_roadmap(record["roadmap"])
+    missing_skills = progress["remaining_missing"]
+    completed = [skill for skills in progress["newly_completed"].values() for skill in skills]
+    if roadmap_mode() == "local":
+        return _personalize_plan_with_gaps(prune_completed_tasks(plan, weeks, completed), missing_skills), []
+
+    patch, error = None, None
+    try:
+        patch = regenerate_weeks(plan, weeks, missing_skills, record["experience_level"], record["hours_per_day"])
+    except Exception as exc:
+        error = exc
+
+    warnings = []
+    if error is not None:
+        warnings.append(f"AI planner unavailable ({str(error)}). Removed completed tasks from the affected weeks.")
+    elif patch.get("error"):
+        warnings.append(f"AI planner returned an error ({patch.get('error')}). Removed completed tasks from the affected weeks.")
+    if warnings:
+        patch = {}
+    missing_weeks = [week for week in weeks if week not in patch]
+    patch.update(prune_completed_tasks(plan, missing_weeks, completed))
+    return _personalize_plan_with_gaps(patch, missing_skills), warnings
+
+
+def _roadmap_fields(roadmap):
+    return {
+        "roadmap": roadmap,
+        "projects": [item.get("project") for item in roadmap if item.get("project")],
+        "checkpoints": [item.get("checkpoint") for item in roadmap if item.get("checkpoint")],
+    }
+
+
+_upgrade_executor = None
+_upgrade_lock = threading.Lock()
+
+
+def _upgrade_roadmap(analysis_id, missing_skills, experience_level, hours_per_day):
+    """
+    Swap the LLM plan into a stored analysis that was answered with the local plan.
+    """
+
+    try:
+        plan = generate_30_day_plan(missing_skills, experience_level, hours_per_day)
+        if not isinstance(plan, dict) or plan.get("error"):
+            return
+        roadmap = _roadmap_items(_personalize_plan_with_gaps(plan, missing_skills))
+        put_roadmap(analysis_id, {**_roadmap_fields(roadmap), "roadmap_source": "llm"})
+    except Exception:
+        # The local roadmap is already stored and served; a failed upgrade just keeps it.
+        pass
+    finally:
+        close_old_connections()
+
+
+def _schedule_roadmap_upgrade(params, response):
+    global _upgrade_executor
+
+    if _upgrade_executor is None:
+        with _upgrade_lock:
+            if _upgrade_executor is None:
+                _upgrade_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("ROADMAP_UPGRADE_WORKERS", "2")),
+                    thread_name_prefix="roadmap-upgrade",
+                )
+    _upgrade_executor.submit(
+        _upgrade_roadmap,
+        response["analysis_id"],
+        response["missing_skills"],
+        params["experience_level"],
+        params["hours_per_day"],
+    )
+
+
+def _build_analysis_response(params, results):
+    github_summary, github_warnings = results["github"]
+    user_skills, user_warnings = results["user_skills"]
+    role_skills, role_warnings = results["role_skills"]
+    alignment = results["alignment"]
+    roadmap, roadmap_warnings = results["roadmap"]
 
-    projects = [item.get("project") for item in roadmap if item.get("project")]
-    checkpoints = [item.get("checkpoint") for item in roadmap if item.get("checkpoint")]
     resources = [
         "Use the dataset-driven job descriptions for your target role",
         "Review one mock interview guide per week",
     ]
 
-    return Response({
-        "dream_role": dream_role,
+    mode = roadmap_mode()
+    response = _save_analysis(params, {
+        "analysis_id": None,
+        "dream_role": params["dream_role"],
         "github_summary": github_summary,
         "user_skills": user_skills,
         "role_skills": role_skills,
-        "missing_skills": missing_skills,
-        "alignment_score": alignment_score,
-        "readiness": readiness,
-        "roadmap": roadmap,
-        "projects": projects,
+        "missing_skills": alignment["missing_skills"],
+        "alignment_score": alignment["alignment_score"],
+        "readiness": alignment["readiness"],
+        **_roadmap_fields(roadmap),
         "resources": resources,
-        "checkpoints": checkpoints,
+        "roadmap_source": "llm" if mode == "llm" and not roadmap_warnings else "local",
+        "warnings": [*github_warnings, *user_warnings, *role_warnings, *roadmap_warnings],
+    })
+    if mode == "local_first" and response["analysis_id"]:
+        # GET /api/analyses/<id>/ reports roadmap_source "llm" once the LLM plan is in.
+        _schedule_roadmap_upgrade(params, response)
+    return response
+
+
+# Stages whose results are published to job pollers and event streams.
+JOB_EVENT_STAGES = ("user_skills", "role_skills", "alignment", "roadmap")
+
+
+def _stage_event(name, result):
+    if name == "alignment":
+        return {"result": result, "warnings": []}
+    value, warnings = result
+    return {"result": value, "warnings": warnings}
+
+
+def run_analysis_job(params, emit):
+    """
+    Job pipeline: the sync analysis, emitting each user-facing stage as it completes.
+    The job's saved resume is removed once the job ends; a worker that dies
+    first leaves it for the requeued run.
+    """
+
+    params = _attach_resume(dict(params))
+    try:
+        stored = _stored_analysis(params)
+        if stored is not None:
+            return stored
+
+        def on_complete(name, result):
+            if name in JOB_EVENT_STAGES:
+                emit(name, _stage_event(name, result))
+
+        results = run_stages(_analysis_stages(params), on_complete=on_complete)
+        return _build_analysis_response(params, results)
+    finally:
+        if params["resume_upload"] is not None:
+            params["resume_upload"].close()
+        if params.get("resume_path"):
+            try:
+                os.remove(params["resume_path"])
+            except OSError:
+                pass
+
+
+def _job_urls(job_id):
+    return {
+        "poll_url": f"/api/jobs/{job_id}/",
+        "events_url": f"/api/jobs/{job_id}/events/",
+    }
+
+
+def _format_sse(seq, event, data):
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@api_view(["GET"])
+def health_check(request):
+    return Response({"message": "Career Navigator API Running"})
+
+
+@api_view(["GET"])
+def metrics(request):
+    llm_cache = get_llm_cache()
+    plan_store = get_plan_store()
+    return Response({
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "role_skill_cache": ROLE_SKILL_CACHE.stats(),
+        "llm_latency": LATENCY.stats(),
+        "provider_health": get_provider_health().stats(),
+        "warmup": WARMUP_TIMINGS,
+        "plan_store": plan_store.stats() if plan_store else None,
+        "analysis_writer": get_analysis_writer().stats(),
+        "skill_graph": get_skill_graph().stats(),
+        "single_flight": {
+            "llm": LLM_FLIGHT.stats(),
+            "role_skills": ROLE_FLIGHT.stats(),
+            "llm_async": ASYNC_LLM_FLIGHT.stats(),
+            "role_skills_async": ASYNC_ROLE_FLIGHT.stats(),
+        },
+    })
+
+
+@api_view(["POST"])
+def analyze_profile(request):
+    params, error = _drf_request_params(request)
+    if error:
+        return Response({"error": error}, status=400)
+
+    stored = _stored_analysis(params)
+    if stored is not None:
+        return Response(stored)
+
+    try:
+        results = run_stages(_analysis_stages(params))
+    except ResumeParseError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    return Response(_build_analysis_response(params, results))
+
+
+@api_view(["POST"])
+def best_fit_roles(request):
+    """
+    Top-k known roles for a user, scored against the whole role catalog at once.
+    Takes `user_skills` directly, or the same profile inputs as analyze-profile.
+    """
+
+    payload = request.query_params if _is_pdf_body(request) else request.data
+    try:
+        top_k = min(max(int(payload.get("top_k") or 5), 1), 50)
+    except (TypeError, ValueError):
+        top_k = 5
+
+    warnings = []
+    if isinstance(payload.get("user_skills"), dict):
+        user_skills = _normalize_skills(payload["user_skills"])
+    else:
+        params, error = _drf_request_params(request)
+        if error:
+            return Response({"error": error}, status=400)
+        try:
+            results = run_stages(_user_skills_stages(params))
+        except ResumeParseError as exc:
+            return Response({"error": str(exc)}, status=400)
+        _, github_warnings = results["github"]
+        user_skills, user_warnings = results["user_skills"]
+        warnings = [*github_warnings, *user_warnings]
+
+    return Response({
+        "user_skills": user_skills,
+        "roles": rank_roles(user_skills, top_k),
         "warnings": warnings,
     })
+
+
+@api_view(["GET"])
+def analysis_detail(request, analysis_id):
+    record = get_analysis(analysis_id)
+    if record is None:
+        return Response({"error": "Unknown analysis id."}, status=404)
+    return Response({"analysis_id": analysis_id, **record})
+
+
+@api_view(["POST"])
+def replan_analysis(request, analysis_id):
+    """
+    Apply newly completed skills to a stored analysis: the alignment is
+    recomputed from the stored skill sets and only roadmap weeks that mention a
+    completed skill are rewritten.
+    """
+
+    record = get_analysis(analysis_id)
+    if record is None:
+        return Response({"error": "Unknown analysis id."}, status=404)
+
+    completed_skills = request.data.get("completed_skills")
+    if isinstance(completed_skills, str):
+        completed_skills = [completed_skills]
+    if not isinstance(completed_skills, list) or not any(str(skill).strip() for skill in completed_skills):
+        return Response({"error": "Provide completed_skills as a non-empty list."}, status=400)
+
+    progress = evaluate_completed_skills(
+        completed_skills, record["user_skills"], record["role_skills"], _plan_from_roadmap(record["roadmap"])
+    )
+    patch, warnings = _replan_roadmap(record, progress)
+    patched = _roadmap_items(patch)
+    by_week = {item["week"]: item for item in patched}
+
+    previous_alignment = record["alignment_score"]
+    record.update(
+        user_skills={**record["user_skills"], **progress["updated_user_skills"]},
+        alignment_score=progress["new_alignment"],
+        missing_skills=progress["remaining_missing"],
+        roadmap=[by_week.get(item["week"], item) for item in record["roadmap"]],
+        completed_skills=[*record["completed_skills"], *(str(skill).strip() for skill in completed_skills)],
+    )
+    readiness = calculate_readiness_estimate(record["alignment_score"])
+    put_analysis(analysis_id, record, {
+        "user_skills": record["user_skills"],
+        "alignment_score": record["alignment_score"],
+        "readiness": readiness,
+        "missing_skills": record["missing_skills"],
+        **_roadmap_fields(record["roadmap"]),
+    })
+
+    return Response({
+        "analysis_id": analysis_id,
+        "alignment_score": record["alignment_score"],
+        "previous_alignment_score": previous_alignment,
+        "readiness": readiness,
+        "newly_completed": progress["newly_completed"],
+        "missing_skills": record["missing_skills"],
+        "updated_weeks": patched,
+        "roadmap": record["roadmap"],
+        "warnings": warnings,
+    })
+
+
+@csrf_exempt
+async def analyze_profile_async(request):
+    """
+    Same contract as `analyze_profile`, served without blocking a thread per request under ASGI.
+    """
+
+    if request.method != "POST":
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    params, error_response = _request_params(request)
+    if error_response:
+        return error_response
+
+    stored = await asyncio.to_thread(_stored_analysis, params)
+    if stored is not None:
+        return JsonResponse(stored)
+
+    try:
+        results = await run_stages_async(_analysis_stages_async(params))
+    except ResumeParseError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    # Saving the analysis goes through the ORM, which must not run on the event loop.
+    return JsonResponse(await asyncio.to_thread(_build_analysis_response, params, results))
+
+
+@api_view(["POST"])
+def submit_analysis_job(request):
+    params, error = _drf_request_params(request)
+    if error:
+        return Response({"error": error}, status=400)
+    params = _detach_resume(params)
+    job_id = get_job_runner(run_analysis_job).submit(params)
+    return Response({"job_id": job_id, "status": "queued", **_job_urls(job_id)}, status=202)
+
+
+@api_view(["GET"])
+def analysis_job(request, job_id):
+    store = get_job_runner(run_analysis_job).store
+    job = store.get(job_id)
+    if job is None:
+        return Response({"error": "Job not found."}, status=404)
+
+    stages = {
+        event: data
+        for _, event, data in store.events(job_id)
+        if event in JOB_EVENT_STAGES
+    }
+    return Response({
+        "job_id": job_id,
+        "status": job["status"],
+        "stages": stages,
+        "result": job["result"],
+        "error": job["error"],
+        **_job_urls(job_id),
+    })
+
+
+def analysis_job_events(request, job_id):
+    """
+    Server-sent events: one event per completed stage, then `done` (full result) or `failed`.
+    Reconnecting clients resume after the `Last-Event-ID` they last saw.
+    """
+
+    if request.method != "GET":
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    store = get_job_runner(run_analysis_job).store
+    if store.get(job_id) is None:
+        return JsonResponse({"error": "Job not found."}, status=404)
+
+    try:
+        after = int(request.headers.get("Last-Event-ID") or 0)
+    except ValueError:
+        after = 0
+
+    def stream():
+        seen = after
+        while True:
+            events = store.events(job_id, seen)
+            if not events:
+                job = store.get(job_id)
+                if job is None:
+                    return
+                if job["status"] in FINISHED:
+                    # Flush a terminal event that landed since the read above; a client
+                    # resuming at or past it has nothing left to receive.
+                    for seq, event, data in store.events(job_id, seen):
+                        yield _format_sse(seq, event, data)
+                    return
+                events = store.wait_for_events(job_id, seen, timeout=15)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for seq, event, data in events:
+                seen = seq
+                yield _format_sse(seq, event, data)
+                if event in FINISHED:
+                    return
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@csrf_exempt
+def analyze_profile_stream(request):
+    """
+    `analyze_profile` as server-sent events, so the first roadmap week reaches
+    the client while the planner is still generating the rest.
+    """
+
+    if request.method != "POST":
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    params, error_response = _request_params(request)
+    if error_response:
+        return error_response
+
+    def stream():
+        for seq, (event, data) in enumerate(_analysis_events(params), start=1):
+            yield _format_sse(seq, event, data)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response